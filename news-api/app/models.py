@@ -33,6 +33,7 @@ class Article(BaseModel):
     content: str
     author: Optional[str] = "unknown"
     created_at: str  # Date from the source
+    published_at: Optional[datetime] = None  # created_at parsed by the collector
     url: str
     source: str
     scraped_at: Optional[datetime] = None
@@ -55,6 +56,7 @@ class ArticleResponse(BaseModel):
     content: str
     author: str
     created_at: str
+    published_at: Optional[datetime] = None
     url: str
     source: str
     scraped_at: Optional[datetime] = None
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
+from datetime import datetime, timezone
 from app.database import get_database
 from app.models import ArticleResponse, PaginatedArticles
 from app.config import settings
@@ -7,6 +8,14 @@ from bson import ObjectId
 
 router = APIRouter()
 
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Mark a datetime read from MongoDB (naive, in UTC) as UTC
+    """
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
 def serialize_article(article: dict) -> ArticleResponse:
     """
     Convert MongoDB document to ArticleResponse
@@ -20,6 +29,7 @@ def serialize_article(article: dict) -> ArticleResponse:
         content=article.get("content", ""),
         author=article.get("author", "unknown"),
         created_at=article.get("created_at", ""),
+        published_at=as_utc(article.get("published_at")),
         url=article.get("url", ""),
         source=article.get("source", ""),
         scraped_at=article.get("scraped_at"),
@@ -32,10 +42,15 @@ async def get_articles(
     page_size: int = Query(10, ge=1, le=100, description="Number of articles per page"),
     source: Optional[str] = Query(None, description="Filter by news source"),
     category: Optional[str] = Query(None, description="Filter by category"),
-    status: Optional[str] = Query(None, description="Filter by status")
+    status: Optional[str] = Query(None, description="Filter by status"),
+    published_from: Optional[datetime] = Query(None, description="Only articles published at or after this time (ISO 8601)"),
+    published_to: Optional[datetime] = Query(None, description="Only articles published at or before this time (ISO 8601)")
 ):
     """
     Get paginated list of articles with optional filters
+
+    When a publication date range is given, articles are sorted by
+    publication date so the range and the sort use the published_at index.
     """
     db = get_database()
     collection = db[settings.MONGO_COLLECTION]
@@ -49,12 +64,23 @@ async def get_articles(
     if status:
         filters["status"] = status
 
+    sort_field = "scraped_at"
+    if published_from or published_to:
+        if published_from and published_to and published_from > published_to:
+            raise HTTPException(status_code=400, detail="published_from must not be after published_to")
+        filters["published_at"] = {}
+        if published_from:
+            filters["published_at"]["$gte"] = published_from
+        if published_to:
+            filters["published_at"]["$lte"] = published_to
+        sort_field = "published_at"
+
     # Get total count
     total = await collection.count_documents(filters)
 
     # Get paginated results
     skip = (page - 1) * page_size
-    cursor = collection.find(filters).sort("scraped_at", -1).skip(skip).limit(page_size)
+    cursor = collection.find(filters).sort(sort_field, -1).skip(skip).limit(page_size)
 
     articles = []
     async for article in cursor:
@@ -10,6 +10,7 @@ from app.models import (
     PaginatedSynthesis
 )
 from app.config import settings
+from app.routes.articles import as_utc
 from bson import ObjectId
 
 router = APIRouter()
@@ -61,6 +62,7 @@ def serialize_article(article: dict) -> ArticleResponse:
         content=article.get("content", ""),
         author=article.get("author", "unknown"),
         created_at=article.get("created_at", ""),
+        published_at=as_utc(article.get("published_at")),
         url=article.get("url", ""),
         source=article.get("source", ""),
         scraped_at=article.get("scraped_at"),
@@ -3,6 +3,8 @@ Command-line interface for News Debate Synthesis AG2
 """
 import sys
 import argparse
+from typing import Optional
+from orchestration.daemon import DebateDaemon
 from orchestration.debate_orchestrator import DebateOrchestrator
 from config.logging import configure_logging, get_logger
 from database.db_client import NewsDebateDB
@@ -31,6 +33,19 @@ def main():
         help="Process articles in batch (default: 10)"
     )
     
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Debates run at the same time in batch mode (default: DEBATE_CONCURRENCY)"
+    )
+    
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and debate new articles as they are ingested"
+    )
+    
     parser.add_argument(
         "--stats",
         action="store_true",
@@ -50,10 +65,12 @@ def main():
             show_statistics()
         elif args.reset:
             reset_processing_articles()
+        elif args.daemon:
+            run_daemon(args.batch, args.concurrency)
         elif args.single:
             process_single_article()
         else:
-            process_batch(args.batch)
+            process_batch(args.batch, args.concurrency)
             
     except KeyboardInterrupt:
         logger.info("Process interrupted by user")
@@ -78,18 +95,19 @@ def process_single_article():
         print("❌ No articles to process or processing failed")
 
 
-def process_batch(batch_size: int):
+def process_batch(batch_size: int, concurrency: Optional[int] = None):
     """Process articles in batch"""
     logger.info("Starting batch processing", batch_size=batch_size)
     
     orchestrator = DebateOrchestrator()
-    results = orchestrator.process_batch(batch_size)
+    results = orchestrator.process_batch(batch_size, concurrency)
     
     # Print summary
     print(f"\n📊 Batch Processing Results:")
     print(f"   Total articles: {results['total']}")
     print(f"   Successfully processed: {results['processed']}")
     print(f"   Failed: {results['failed']}")
+    print(f"   Interrupted (will resume): {results.get('interrupted', 0)}")
     print(f"   Success rate: {results.get('success_rate', 0):.1f}%")
     
     if results['failed'] > 0:
@@ -99,6 +117,13 @@ def process_batch(batch_size: int):
                 print(f"   - {result['article_id']}: {result.get('error', 'Unknown error')}")
 
 
+def run_daemon(batch_size: int, concurrency: Optional[int] = None):
+    """Debate new articles continuously with a warm orchestrator"""
+    logger.info("Starting debate daemon")
+    
+    DebateDaemon(batch_size=batch_size, concurrency=concurrency).run()
+
+
 def show_statistics():
     """Show database statistics"""
     logger.info("Retrieving database statistics")
@@ -24,6 +24,7 @@ class BaseDebateAgent:
             "model": model_override or self.settings.openai_model,
             "api_key": self.settings.openai_api_key,
             "temperature": 0.7,
+            "timeout": self.settings.agent_timeout,
         }
         
         # Create AG2 agent
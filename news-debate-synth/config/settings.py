@@ -2,10 +2,15 @@
 Configuration settings for News Debate Synthesis AG2
 """
 import os
-from typing import Optional
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
+# Local runs keep the LLM cache next to the code, whatever the working directory
+DEFAULT_LLM_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "llm_cache.sqlite3"
+)
+
 
 class Settings(BaseSettings):
     """Application settings with environment variable support"""
@@ -24,12 +29,33 @@ class Settings(BaseSettings):
     # Application Configuration
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
     max_debate_timeout: int = Field(default=300, env="MAX_DEBATE_TIMEOUT")
+    debate_max_attempts: int = Field(default=3, env="DEBATE_MAX_ATTEMPTS")
     batch_size: int = Field(default=10, env="BATCH_SIZE")
+    debate_concurrency: int = Field(default=1, env="DEBATE_CONCURRENCY")
     max_retries: int = Field(default=3, env="MAX_RETRIES")
+    article_lease_seconds: int = Field(default=600, env="ARTICLE_LEASE_SECONDS")
+    lease_heartbeat_interval: int = Field(default=60, env="LEASE_HEARTBEAT_INTERVAL")
+    daemon_poll_interval: int = Field(default=5, env="DAEMON_POLL_INTERVAL")
+    daemon_max_idle: int = Field(default=60, env="DAEMON_MAX_IDLE")
     
     # AG2 Configuration
     max_rounds: int = Field(default=15, env="MAX_ROUNDS")
     agent_timeout: int = Field(default=60, env="AGENT_TIMEOUT")
+    speaker_selection: str = Field(default="graph", env="SPEAKER_SELECTION")
+    
+    # Token Budget
+    article_max_tokens: int = Field(default=2000, env="ARTICLE_MAX_TOKENS")
+    agent_article_tokens: Dict[str, int] = Field(
+        default={"SynthesisAgent": 1000, "AnalysisAgent": 600},
+        env="AGENT_ARTICLE_TOKENS"
+    )
+    debate_max_tokens: int = Field(default=120000, env="DEBATE_MAX_TOKENS")
+    
+    # LLM Response Cache
+    llm_cache_enabled: bool = Field(default=True, env="LLM_CACHE_ENABLED")
+    llm_cache_path: str = Field(default=DEFAULT_LLM_CACHE_PATH, env="LLM_CACHE_PATH")
+    llm_cache_ttl: int = Field(default=7 * 24 * 3600, env="LLM_CACHE_TTL")
+    llm_cache_max_mb: int = Field(default=512, env="LLM_CACHE_MAX_MB")
     
     # Debate Configuration
     max_words_per_message: int = Field(default=180, env="MAX_WORDS_PER_MESSAGE")
@@ -2,37 +2,90 @@
 MongoDB client for News Debate Synthesis AG2
 """
 import os
-from datetime import datetime
+import socket
+import threading
+from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
-from pymongo import MongoClient, ASCENDING
+from pymongo import MongoClient, ASCENDING, ReturnDocument
 from bson.objectid import ObjectId
 
 from config.settings import get_settings
 from config.logging import get_logger
-from database.models import ArticleModel, SynthesisModel, SynthesisReportModel, AnalysisReportModel
+from database.models import (
+    ArticleModel, SynthesisModel, SynthesisReportModel, AnalysisReportModel,
+    DebateMessageModel, DebateSessionModel
+)
 
 logger = get_logger(__name__)
 
 
+class LeaseHeartbeat:
+    """Background thread renewing the leases of the articles a worker is debating"""
+
+    def __init__(self, db: 'NewsDebateDB', article_ids: List[ObjectId], interval: float):
+        self.db = db
+        self.article_ids = list(article_ids)
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lease-heartbeat", daemon=True)
+
+    def __enter__(self) -> 'LeaseHeartbeat':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.db.renew_leases(self.article_ids)
+
+
 class NewsDebateDB:
-    """Enhanced MongoDB client for AG2 news debate synthesis"""
+    """
+    Enhanced MongoDB client for AG2 news debate synthesis
 
-    def __init__(self, mongo_uri: Optional[str] = None, mongo_db: Optional[str] = None):
+    Articles are claimed one at a time with ``find_one_and_update`` and held
+    under a lease (``worker_id``, ``lease_expires_at``, ``heartbeat_at``), so
+    several synth workers can share one database. A worker renews its leases
+    while it debates; articles whose lease expired because their worker
+    stopped are claimed again by the next worker.
+
+    Each turn of a debate is written to ``debate_messages`` as it completes,
+    and ``debate_sessions`` tracks the debate of each article, so a debate
+    that was interrupted continues from its last turn when the article is
+    claimed again.
+    """
+
+    def __init__(self, mongo_uri: Optional[str] = None, mongo_db: Optional[str] = None,
+                 worker_id: Optional[str] = None):
         settings = get_settings()
         self.mongo_uri = mongo_uri or settings.mongo_uri
         self.mongo_db = mongo_db or settings.mongo_db
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease = timedelta(seconds=settings.article_lease_seconds)
+        self.heartbeat_interval = settings.lease_heartbeat_interval
         self.client: Optional[MongoClient] = None
         self.db = None
         self.articles_collection = None
         self.synthesis_collection = None
+        self.debate_messages_collection = None
+        self.debate_sessions_collection = None
 
     def connect(self) -> None:
         """Initialize MongoDB connection with enhanced error handling"""
+        if self.client is not None:
+            # Already connected: a long-running worker keeps its connection
+            return
+            
         try:
             self.client = MongoClient(self.mongo_uri)
             self.db = self.client[self.mongo_db]
             self.articles_collection = self.db['articles']
             self.synthesis_collection = self.db['synthesis']
+            self.debate_messages_collection = self.db['debate_messages']
+            self.debate_sessions_collection = self.db['debate_sessions']
 
             # Create indexes for better performance
             self._create_indexes()
@@ -43,6 +96,7 @@ class NewsDebateDB:
             
         except Exception as e:
             logger.error("Failed to connect to MongoDB", error=str(e))
+            self.close()
             raise
 
     def _create_indexes(self) -> None:
@@ -52,6 +106,7 @@ class NewsDebateDB:
             self.articles_collection.create_index([('status', ASCENDING)])
             self.articles_collection.create_index([('scraped_at', ASCENDING)])
             self.articles_collection.create_index([('source', ASCENDING)])
+            self.articles_collection.create_index([('status', ASCENDING), ('lease_expires_at', ASCENDING)])
             
             # Synthesis collection indexes
             self.synthesis_collection.create_index([('article_id', ASCENDING)])
@@ -59,6 +114,13 @@ class NewsDebateDB:
             self.synthesis_collection.create_index([('verdict', ASCENDING)])
             self.synthesis_collection.create_index([('probability_true', ASCENDING)])
             
+            # Debate checkpoint indexes
+            self.debate_messages_collection.create_index(
+                [('article_id', ASCENDING), ('turn_index', ASCENDING)], unique=True
+            )
+            self.debate_sessions_collection.create_index([('article_id', ASCENDING)], unique=True)
+            self.debate_sessions_collection.create_index([('status', ASCENDING)])
+            
             logger.info("Database indexes created successfully")
             
         except Exception as e:
@@ -68,31 +130,59 @@ class NewsDebateDB:
         """Close MongoDB connection"""
         if self.client:
             self.client.close()
+            self.client = None
             logger.info("MongoDB connection closed")
 
+    def _claimable_query(self, now: datetime) -> Dict[str, Any]:
+        """New articles and articles whose worker let the lease expire"""
+        return {'$or': [
+            {'status': 'new'},
+            {'status': {'$exists': False}},
+            {'status': 'processing', 'lease_expires_at': {'$lte': now}}
+        ]}
+
+    def _owned_query(self, article_id: ObjectId) -> Dict[str, Any]:
+        """Matches an article unless another worker holds it"""
+        return {'_id': article_id, 'worker_id': {'$in': [self.worker_id, None]}}
+
+    def claim_article(self) -> Optional[Dict[str, Any]]:
+        """
+        Atomically claim the oldest unprocessed article for this worker
+        Returns: article document with its lease, or None
+        """
+        now = datetime.utcnow()
+        article = self.articles_collection.find_one_and_update(
+            self._claimable_query(now),
+            {
+                '$set': {
+                    'status': 'processing',
+                    'worker_id': self.worker_id,
+                    'processing_started_at': now,
+                    'lease_expires_at': now + self.lease,
+                    'heartbeat_at': now
+                },
+                '$inc': {'claim_count': 1}
+            },
+            sort=[('scraped_at', ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+        if article and article['claim_count'] > 1:
+            logger.warning(
+                "Reclaimed article with expired lease",
+                article_id=str(article['_id']),
+                claim_count=article['claim_count']
+            )
+        return article
+
     def get_unprocessed_article(self) -> Optional[Dict[str, Any]]:
         """
         Get one article that hasn't been synthesized yet
         Returns: article document or None
         """
         try:
-            article = self.articles_collection.find_one(
-                {'$or': [
-                    {'status': 'new'}, 
-                    {'status': {'$exists': False}}
-                ]},
-                sort=[('scraped_at', ASCENDING)]
-            )
-            
+            article = self.claim_article()
             if article:
-                # Mark as processing
-                self.articles_collection.update_one(
-                    {'_id': article['_id']},
-                    {'$set': {
-                        'status': 'processing', 
-                        'processing_started_at': datetime.utcnow()
-                    }}
-                )
                 logger.info("Retrieved unprocessed article", article_id=str(article['_id']))
                 
             return article
@@ -106,37 +196,47 @@ class NewsDebateDB:
         Get multiple articles that haven't been synthesized yet
         Returns: list of article documents
         """
+        articles = []
         try:
-            articles = list(self.articles_collection.find(
-                {'$or': [
-                    {'status': 'new'}, 
-                    {'status': {'$exists': False}}
-                ]},
-                sort=[('scraped_at', ASCENDING)]
-            ).limit(limit))
-            
+            # One atomic claim per article: two workers never get the same one
+            while len(articles) < limit:
+                article = self.claim_article()
+                if not article:
+                    break
+                articles.append(article)
+                
             if articles:
-                article_ids = [article['_id'] for article in articles]
-                self.articles_collection.update_many(
-                    {'_id': {'$in': article_ids}},
-                    {'$set': {
-                        'status': 'processing', 
-                        'processing_started_at': datetime.utcnow()
-                    }}
-                )
                 logger.info("Retrieved article batch", count=len(articles))
                 
             return articles
             
         except Exception as e:
             logger.error("Failed to get article batch", error=str(e))
-            return []
+            return articles
+
+    def renew_leases(self, article_ids: List[ObjectId]) -> int:
+        """Extend the leases this worker still holds on the given articles"""
+        try:
+            now = datetime.utcnow()
+            result = self.articles_collection.update_many(
+                {'_id': {'$in': list(article_ids)}, 'status': 'processing', 'worker_id': self.worker_id},
+                {'$set': {'lease_expires_at': now + self.lease, 'heartbeat_at': now}}
+            )
+            return result.modified_count
+        except Exception as e:
+            logger.warning("Failed to renew article leases", error=str(e))
+            return 0
+
+    def heartbeat(self, article_ids: List[ObjectId]) -> LeaseHeartbeat:
+        """Context manager renewing the leases of the given articles until it exits"""
+        return LeaseHeartbeat(self, article_ids, self.heartbeat_interval)
 
     def save_synthesis(
         self, 
         article_id: ObjectId, 
         synthesis_data: Dict[str, Any], 
-        analysis_data: Dict[str, Any]
+        analysis_data: Dict[str, Any],
+        token_usage: Optional[Dict[str, Any]] = None
     ) -> Optional[ObjectId]:
         """
         Save synthesis results to MongoDB with enhanced validation
@@ -154,19 +254,30 @@ class NewsDebateDB:
                 'verdict': synthesis_data.get('verdict', 'unknown'),
                 'probability_true': analysis_data.get('prob_true', 0.5)
             }
+            if token_usage is not None:
+                synthesis_doc['token_usage'] = token_usage
 
             result = self.synthesis_collection.insert_one(synthesis_doc)
 
             # Update article status
-            self.articles_collection.update_one(
-                {'_id': article_id},
-                {'$set': {
-                    'synthesis_id': result.inserted_id,
-                    'status': 'completed',
-                    'processing_completed_at': datetime.utcnow()
-                }}
+            update = self.articles_collection.update_one(
+                self._owned_query(article_id),
+                {
+                    '$set': {
+                        'synthesis_id': result.inserted_id,
+                        'status': 'completed',
+                        'processing_completed_at': datetime.utcnow()
+                    },
+                    '$unset': {'lease_expires_at': 1}
+                }
             )
 
+            if update.matched_count == 0:
+                # The lease expired and another worker is debating the article again
+                self.synthesis_collection.delete_one({'_id': result.inserted_id})
+                logger.warning("Article lease lost, synthesis discarded", article_id=str(article_id))
+                return None
+
             logger.info(
                 "Synthesis saved successfully", 
                 synthesis_id=str(result.inserted_id),
@@ -178,6 +289,130 @@ class NewsDebateDB:
             logger.error("Failed to save synthesis", error=str(e), article_id=str(article_id))
             return None
 
+    def release_article(self, article_id: ObjectId) -> bool:
+        """Give an article this worker holds back, so that its debate is resumed on the next claim"""
+        try:
+            if isinstance(article_id, str):
+                article_id = ObjectId(article_id)
+
+            result = self.articles_collection.update_one(
+                self._owned_query(article_id),
+                {'$set': {'status': 'new'},
+                 '$unset': {'processing_started_at': 1, 'worker_id': 1, 'lease_expires_at': 1, 'heartbeat_at': 1}}
+            )
+            return result.modified_count > 0
+        except Exception as e:
+            logger.error("Failed to release article", error=str(e), article_id=str(article_id))
+            return False
+
+    def start_debate_session(self, article_id: ObjectId, instructions_hash: str) -> Optional[DebateSessionModel]:
+        """
+        Open or reopen the debate session of an article
+
+        The stored turns are kept when the previous debate of the article was
+        interrupted with the same instructions. They are discarded when the
+        instructions changed (new content, other settings) or the previous
+        debate completed, and the article is debated from the start.
+        """
+        try:
+            if isinstance(article_id, str):
+                article_id = ObjectId(article_id)
+
+            now = datetime.utcnow()
+            update: Dict[str, Any] = {
+                '$set': {
+                    'status': 'running',
+                    'instructions_hash': instructions_hash,
+                    'worker_id': self.worker_id,
+                    'updated_at': now
+                },
+                '$inc': {'attempts': 1},
+                '$setOnInsert': {'started_at': now}
+            }
+
+            previous = self.debate_sessions_collection.find_one({'article_id': article_id})
+            if previous and (previous.get('instructions_hash') != instructions_hash
+                             or previous.get('status') == 'completed'):
+                self.debate_messages_collection.delete_many({'article_id': article_id})
+                update['$set'].update({'turns_completed': 0, 'attempts': 1, 'attempt_usage': [], 'started_at': now})
+                del update['$inc'], update['$setOnInsert']
+
+            return self.debate_sessions_collection.find_one_and_update(
+                {'article_id': article_id},
+                update,
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            logger.warning("Failed to start debate session", error=str(e), article_id=str(article_id))
+            return None
+
+    def get_debate_messages(self, article_id: ObjectId) -> List[DebateMessageModel]:
+        """Completed turns of the debate of an article, up to the first missing one"""
+        try:
+            if isinstance(article_id, str):
+                article_id = ObjectId(article_id)
+
+            messages = []
+            for message in self.debate_messages_collection.find({'article_id': article_id}).sort('turn_index', ASCENDING):
+                if message['turn_index'] != len(messages) + 1:
+                    break
+                messages.append(message)
+            return messages
+        except Exception as e:
+            logger.warning("Failed to get debate messages", error=str(e), article_id=str(article_id))
+            return []
+
+    def save_debate_message(self, article_id: ObjectId, turn_index: int, message: Dict[str, Any]) -> bool:
+        """Checkpoint a completed turn of a debate (turn 0 is the debate instructions)"""
+        try:
+            if isinstance(article_id, str):
+                article_id = ObjectId(article_id)
+
+            now = datetime.utcnow()
+            # A turn is written once: a worker whose lease expired cannot overwrite it
+            self.debate_messages_collection.update_one(
+                {'article_id': article_id, 'turn_index': turn_index},
+                {'$setOnInsert': {
+                    'name': message.get('name'),
+                    'role': message.get('role'),
+                    'content': message.get('content'),
+                    'worker_id': self.worker_id,
+                    'created_at': now
+                }},
+                upsert=True
+            )
+            self.debate_sessions_collection.update_one(
+                {'article_id': article_id},
+                {'$max': {'turns_completed': turn_index}, '$set': {'updated_at': now}}
+            )
+            return True
+        except Exception as e:
+            logger.warning("Failed to save debate message", error=str(e), article_id=str(article_id),
+                           turn_index=turn_index)
+            return False
+
+    def finish_debate_session(
+        self, article_id: ObjectId, status: str, usage: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Record how the debate of an article ended: completed, incomplete or interrupted
+
+        ``usage`` (the token usage of the attempt) is appended to the
+        session's ``attempt_usage``.
+        """
+        try:
+            if isinstance(article_id, str):
+                article_id = ObjectId(article_id)
+
+            now = datetime.utcnow()
+            update: Dict[str, Any] = {'$set': {'status': status, 'updated_at': now, 'finished_at': now}}
+            if usage is not None:
+                update['$push'] = {'attempt_usage': usage}
+            self.debate_sessions_collection.update_one({'article_id': article_id}, update)
+        except Exception as e:
+            logger.warning("Failed to finish debate session", error=str(e), article_id=str(article_id))
+
     def mark_article_failed(self, article_id: ObjectId, error_message: Optional[str] = None) -> None:
         """Mark an article as failed processing"""
         try:
@@ -193,8 +428,8 @@ class NewsDebateDB:
                 update_data['error_message'] = error_message
                 
             self.articles_collection.update_one(
-                {'_id': article_id},
-                {'$set': update_data}
+                self._owned_query(article_id),
+                {'$set': update_data, '$unset': {'lease_expires_at': 1}}
             )
             
             logger.warning("Article marked as failed", article_id=str(article_id), error=error_message)
@@ -229,8 +464,8 @@ class NewsDebateDB:
                 update_data['error_message'] = error_message
                 
             result = self.articles_collection.update_many(
-                {'_id': {'$in': object_ids}},
-                {'$set': update_data}
+                {'_id': {'$in': object_ids}, 'worker_id': {'$in': [self.worker_id, None]}},
+                {'$set': update_data, '$unset': {'lease_expires_at': 1}}
             )
             
             logger.warning(
@@ -274,7 +509,8 @@ class NewsDebateDB:
         try:
             result = self.articles_collection.update_many(
                 {'status': 'processing'},
-                {'$set': {'status': 'new'}, '$unset': {'processing_started_at': 1}}
+                {'$set': {'status': 'new'},
+                 '$unset': {'processing_started_at': 1, 'worker_id': 1, 'lease_expires_at': 1, 'heartbeat_at': 1}}
             )
             logger.info("Reset processing articles", count=result.modified_count)
             return result.modified_count
@@ -0,0 +1,73 @@
+"""
+Turn-by-turn checkpoints of debates, to resume interrupted debates
+"""
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from autogen import Agent, GroupChat
+
+from config.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CheckpointedGroupChat(GroupChat):
+    """``GroupChat`` calling ``on_append(turn_index, message)`` for each message added to the transcript"""
+
+    on_append: Optional[Callable[[int, Dict[str, Any]], None]] = None
+
+    def append(self, message: Dict[str, Any], speaker: Agent) -> None:
+        super().append(message, speaker)
+        if self.on_append is not None:
+            self.on_append(len(self.messages) - 1, self.messages[-1])
+
+
+class DebateCheckpoint:
+    """
+    Persist the turns of one debate and reload them when it is retried
+
+    The debate instructions are turn 0 and are not stored: a session is
+    tied to a hash of them instead, and its turns are discarded when the
+    article is debated with different instructions. Turns reloaded from the
+    database are not written again. The token usage of each attempt is
+    stored with the session, so a resumed debate can report and budget the
+    tokens of its earlier attempts.
+    """
+
+    def __init__(self, db: Any, article_id: Any, instructions: str):
+        self.db = db
+        self.article_id = article_id
+        self.instructions_hash = hashlib.sha256(instructions.encode('utf-8')).hexdigest()
+        self.attempt = 1
+        self.resumed_turns = 0
+        self.turns = 0
+        self.earlier_usage: List[Dict[str, Any]] = []
+
+    def start(self) -> List[Dict[str, Any]]:
+        """Open the session and return the turns completed by earlier attempts"""
+        session = self.db.start_debate_session(self.article_id, self.instructions_hash)
+        if not session:
+            return []
+
+        self.attempt = session.get('attempts', 1)
+        self.earlier_usage = session.get('attempt_usage', [])
+        history = []
+        if session.get('turns_completed'):
+            history = [
+                {'content': message['content'], 'role': message.get('role') or 'user', 'name': message['name']}
+                for message in self.db.get_debate_messages(self.article_id)
+            ]
+        self.resumed_turns = self.turns = len(history)
+        return history
+
+    def save(self, turn_index: int, message: Dict[str, Any]) -> None:
+        """``on_append`` callback writing each new turn"""
+        if turn_index <= self.turns:
+            return
+        self.turns = turn_index
+        self.db.save_debate_message(self.article_id, turn_index, message)
+
+    def finish(self, status: str, usage: Optional[Dict[str, Any]] = None) -> None:
+        """Record how this attempt ended and the tokens it used"""
+        self.db.finish_debate_session(self.article_id, status, usage)
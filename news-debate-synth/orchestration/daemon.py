@@ -0,0 +1,131 @@
+"""
+Long-running debate worker for News Debate Synthesis AG2
+"""
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from pymongo.errors import OperationFailure
+
+from config.settings import get_settings
+from config.logging import get_logger
+from orchestration.debate_orchestrator import DebateOrchestrator
+
+logger = get_logger(__name__)
+
+# Changes that can make an article claimable: new articles, and articles set
+# back to 'new' (a recrawled story that changed, or a manual --reset)
+NEW_ARTICLE_PIPELINE = [
+    {'$match': {'$or': [
+        {'operationType': 'insert'},
+        {'operationType': 'update', 'updateDescription.updatedFields.status': 'new'}
+    ]}}
+]
+
+
+class DebateDaemon:
+    """
+    Keep one warm orchestrator and debate articles as they are ingested
+
+    The agents and the MongoDB connection are created once. Between batches
+    the daemon waits on a change stream of the ``articles`` collection, so a
+    debate starts within a second of the collector's insert. Change streams
+    need a replica set; on a standalone server the daemon polls instead,
+    doubling the wait after each empty poll up to ``max_idle`` seconds.
+    Even with a change stream it checks again every ``max_idle`` seconds,
+    since expired leases produce no change event.
+    """
+
+    def __init__(
+        self,
+        orchestrator: Optional[DebateOrchestrator] = None,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        max_idle: Optional[float] = None
+    ):
+        settings = get_settings()
+        self.orchestrator = orchestrator or DebateOrchestrator(keep_connection=True)
+        self.batch_size = batch_size or settings.batch_size
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval or settings.daemon_poll_interval
+        self.max_idle = max_idle or settings.daemon_max_idle
+        self.use_change_streams = True
+        self.idle_delay = self.poll_interval
+        self._stopped = threading.Event()
+
+    def stop(self, *args: Any) -> None:
+        """Stop after the batch in progress"""
+        logger.info("Stopping debate daemon")
+        self._stopped.set()
+
+    def run(self) -> None:
+        """Process articles until stopped"""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+
+        logger.info("Debate daemon started", batch_size=self.batch_size, max_idle=self.max_idle)
+        try:
+            while not self._stopped.is_set():
+                self.run_once()
+        finally:
+            self.orchestrator.db.close()
+        logger.info("Debate daemon stopped")
+
+    def run_once(self) -> None:
+        """Process one batch, or wait for new articles when there is none"""
+        try:
+            # The stream is opened before the batch is claimed so that
+            # articles inserted while claiming still wake the daemon
+            with self._watch() as stream:
+                results = self._process_batch()
+                if results['total']:
+                    self.idle_delay = self.poll_interval
+                    return
+                self._wait(stream)
+        except Exception as e:
+            logger.error("Debate daemon error", error=str(e))
+            self._backoff()
+
+    def _process_batch(self) -> Dict[str, Any]:
+        return self.orchestrator.process_batch(self.batch_size, self.concurrency)
+
+    @contextmanager
+    def _watch(self) -> Iterator[Optional[Any]]:
+        """Change stream of claimable articles, or None when change streams are unavailable"""
+        stream = None
+        if self.use_change_streams:
+            self.orchestrator.db.connect()
+            try:
+                stream = self.orchestrator.db.articles_collection.watch(
+                    NEW_ARTICLE_PIPELINE, max_await_time_ms=1000
+                )
+            except OperationFailure as e:
+                # Standalone servers do not support change streams
+                self.use_change_streams = False
+                logger.warning("Change streams unavailable, polling for new articles", error=str(e))
+        try:
+            yield stream
+        finally:
+            if stream is not None:
+                stream.close()
+
+    def _wait(self, stream: Optional[Any]) -> None:
+        """Wait for a new article event, or poll with an increasing delay"""
+        if stream is None:
+            self._backoff()
+            return
+
+        deadline = time.monotonic() + self.max_idle
+        while not self._stopped.is_set() and time.monotonic() < deadline:
+            # Blocks for at most max_await_time_ms
+            if stream.try_next() is not None:
+                logger.info("New article detected")
+                return
+
+    def _backoff(self) -> None:
+        logger.debug("No articles to debate", wait=self.idle_delay)
+        self._stopped.wait(self.idle_delay)
+        self.idle_delay = min(self.idle_delay * 2, self.max_idle)
@@ -0,0 +1,101 @@
+"""
+Debate engine running the independent steps of the schedule in parallel
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from autogen import Agent, GroupChat, GroupChatManager
+
+from config.logging import get_logger
+from orchestration.schedule import DEBATE_DEPENDENCIES, DEBATE_SCHEDULE, debate_stages
+
+logger = get_logger(__name__)
+
+
+class DebateGraphManager(GroupChatManager):
+    """
+    Group chat manager that runs the debate as a dependency graph
+
+    Steps are grouped into stages with ``debate_stages``: the agents of a
+    stage reply at the same time, each from the transcript of the earlier
+    stages, then their messages are added to the group chat and broadcast
+    in schedule order. The transcript has the same 11 messages, speakers
+    and order as a sequential debate; only the two openings and the two
+    final reports do not see each other.
+    A debate resumed with ``resume()`` continues after its last stored step.
+    """
+
+    def __init__(
+        self,
+        groupchat: GroupChat,
+        schedule: List[Tuple[str, str]] = DEBATE_SCHEDULE,
+        dependencies: Dict[int, Tuple[int, ...]] = DEBATE_DEPENDENCIES,
+        **kwargs: Any
+    ):
+        super().__init__(groupchat=groupchat, llm_config=False, **kwargs)
+        self.schedule = schedule
+        self.stages = debate_stages(schedule, dependencies)
+        self.replace_reply_func(GroupChatManager.run_chat, DebateGraphManager.run_graph)
+
+    def run_graph(
+        self,
+        messages: Optional[List[Dict[str, Any]]] = None,
+        sender: Optional[Agent] = None,
+        config: Optional[GroupChat] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """Run the debate stage by stage (replaces ``run_chat``)"""
+        if messages is None:
+            messages = self._oai_messages[sender]
+        groupchat = config
+        silent = getattr(self, "_silent", False)
+
+        if self.client_cache is not None:
+            for agent in groupchat.agents:
+                agent.previous_cache = agent.client_cache
+                agent.client_cache = self.client_cache
+        try:
+            # The debate instructions, or the last turn of a resumed debate
+            if self._publish(messages[-1], sender, groupchat):
+                return True, None
+
+            completed = len(groupchat.messages) - 1
+            for stage in self.stages:
+                steps = [step for step in stage if step > completed]
+                if not steps:
+                    continue
+                speakers = [groupchat.agent_by_name(self.schedule[step - 1][0]) for step in steps]
+                replies = self._generate_replies(speakers)
+                for speaker, reply in zip(speakers, replies):
+                    if reply is None:
+                        logger.warning("No reply generated, ending debate", agent=speaker.name)
+                        return True, None
+                    speaker.send(reply, self, request_reply=False, silent=silent)
+                    if self._publish(self.last_message(speaker), speaker, groupchat):
+                        return True, None
+        finally:
+            if self.client_cache is not None:
+                for agent in groupchat.agents:
+                    agent.client_cache = agent.previous_cache
+                    agent.previous_cache = None
+
+        return True, None
+
+    def _publish(self, message: Dict[str, Any], speaker: Agent, groupchat: GroupChat) -> bool:
+        """Add a message to the transcript and broadcast it; True when it ends the debate"""
+        groupchat.append(message, speaker)
+        for agent in groupchat.agents:
+            if agent != speaker:
+                self.send(message, agent, request_reply=False, silent=True)
+        return self._is_termination_msg(message)
+
+    def _generate_replies(self, speakers: List[Agent]) -> List[Any]:
+        """Replies of the agents of a stage, generated in parallel"""
+        if len(speakers) == 1:
+            return [speakers[0].generate_reply(sender=self)]
+
+        executor = ThreadPoolExecutor(max_workers=len(speakers), thread_name_prefix="debate-stage")
+        try:
+            futures = [executor.submit(speaker.generate_reply, sender=self) for speaker in speakers]
+            return [future.result() for future in futures]
+        finally:
+            # A debate timeout does not wait for the other replies of the stage
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -3,6 +3,8 @@ Main debate orchestrator for News Debate Synthesis AG2
 """
 import json
 import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from contextlib import contextmanager
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
@@ -14,18 +16,36 @@ from config.settings import get_settings
 from config.logging import get_logger
 # from orchestration.termination import DebateTerminationHandler  # Temporarily disabled
 from orchestration.analysis_parser import AnalysisParser
+from orchestration.checkpoint import CheckpointedGroupChat, DebateCheckpoint
+from orchestration.debate_graph import DebateGraphManager
+from orchestration.llm_cache import SQLiteLLMCache
+from orchestration.schedule import DEBATE_SCHEDULE, format_schedule, scheduled_speaker_selector
+from orchestration.token_budget import (
+    DebateUsage, TimeoutException, TokenBudgetExceeded, TokenCounter, merge_usage, prepare_agent
+)
 
 logger = get_logger(__name__)
 
 
-class TimeoutException(Exception):
-    """Exception raised when debate times out"""
+class DebateInterrupted(Exception):
+    """Raised when a debate ended early and its article was released to resume it"""
     pass
 
 
 @contextmanager
 def timeout(seconds: int):
-    """Context manager for handling timeouts"""
+    """
+    Context manager for handling timeouts
+
+    SIGALRM can only be handled in the main thread, so in the worker threads
+    of a concurrent batch this does nothing. There the debate's
+    ``DebateUsage`` deadline stops it before its next LLM request, and the
+    request in flight is bounded by the ``timeout`` of the agents' LLM config.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
     def signal_handler(signum, frame):
         raise TimeoutException(f"Timed out after {seconds} seconds")
     
@@ -42,15 +62,30 @@ def timeout(seconds: int):
 class DebateOrchestrator:
     """Main orchestrator for AG2 debate synthesis"""
     
-    def __init__(self):
+    def __init__(self, keep_connection: bool = False):
         self.settings = get_settings()
         self.db = NewsDebateDB()
+        # Long-running workers keep the MongoDB connection between batches
+        self.keep_connection = keep_connection
         # self.termination_handler = DebateTerminationHandler()  # Temporarily disabled
         self.analysis_parser = AnalysisParser()
         
+        self.token_counter = TokenCounter(self.settings.openai_model)
+        
         # Create agents
-        self.agents = DebateAgentFactory.create_all_agents()
+        self.agents = self._create_agents()
         self.user_proxy = DebateAgentFactory.create_user_proxy()
+        # Agents of the worker threads of a concurrent batch
+        self._thread_agents = threading.local()
+        
+        # Replayed debates (timeouts, parse failures, --reset) reuse stored completions
+        self.llm_cache = None
+        if self.settings.llm_cache_enabled:
+            self.llm_cache = SQLiteLLMCache(
+                self.settings.llm_cache_path,
+                ttl=self.settings.llm_cache_ttl,
+                max_bytes=self.settings.llm_cache_max_mb * 1024 * 1024
+            )
         
         logger.info("Debate orchestrator initialized")
     
@@ -88,8 +123,9 @@ class DebateOrchestrator:
                 title=news_title[:100]
             )
             
-            # Run the debate
-            result = self._run_debate_session(article_id, news_title, news_text, news_source, news_url)
+            # Run the debate, keeping the article's lease alive
+            with self.db.heartbeat([article_id]):
+                result = self._run_debate_session(article_id, news_title, news_text, news_source, news_url)
             
             if result:
                 logger.info("Article processed successfully", article_id=str(article_id))
@@ -99,26 +135,32 @@ class DebateOrchestrator:
                 self.db.mark_article_failed(article_id, "Debate processing failed")
                 return None
                 
+        except DebateInterrupted as e:
+            logger.warning("Debate interrupted", article_id=str(article_id), error=str(e))
+            return None
         except Exception as e:
             logger.error("Error processing article", error=str(e))
             if 'article_id' in locals():
                 self.db.mark_article_failed(article_id, str(e))
             return None
         finally:
-            self.db.close()
+            if not self.keep_connection:
+                self.db.close()
     
-    def process_batch(self, batch_size: Optional[int] = None) -> Dict[str, Any]:
+    def process_batch(self, batch_size: Optional[int] = None, concurrency: Optional[int] = None) -> Dict[str, Any]:
         """
         Process multiple articles in batch
         
         Args:
             batch_size: Number of articles to process. Uses settings default if None
+            concurrency: Number of debates run at the same time. Uses settings default if None
             
         Returns:
             Batch processing results
         """
         batch_size = batch_size or self.settings.batch_size
-        logger.info("Starting batch processing", batch_size=batch_size)
+        concurrency = concurrency or self.settings.debate_concurrency
+        logger.info("Starting batch processing", batch_size=batch_size, concurrency=concurrency)
         
         # Connect to database
         self.db.connect()
@@ -132,6 +174,7 @@ class DebateOrchestrator:
                 return {
                     'processed': 0,
                     'failed': 0,
+                    'interrupted': 0,
                     'total': 0,
                     'results': []
                 }
@@ -141,25 +184,36 @@ class DebateOrchestrator:
             # Process each article
             processed_count = 0
             failed_count = 0
+            interrupted_count = 0
             failed_article_ids = []
             results = []
             
-            for i, article in enumerate(articles, 1):
-                article_id = article['_id']
-                news_title = article.get('title', 'Untitled')
-                news_source = article.get('source', 'unknown')
-                
-                logger.info(
-                    "Processing batch article",
-                    progress=f"{i}/{len(articles)}",
-                    article_id=str(article_id),
-                    source=news_source
-                )
+            if concurrency > 1:
+                outcomes = self._run_concurrent_debates(articles, concurrency)
+            else:
+                outcomes = ((article, *self._run_batch_article(article)) for article in articles)
+            
+            # Leases of articles still waiting or being debated are renewed until the batch ends
+            with self.db.heartbeat([article['_id'] for article in articles]):
+                # Outcomes arrive as each debate finishes; its synthesis is already saved
+                for i, (article, status, result, error) in enumerate(outcomes, 1):
+                    article_id = article['_id']
+                    news_title = article.get('title', 'Untitled')
+                    news_source = article.get('source', 'unknown')
                 
-                try:
-                    result = self._run_single_debate_session(article)
-                    
-                    if result:
+                    if status == 'interrupted':
+                        # Released to be resumed from its checkpoint, not failed
+                        interrupted_count += 1
+                        results.append({
+                            'article_id': str(article_id),
+                            'status': 'interrupted',
+                            'title': news_title,
+                            'source': news_source,
+                            'error': error
+                        })
+                        logger.warning("Batch article interrupted", progress=f"{i}/{len(articles)}",
+                                       article_id=str(article_id), error=error)
+                    elif result:
                         processed_count += 1
                         results.append({
                             'article_id': str(article_id),
@@ -167,7 +221,8 @@ class DebateOrchestrator:
                             'title': news_title,
                             'source': news_source
                         })
-                        logger.info("Batch article completed", article_id=str(article_id))
+                        logger.info("Batch article completed", progress=f"{i}/{len(articles)}",
+                                    article_id=str(article_id))
                     else:
                         failed_count += 1
                         failed_article_ids.append(article_id)
@@ -176,22 +231,10 @@ class DebateOrchestrator:
                             'status': 'failed',
                             'title': news_title,
                             'source': news_source,
-                            'error': 'Processing returned None'
+                            'error': error or 'Processing returned None'
                         })
-                        logger.warning("Batch article failed", article_id=str(article_id))
-                        
-                except Exception as e:
-                    failed_count += 1
-                    failed_article_ids.append(article_id)
-                    error_msg = str(e)
-                    results.append({
-                        'article_id': str(article_id),
-                        'status': 'failed',
-                        'title': news_title,
-                        'source': news_source,
-                        'error': error_msg
-                    })
-                    logger.error("Batch article error", article_id=str(article_id), error=error_msg)
+                        logger.warning("Batch article failed", progress=f"{i}/{len(articles)}",
+                                       article_id=str(article_id), error=error)
             
             # Mark failed articles
             if failed_article_ids:
@@ -206,19 +249,72 @@ class DebateOrchestrator:
                 total=total_articles,
                 processed=processed_count,
                 failed=failed_count,
+                interrupted=interrupted_count,
                 success_rate=f"{success_rate:.1f}%"
             )
             
             return {
                 'processed': processed_count,
                 'failed': failed_count,
+                'interrupted': interrupted_count,
                 'total': total_articles,
                 'success_rate': success_rate,
                 'results': results
             }
             
         finally:
-            self.db.close()
+            if not self.keep_connection:
+                self.db.close()
+    
+    def _run_concurrent_debates(self, articles: List[Dict[str, Any]], concurrency: int):
+        """Run the debates of a batch in a thread pool, yielding outcomes as they finish"""
+        workers = min(concurrency, len(articles))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="debate") as pool:
+            futures = {pool.submit(self._run_batch_article, article): article for article in articles}
+            for future in as_completed(futures):
+                yield (futures[future], *future.result())
+    
+    def _run_batch_article(
+        self, article: Dict[str, Any]
+    ) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+        """Run the debate of a batch article, returning (status, result, error message)"""
+        logger.info(
+            "Processing batch article",
+            article_id=str(article['_id']),
+            source=article.get('source', 'unknown')
+        )
+        try:
+            result = self._run_single_debate_session(article)
+            return ('completed' if result else 'failed'), result, None
+        except DebateInterrupted as e:
+            return 'interrupted', None, str(e)
+        except Exception as e:
+            logger.error("Batch article error", article_id=str(article['_id']), error=str(e))
+            return 'failed', None, str(e)
+    
+    def _create_agents(self) -> List[Any]:
+        """Debate agents with their article token caps and usage accounting"""
+        agents = DebateAgentFactory.create_all_agents()
+        for agent in agents:
+            prepare_agent(agent, self.token_counter, self.settings.agent_article_tokens.get(agent.name))
+        return agents
+    
+    def _debate_agents(self) -> Tuple[List[Any], Any]:
+        """
+        Agents for a debate run in the current thread
+        
+        AG2 agents keep the conversation of the chat they are in, so debates
+        running at the same time must not share them. Each worker thread
+        creates its own set once and reuses it for its following debates.
+        """
+        if threading.current_thread() is threading.main_thread():
+            return self.agents, self.user_proxy
+        
+        local = self._thread_agents
+        if not hasattr(local, 'agents'):
+            local.agents = self._create_agents()
+            local.user_proxy = DebateAgentFactory.create_user_proxy()
+        return local.agents, local.user_proxy
     
     def _run_single_debate_session(self, article: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Run debate session for a single article (used in batch processing)"""
@@ -274,51 +370,148 @@ class DebateOrchestrator:
             
             return False
         
-        # Create GroupChat with proper termination condition
-        gc = GroupChat(
-            agents=self.agents,
-            messages=[],
-            max_round=self.settings.max_rounds,
-            allow_repeat_speaker=False,
-            # is_termination_msg=is_termination_msg
-        )
-        
-        # Create GroupChatManager with LLM config
-        mgr = GroupChatManager(
-            groupchat=gc,
-            llm_config={
-                "model": self.settings.openai_model,
-                "api_key": self.settings.openai_api_key,
-                "temperature": 0.7,
-            },
-            system_message="IMPORTANT: Once the AnalysisAgent has provided its final analysis, the debate is over. TERMINATE THE DEBATE IMMEDIATELY."
-        )
+        # Cap the article text, which every agent receives again with each turn
+        article_tokens = self.token_counter.count(news_text)
+        debate_text = self.token_counter.truncate(news_text, self.settings.article_max_tokens)
+        if debate_text != news_text:
+            logger.info(
+                "Article truncated",
+                article_id=str(article_id),
+                tokens=article_tokens,
+                max_tokens=self.settings.article_max_tokens
+            )
         
         # Create debate instructions
         debate_instructions = self._create_debate_instructions(
-            news_title, news_source, news_text
+            news_title, news_source, debate_text
         )
         
+        # Each turn is checkpointed; a retried debate continues from its last turn.
+        # The user proxy is the group chat admin so that resume() accepts the
+        # instructions it sent.
+        checkpoint = DebateCheckpoint(self.db, article_id, debate_instructions)
+        history = checkpoint.start()
+        
+        agents, user_proxy = self._debate_agents()
+        
+        if self.settings.speaker_selection in ("graph", "schedule"):
+            # Speakers follow DEBATE_SCHEDULE: one turn per step and no
+            # speaker selection call to the LLM before each turn
+            gc = CheckpointedGroupChat(
+                agents=agents,
+                messages=[],
+                max_round=len(DEBATE_SCHEDULE) + 1,
+                speaker_selection_method=scheduled_speaker_selector(),
+                admin_name=user_proxy.name,
+                on_append=checkpoint.save,
+            )
+            if self.settings.speaker_selection == "graph":
+                # Independent steps of the schedule run at the same time
+                mgr = DebateGraphManager(groupchat=gc)
+            else:
+                mgr = GroupChatManager(groupchat=gc, llm_config=False)
+        else:
+            # Create GroupChat with proper termination condition
+            gc = CheckpointedGroupChat(
+                agents=agents,
+                messages=[],
+                max_round=self.settings.max_rounds,
+                allow_repeat_speaker=False,
+                admin_name=user_proxy.name,
+                on_append=checkpoint.save,
+                # is_termination_msg=is_termination_msg
+            )
+            
+            # Create GroupChatManager with LLM config
+            mgr = GroupChatManager(
+                groupchat=gc,
+                llm_config={
+                    "model": self.settings.openai_model,
+                    "api_key": self.settings.openai_api_key,
+                    "temperature": 0.7,
+                    "timeout": self.settings.agent_timeout,
+                },
+                system_message="IMPORTANT: Once the AnalysisAgent has provided its final analysis, the debate is over. TERMINATE THE DEBATE IMMEDIATELY."
+            )
+        
         # Run the debate with timeout protection
         synth_msg = ""
         analysis_msg = ""
+        # The token budget covers every attempt of the debate
+        spent = merge_usage(checkpoint.earlier_usage)['total']
+        usage = DebateUsage(
+            self.settings.debate_max_tokens,
+            self.settings.max_debate_timeout,
+            spent_tokens=spent['prompt_tokens'] + spent['completion_tokens']
+        )
+        for agent in agents:
+            agent.debate_usage = usage
         
         try:
             with timeout(self.settings.max_debate_timeout):
-                result = self.user_proxy.initiate_chat(
-                    mgr,
-                    message=debate_instructions,
-                    max_turns=1
-                )
+                if history:
+                    logger.info(
+                        "Resuming debate from checkpoint",
+                        article_id=str(article_id),
+                        turns=len(history),
+                        attempt=checkpoint.attempt
+                    )
+                    instructions_msg = {'content': debate_instructions, 'role': 'user', 'name': user_proxy.name}
+                    last_speaker, last_message = mgr.resume(messages=[instructions_msg] + history)
+                    result = last_speaker.initiate_chat(
+                        mgr,
+                        message=last_message,
+                        clear_history=False,
+                        max_turns=1,
+                        cache=self.llm_cache
+                    )
+                else:
+                    result = user_proxy.initiate_chat(
+                        mgr,
+                        message=debate_instructions,
+                        max_turns=1,
+                        cache=self.llm_cache
+                    )
                 
         except TimeoutException as e:
             logger.warning("Debate timed out", article_id=str(article_id), error=str(e))
+        except TokenBudgetExceeded as e:
+            logger.warning("Debate stopped at token budget", article_id=str(article_id), error=str(e))
         except Exception as e:
             logger.error("Debate session error", article_id=str(article_id), error=str(e))
+        finally:
+            for agent in agents:
+                agent.debate_usage = None
+        
+        attempt_usage = {'attempt': checkpoint.attempt, **usage.summary()}
+        token_usage = {
+            **merge_usage(checkpoint.earlier_usage + [attempt_usage]),
+            'attempts': checkpoint.attempt,
+            'resumed_turns': checkpoint.resumed_turns,
+            'source': news_source,
+            'article_tokens': article_tokens,
+            'article_truncated': debate_text != news_text,
+            'tokenizer': self.token_counter.method
+        }
+        logger.info("Debate token usage", article_id=str(article_id), **token_usage['total'])
+        
+        if self.llm_cache is not None:
+            logger.info("LLM cache", article_id=str(article_id), **self.llm_cache.stats())
         
         # Extract synthesis and analysis from messages
         synth_msg, analysis_msg = self._extract_final_messages(gc.messages)
         
+        # A spent budget is final: resuming would only spend more
+        if not analysis_msg and not usage.exceeded and checkpoint.attempt < self.settings.debate_max_attempts:
+            # Keep the turns said so far for the next claim instead of saving a fallback
+            checkpoint.finish('interrupted', attempt_usage)
+            self.db.release_article(article_id)
+            raise DebateInterrupted(
+                f"Debate ended after {checkpoint.turns} turns (attempt {checkpoint.attempt} "
+                f"of {self.settings.debate_max_attempts}), released to resume"
+            )
+        checkpoint.finish('completed' if analysis_msg else 'incomplete', attempt_usage)
+        
         # Use fallbacks if messages are missing
         if not synth_msg:
             synth_msg = "Synthesis not completed - debate ended early"
@@ -342,13 +535,14 @@ class DebateOrchestrator:
         
         # Save to database
         try:
-            synthesis_id = self.db.save_synthesis(article_id, synthesis_data, analysis_data)
+            synthesis_id = self.db.save_synthesis(article_id, synthesis_data, analysis_data, token_usage)
             if synthesis_id:
                 return {
                     'article_id': article_id,
                     'synthesis_id': synthesis_id,
                     'synthesis': synthesis_data,
-                    'analysis': analysis_data
+                    'analysis': analysis_data,
+                    'token_usage': token_usage
                 }
             else:
                 return None
@@ -362,17 +556,7 @@ class DebateOrchestrator:
         return f"""
 We will now conduct a structured debate about this news article's accuracy. Follow this exact order and make sure each agent speaks in their respective role and step:
 
-1. Moderator: Present the news and explain the debate format
-2. Proponent: Opening statement (argue the news is TRUE and ACCURATE)
-3. Opponent: Opening statement (argue the news is FALSE or INACCURATE)  
-4. Proponent: Cross-examine the Opponent
-5. Opponent: Cross-examine the Proponent
-6. Proponent: Rebuttal defending the news accuracy
-7. Opponent: Rebuttal challenging the news accuracy
-8. Proponent: Closing statement on why the news is accurate
-9. Opponent: Closing statement on why the news is inaccurate
-10. SynthesisAgent: Provide EVALUATION REPORT (in spanish)
-11. AnalysisAgent: Provide final ANALYSIS REPORT (in spanish)
+{format_schedule()}
 
 Each agent should speak only once per step. Keep responses concise (≤{self.settings.max_words_per_message} words).
 
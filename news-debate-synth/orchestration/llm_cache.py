@@ -0,0 +1,194 @@
+"""
+Persistent LLM response cache for AG2 debate agents
+"""
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Expired and excess entries are purged once every this many writes
+PURGE_EVERY = 100
+
+
+def _digest(value: Any) -> str:
+    data = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def split_cache_key(key: Any) -> Tuple[Optional[str], Optional[float], str, str, str]:
+    """
+    Split an AG2 cache key into (model, temperature, system hash, history hash, params hash)
+
+    AG2 hands the cache the JSON-able parameters of the completion request,
+    without the API key and timeout. The system prompt and the message
+    history are hashed separately so entries can be inspected per agent.
+    Any other parameter (tools, response format...) goes into the params hash.
+    """
+    if not isinstance(key, dict):
+        return None, None, '', '', _digest(key)
+
+    params = dict(key)
+    model = params.pop('model', None)
+    temperature = params.pop('temperature', None)
+    messages = params.pop('messages', None) or []
+    system = [message for message in messages if message.get('role') == 'system']
+    history = [message for message in messages if message.get('role') != 'system']
+    return model, temperature, _digest(system), _digest(history), _digest(params)
+
+
+class SQLiteLLMCache:
+    """
+    AG2 ``AbstractCache`` storing completions in a local SQLite file
+
+    Pass it as ``cache=`` to ``initiate_chat``: the group chat manager hands
+    it to every agent of the debate. Entries older than ``ttl`` seconds are
+    ignored and purged, and once the file holds more than ``max_bytes`` of
+    responses the least recently used ones are evicted.
+
+    AG2 enters and exits the cache around every lookup, so exiting the
+    context keeps the connection open; ``close()`` releases it. A single
+    connection guarded by a lock is shared by the debates of a concurrent
+    batch.
+    """
+
+    def __init__(self, path: str, ttl: float, max_bytes: int):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                temperature REAL,
+                system_hash TEXT,
+                history_hash TEXT,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed_at ON llm_cache (accessed_at)")
+
+    def get(self, key: Any, default: Optional[Any] = None) -> Optional[Any]:
+        """Cached response for a completion request, or ``default``"""
+        parts = split_cache_key(key)
+        cache_key = _digest(parts)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM llm_cache WHERE key = ? AND created_at > ?",
+                (cache_key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE llm_cache SET accessed_at = ?, hits = hits + 1 WHERE key = ?",
+                (now, cache_key)
+            )
+
+        try:
+            value = pickle.loads(row[0])
+        except Exception as e:
+            logger.warning("Unreadable LLM cache entry", error=str(e))
+            return default
+
+        try:
+            # Lets usage accounting tell cached completions from paid ones
+            value.llm_cache_hit = True
+        except (AttributeError, TypeError, ValueError):
+            pass
+        return value
+
+    def set(self, key: Any, value: Any) -> None:
+        """Store the response of a completion request"""
+        try:
+            data = pickle.dumps(value)
+        except Exception as e:
+            logger.warning("LLM response could not be cached", error=str(e))
+            return
+
+        model, temperature, system_hash, history_hash, _ = parts = split_cache_key(key)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache "
+                "(key, model, temperature, system_hash, history_hash, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (_digest(parts), model, temperature, system_hash, history_hash, data, len(data), now, now)
+            )
+            self._writes += 1
+            if self._writes % PURGE_EVERY == 0:
+                self._purge(now)
+
+    def purge(self) -> int:
+        """Remove expired entries and evict the least recently used ones above ``max_bytes``"""
+        with self._lock:
+            return self._purge(time.time())
+
+    def _purge(self, now: float) -> int:
+        expired = self._conn.execute("DELETE FROM llm_cache WHERE created_at <= ?", (now - self.ttl,)).rowcount
+        # Keep the most recently used entries whose sizes add up to max_bytes
+        evicted = self._conn.execute(
+            """
+            DELETE FROM llm_cache WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS total FROM llm_cache
+                ) WHERE total > ?
+            )
+            """,
+            (self.max_bytes,)
+        ).rowcount
+        self.evictions += expired + evicted
+        return expired + evicted
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit and miss counters of this process, and the size of the cache"""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': entries,
+            'size_bytes': size
+        }
+
+    def close(self) -> None:
+        """Close the SQLite connection"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> 'SQLiteLLMCache':
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        # Kept open: AG2 exits the cache after every lookup
+        pass
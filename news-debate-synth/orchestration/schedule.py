@@ -0,0 +1,95 @@
+"""
+Fixed speaking order of the structured debate
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+from autogen import Agent, GroupChat
+
+# (agent name, task) for each step of the debate, in order
+DEBATE_SCHEDULE: List[Tuple[str, str]] = [
+    ("Moderator", "Present the news and explain the debate format"),
+    ("Proponent", "Opening statement (argue the news is TRUE and ACCURATE)"),
+    ("Opponent", "Opening statement (argue the news is FALSE or INACCURATE)"),
+    ("Proponent", "Cross-examine the Opponent"),
+    ("Opponent", "Cross-examine the Proponent"),
+    ("Proponent", "Rebuttal defending the news accuracy"),
+    ("Opponent", "Rebuttal challenging the news accuracy"),
+    ("Proponent", "Closing statement on why the news is accurate"),
+    ("Opponent", "Closing statement on why the news is inaccurate"),
+    ("SynthesisAgent", "Provide EVALUATION REPORT (in spanish)"),
+    ("AnalysisAgent", "Provide final ANALYSIS REPORT (in spanish)"),
+]
+
+# Steps (numbered from 1) whose messages each step answers. Both openings
+# only need the presentation, and the synthesis and analysis the closings.
+# From the cross-examinations to the closings each turn answers the one
+# before it, as in a sequential debate: the Opponent's cross-examination
+# answers the Proponent's questions, and each rebuttal and closing the
+# other side's.
+DEBATE_DEPENDENCIES: Dict[int, Tuple[int, ...]] = {
+    1: (),
+    2: (1,),
+    3: (1,),
+    4: (3,),
+    5: (4,),
+    6: (5,),
+    7: (6,),
+    8: (7,),
+    9: (8,),
+    10: (8, 9),
+    11: (8, 9),
+}
+
+
+def format_schedule(schedule: List[Tuple[str, str]] = DEBATE_SCHEDULE) -> str:
+    """Numbered list of the debate steps, as given to the agents"""
+    return "\n".join(f"{step}. {name}: {task}" for step, (name, task) in enumerate(schedule, 1))
+
+
+def scheduled_speaker_selector(
+    schedule: List[Tuple[str, str]] = DEBATE_SCHEDULE
+) -> Callable[[Agent, GroupChat], Optional[Agent]]:
+    """
+    Speaker selection function following the schedule
+
+    Used as the ``speaker_selection_method`` of a ``GroupChat``, it picks
+    the agent of the next step without asking the LLM. The first message of
+    the chat is the debate instructions, so the number of messages after it
+    is the number of steps already spoken. Once the schedule is over it
+    returns None, which ends the chat.
+    """
+    def select_speaker(last_speaker: Agent, groupchat: GroupChat) -> Optional[Agent]:
+        step = len(groupchat.messages) - 1
+        if step >= len(schedule):
+            return None
+        return groupchat.agent_by_name(schedule[step][0])
+
+    return select_speaker
+
+
+def debate_stages(
+    schedule: List[Tuple[str, str]] = DEBATE_SCHEDULE,
+    dependencies: Dict[int, Tuple[int, ...]] = DEBATE_DEPENDENCIES
+) -> List[List[int]]:
+    """
+    Group the steps of the schedule into stages that can run at the same time
+
+    Each step goes in the stage after the last of its dependencies, so the
+    steps of a stage only answer messages of earlier stages. A step may
+    only depend on earlier steps, and an agent may speak only once per stage.
+    """
+    level: Dict[int, int] = {}
+    for step in range(1, len(schedule) + 1):
+        deps = dependencies.get(step, ())
+        if any(dep >= step or dep < 1 for dep in deps):
+            raise ValueError(f"Step {step} depends on a step that does not precede it: {deps}")
+        level[step] = max((level[dep] + 1 for dep in deps), default=0)
+
+    stages: List[List[int]] = [[] for _ in range(max(level.values(), default=-1) + 1)]
+    for step, index in level.items():
+        stages[index].append(step)
+
+    for stage in stages:
+        speakers = [schedule[step - 1][0] for step in stage]
+        if len(set(speakers)) != len(speakers):
+            raise ValueError(f"An agent speaks more than once in stage {stage}")
+    return stages
@@ -0,0 +1,256 @@
+"""
+Token counting, article truncation, per-agent usage accounting and the
+limits of a debate
+"""
+import math
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config.logging import get_logger
+
+logger = get_logger(__name__)
+
+# The article text sits between these markers in the debate instructions
+ARTICLE_START = "Content: "
+ARTICLE_END = "\n\nBegin the debate now."
+
+TRUNCATION_MARK = " [...] "
+CHARS_PER_TOKEN = 4  # Heuristic when no tokenizer is available
+HEAD_SHARE = 0.75  # Part of a truncated article kept from its start
+
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?…])\s+')
+
+USAGE_FIELDS = ('calls', 'prompt_tokens', 'completion_tokens', 'cached_tokens', 'llm_cache_hits')
+
+
+class TokenBudgetExceeded(Exception):
+    """Raised before an LLM request once a debate has used its token budget"""
+    pass
+
+
+class TimeoutException(Exception):
+    """Exception raised when debate times out"""
+    pass
+
+
+class TokenCounter:
+    """
+    Count and truncate text in the tokens of a model
+
+    Uses tiktoken when the model's encoding can be loaded (it is downloaded
+    once and cached in ``TIKTOKEN_CACHE_DIR``), and about four characters
+    per token otherwise.
+    """
+
+    def __init__(self, model: str):
+        self.encoding = None
+        try:
+            import tiktoken
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            logger.warning("Tokenizer unavailable, estimating tokens from characters", model=model, error=str(e))
+
+    @property
+    def method(self) -> str:
+        return "tiktoken" if self.encoding is not None else "heuristic"
+
+    def count(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Shorten a text to about ``max_tokens`` tokens on sentence boundaries
+
+        The lead of a news story carries most of its facts, so whole
+        sentences are kept from the start for three quarters of the budget
+        and from the end for the rest, joined by a ``[...]`` mark.
+        """
+        if self.count(text) <= max_tokens:
+            return text
+
+        sentences = _SENTENCE_BREAK.split(text.strip())
+        budget = max_tokens - self.count(TRUNCATION_MARK)
+        head, used = [], 0
+        for sentence in sentences:
+            tokens = self.count(sentence)
+            if used + tokens > budget * HEAD_SHARE:
+                break
+            head.append(sentence)
+            used += tokens
+
+        if not head:
+            # A first sentence longer than the budget: cut it
+            return self._cut(text, budget) + TRUNCATION_MARK.rstrip()
+
+        tail = []
+        for sentence in reversed(sentences[len(head):]):
+            tokens = self.count(sentence)
+            if used + tokens > budget:
+                break
+            tail.append(sentence)
+            used += tokens
+
+        return " ".join(head) + TRUNCATION_MARK + " ".join(reversed(tail))
+
+    def _cut(self, text: str, max_tokens: int) -> str:
+        if self.encoding is not None:
+            return self.encoding.decode(self.encoding.encode(text, disallowed_special=())[:max_tokens])
+        return text[:max_tokens * CHARS_PER_TOKEN]
+
+
+class ArticleBudgetHook:
+    """
+    ``process_all_messages_before_reply`` hook capping the article text an agent sees
+
+    The debate instructions, with the article, are the first message of
+    every agent's history and are sent again with each of its turns. Agents
+    that mostly work from the debate itself are given a shorter article.
+    The stored history is not modified.
+    """
+
+    def __init__(self, counter: TokenCounter, max_tokens: int):
+        self.counter = counter
+        self.max_tokens = max_tokens
+        self._last = (None, None)
+
+    def __call__(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not messages:
+            return messages
+        content = messages[0].get("content")
+        if not isinstance(content, str) or ARTICLE_START not in content:
+            return messages
+
+        start = content.index(ARTICLE_START) + len(ARTICLE_START)
+        end = content.find(ARTICLE_END, start)
+        if end == -1:
+            return messages
+
+        article = content[start:end]
+        # The same article comes back on every turn
+        if self._last[0] != article:
+            self._last = (article, self.counter.truncate(article, self.max_tokens))
+        truncated = self._last[1]
+        if truncated == article:
+            return messages
+        return [{**messages[0], "content": content[:start] + truncated + content[end:]}] + messages[1:]
+
+
+class DebateUsage:
+    """
+    Token usage of one debate, per agent
+
+    ``cached_tokens`` are prompt tokens the provider served from its prompt
+    cache. Completions returned by the local LLM cache are only counted in
+    ``calls`` and ``llm_cache_hits``, since they cost nothing.
+
+    Args:
+        max_tokens: Prompt and completion tokens the debate may use (0: no limit)
+        timeout: Seconds the debate may run, counted from now (0: no limit)
+        spent_tokens: Tokens used by earlier attempts of the debate, counted
+            against ``max_tokens``
+    """
+
+    def __init__(self, max_tokens: int = 0, timeout: float = 0, spent_tokens: int = 0):
+        self.max_tokens = max_tokens
+        self.spent_tokens = spent_tokens
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.exceeded = False
+        self.agents: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def total_tokens(self) -> int:
+        with self._lock:
+            return sum(usage['prompt_tokens'] + usage['completion_tokens'] for usage in self.agents.values())
+
+    def check(self, agent_name: str) -> None:
+        """Refuse another request once the deadline has passed or the budget is spent"""
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise TimeoutException(f"Timed out after {self.timeout} seconds, before {agent_name}'s turn")
+        used = self.spent_tokens + self.total_tokens
+        if self.max_tokens and used >= self.max_tokens:
+            self.exceeded = True
+            raise TokenBudgetExceeded(
+                f"Debate used {used} tokens (budget {self.max_tokens}) before {agent_name}'s turn"
+            )
+
+    def record(self, agent_name: str, response: Any) -> None:
+        """Add the usage of a completion"""
+        usage = getattr(response, 'usage', None)
+        details = getattr(usage, 'prompt_tokens_details', None)
+        with self._lock:
+            entry = self.agents.setdefault(agent_name, {**dict.fromkeys(USAGE_FIELDS, 0), 'cost': 0.0})
+            entry['calls'] += 1
+            if getattr(response, 'llm_cache_hit', False):
+                entry['llm_cache_hits'] += 1
+                return
+            if usage is not None:
+                entry['prompt_tokens'] += usage.prompt_tokens or 0
+                entry['completion_tokens'] += usage.completion_tokens or 0
+                entry['cached_tokens'] += getattr(details, 'cached_tokens', 0) or 0
+            entry['cost'] += getattr(response, 'cost', 0) or 0
+
+    def summary(self) -> Dict[str, Any]:
+        """Per-agent and total usage, as stored with the synthesis"""
+        with self._lock:
+            agents = {name: dict(usage) for name, usage in self.agents.items()}
+        return {'agents': agents, 'total': _total_usage(agents), 'budget_exceeded': self.exceeded}
+
+
+def merge_usage(summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Add up the ``DebateUsage.summary()`` of the attempts of a debate"""
+    agents: Dict[str, Dict[str, Any]] = {}
+    for summary in summaries:
+        for name, usage in summary.get('agents', {}).items():
+            entry = agents.setdefault(name, {**dict.fromkeys(USAGE_FIELDS, 0), 'cost': 0.0})
+            for field in (*USAGE_FIELDS, 'cost'):
+                entry[field] += usage.get(field, 0)
+    return {
+        'agents': agents,
+        'total': _total_usage(agents),
+        'budget_exceeded': any(summary.get('budget_exceeded') for summary in summaries)
+    }
+
+
+def _total_usage(agents: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    total = {field: sum(usage[field] for usage in agents.values()) for field in USAGE_FIELDS}
+    total['cost'] = round(sum(usage['cost'] for usage in agents.values()), 6)
+    return total
+
+
+def prepare_agent(agent: Any, counter: TokenCounter, article_tokens: Optional[int] = None) -> None:
+    """
+    Add the article cap and usage accounting to an agent
+
+    Completions are recorded in the ``DebateUsage`` set as the agent's
+    ``debate_usage`` attribute for the debate in progress, which also stops
+    the agent's next request once the debate is over its deadline or budget.
+    The check runs in whichever thread makes the request, so the limits
+    hold in concurrent batches and parallel debate stages too.
+    """
+    if article_tokens:
+        agent.register_hook("process_all_messages_before_reply", ArticleBudgetHook(counter, article_tokens))
+
+    client = getattr(agent, 'client', None)
+    if client is None:
+        return
+    create = client.create
+
+    def tracked_create(**config: Any) -> Any:
+        usage = getattr(agent, 'debate_usage', None)
+        if usage is not None:
+            usage.check(agent.name)
+        response = create(**config)
+        if usage is not None:
+            usage.record(agent.name, response)
+        return response
+
+    client.create = tracked_create
@@ -0,0 +1,11 @@
+"""
+Pytest configuration: the tests import the package modules directly
+
+The package directory name is not a valid module name, so its root is put
+on ``sys.path`` and the tests import ``config``, ``database`` and
+``orchestration`` like ``__main__.py`` does.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -3,7 +3,7 @@ Tests for AnalysisParser
 """
 import pytest
 import json
-from news-debate-synth.orchestration.analysis_parser import AnalysisParser
+from orchestration.analysis_parser import AnalysisParser
 
 
 class TestAnalysisParser:
@@ -0,0 +1,76 @@
+"""
+Tests for debate checkpoints
+"""
+import pytest
+from unittest.mock import Mock
+from autogen import ConversableAgent
+from orchestration.checkpoint import CheckpointedGroupChat, DebateCheckpoint
+
+
+class TestDebateCheckpoint:
+    """Test cases for writing and reloading debate turns"""
+    
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.db = Mock()
+        self.checkpoint = DebateCheckpoint(self.db, 'a1', "Instructions")
+    
+    def test_new_debate_has_no_history(self):
+        """Test that a first attempt starts from the instructions"""
+        self.db.start_debate_session.return_value = {'attempts': 1, 'turns_completed': 0}
+        
+        assert self.checkpoint.start() == []
+        assert self.checkpoint.attempt == 1
+        self.db.get_debate_messages.assert_not_called()
+    
+    def test_retry_reloads_completed_turns(self):
+        """Test that the stored turns are returned as group chat messages"""
+        self.db.start_debate_session.return_value = {'attempts': 2, 'turns_completed': 2}
+        self.db.get_debate_messages.return_value = [
+            {'turn_index': 1, 'name': 'Moderator', 'role': 'user', 'content': 'Welcome', '_id': 'm1'},
+            {'turn_index': 2, 'name': 'Proponent', 'role': 'user', 'content': 'True', '_id': 'm2'},
+        ]
+        
+        history = self.checkpoint.start()
+        
+        assert history == [
+            {'content': 'Welcome', 'role': 'user', 'name': 'Moderator'},
+            {'content': 'True', 'role': 'user', 'name': 'Proponent'},
+        ]
+        assert self.checkpoint.attempt == 2
+        assert self.checkpoint.resumed_turns == 2
+    
+    def test_only_new_turns_are_saved(self):
+        """Test that the instructions and reloaded turns are not written again"""
+        self.db.start_debate_session.return_value = {'attempts': 2, 'turns_completed': 1}
+        self.db.get_debate_messages.return_value = [
+            {'turn_index': 1, 'name': 'Moderator', 'role': 'user', 'content': 'Welcome'}
+        ]
+        self.checkpoint.start()
+        agents = [ConversableAgent(name, llm_config=False) for name in ["Moderator", "Proponent"]]
+        groupchat = CheckpointedGroupChat(agents=agents, messages=[], on_append=self.checkpoint.save)
+        
+        groupchat.append({'content': 'Instructions', 'role': 'user'}, agents[0])
+        groupchat.append({'content': 'Welcome', 'role': 'user'}, agents[0])
+        groupchat.append({'content': 'True', 'role': 'user'}, agents[1])
+        
+        self.db.save_debate_message.assert_called_once_with(
+            'a1', 2, {'content': 'True', 'role': 'user', 'name': 'Proponent'}
+        )
+    
+    def test_attempt_usage_is_kept(self):
+        """Test that the usage of earlier attempts is loaded and the new one stored on finish"""
+        earlier = [{'attempt': 1, 'total': {'prompt_tokens': 900}}]
+        self.db.start_debate_session.return_value = {'attempts': 2, 'turns_completed': 0, 'attempt_usage': earlier}
+
+        self.checkpoint.start()
+        self.checkpoint.finish('interrupted', {'attempt': 2})
+
+        assert self.checkpoint.earlier_usage == earlier
+        self.db.finish_debate_session.assert_called_once_with('a1', 'interrupted', {'attempt': 2})
+
+    def test_instructions_hash_identifies_the_debate(self):
+        """Test that different instructions open a different session"""
+        other = DebateCheckpoint(self.db, 'a1', "Other instructions")
+        
+        assert other.instructions_hash != self.checkpoint.instructions_hash
@@ -0,0 +1,72 @@
+"""
+Tests for DebateDaemon
+"""
+import pytest
+from unittest.mock import MagicMock, Mock
+from pymongo.errors import OperationFailure
+from orchestration.daemon import DebateDaemon
+
+
+class TestDebateDaemon:
+    """Test cases for the long-running debate worker"""
+    
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.orchestrator = MagicMock()
+        self.stream = Mock()
+        self.orchestrator.db.articles_collection.watch.return_value = self.stream
+        self.daemon = DebateDaemon(self.orchestrator, batch_size=5, poll_interval=0.01, max_idle=0.04)
+    
+    def test_work_is_processed_without_waiting(self):
+        """Test that a batch with articles is followed by another batch right away"""
+        self.orchestrator.process_batch.return_value = {'total': 3}
+        
+        self.daemon.run_once()
+        
+        self.orchestrator.process_batch.assert_called_once_with(5, None)
+        self.stream.try_next.assert_not_called()
+        self.stream.close.assert_called_once()
+    
+    def test_change_stream_wakes_the_daemon(self):
+        """Test that an insert event ends the wait"""
+        self.orchestrator.process_batch.return_value = {'total': 0}
+        self.stream.try_next.side_effect = [None, {'operationType': 'insert'}]
+        
+        self.daemon.run_once()
+        
+        assert self.stream.try_next.call_count == 2
+    
+    def test_polling_fallback_backs_off(self):
+        """Test that a standalone server falls back to polling with a growing delay"""
+        self.orchestrator.db.articles_collection.watch.side_effect = OperationFailure(
+            "The $changeStream stage is only supported on replica sets", code=40573
+        )
+        self.orchestrator.process_batch.return_value = {'total': 0}
+        
+        self.daemon.run_once()
+        self.daemon.run_once()
+        
+        assert self.daemon.use_change_streams is False
+        assert self.orchestrator.db.articles_collection.watch.call_count == 1
+        assert self.daemon.idle_delay == 0.04
+        
+        self.orchestrator.process_batch.return_value = {'total': 1}
+        self.daemon.run_once()
+        assert self.daemon.idle_delay == 0.01
+    
+    def test_errors_do_not_stop_the_daemon(self):
+        """Test that a failing batch is retried after a delay"""
+        self.orchestrator.process_batch.side_effect = RuntimeError("connection refused")
+        
+        self.daemon.run_once()
+        
+        assert self.daemon.idle_delay == 0.02
+    
+    def test_stop_closes_connection(self):
+        """Test that a stopped daemon leaves its loop and closes the database"""
+        self.orchestrator.process_batch.side_effect = lambda *args: self.daemon.stop() or {'total': 1}
+        
+        self.daemon.run()
+        
+        self.orchestrator.process_batch.assert_called_once()
+        self.orchestrator.db.close.assert_called_once()
@@ -0,0 +1,164 @@
+"""
+Tests for NewsDebateDB article leases and debate checkpoints
+"""
+import pytest
+import time
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+from database.db_client import NewsDebateDB
+
+
+class TestArticleLeases:
+    """Test cases for lease-based article claiming"""
+    
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.db = NewsDebateDB(worker_id='worker-a')
+        self.db.articles_collection = Mock()
+        self.db.synthesis_collection = Mock()
+    
+    def test_claim_is_atomic_and_leased(self):
+        """Test that an article is claimed with a single find_one_and_update holding a lease"""
+        self.db.articles_collection.find_one_and_update.return_value = {'_id': 'a1', 'claim_count': 1}
+        
+        article = self.db.claim_article()
+        
+        query, update = self.db.articles_collection.find_one_and_update.call_args[0]
+        assert article['_id'] == 'a1'
+        assert {'status': 'new'} in query['$or']
+        assert update['$set']['worker_id'] == 'worker-a'
+        assert update['$set']['lease_expires_at'] - update['$set']['processing_started_at'] == self.db.lease
+    
+    def test_expired_leases_are_claimable(self):
+        """Test that processing articles become claimable once their lease has expired"""
+        now = datetime(2024, 5, 2, 12, 0)
+        
+        query = self.db._claimable_query(now)
+        
+        assert {'status': 'processing', 'lease_expires_at': {'$lte': now}} in query['$or']
+    
+    def test_batch_claims_each_article(self):
+        """Test that a batch stops claiming when no article is left"""
+        self.db.articles_collection.find_one_and_update.side_effect = [
+            {'_id': 'a1', 'claim_count': 1},
+            {'_id': 'a2', 'claim_count': 2},
+            None
+        ]
+        
+        articles = self.db.get_unprocessed_articles_batch(5)
+        
+        assert [article['_id'] for article in articles] == ['a1', 'a2']
+        assert self.db.articles_collection.find_one_and_update.call_count == 3
+    
+    def test_renew_only_own_leases(self):
+        """Test that renewals only extend leases held by this worker"""
+        self.db.articles_collection.update_many.return_value = Mock(modified_count=1)
+        
+        assert self.db.renew_leases(['a1']) == 1
+        
+        query, update = self.db.articles_collection.update_many.call_args[0]
+        assert query['worker_id'] == 'worker-a'
+        assert query['status'] == 'processing'
+        assert update['$set']['lease_expires_at'] > datetime.utcnow() + self.db.lease - timedelta(seconds=5)
+    
+    def test_lost_lease_discards_synthesis(self):
+        """Test that a synthesis is discarded when another worker reclaimed the article"""
+        self.db.synthesis_collection.insert_one.return_value = Mock(inserted_id='s1')
+        self.db.articles_collection.update_one.return_value = Mock(matched_count=0)
+        
+        result = self.db.save_synthesis('6630c0ffee0000000000a001', {'verdict': 'True'}, {'prob_true': 0.9})
+        
+        assert result is None
+        self.db.synthesis_collection.delete_one.assert_called_once_with({'_id': 's1'})
+    
+    def test_heartbeat_renews_until_exit(self):
+        """Test that the heartbeat thread renews leases periodically and stops on exit"""
+        self.db.renew_leases = Mock()
+        self.db.heartbeat_interval = 0.01
+        
+        with self.db.heartbeat(['a1']):
+            time.sleep(0.05)
+        calls = self.db.renew_leases.call_count
+        time.sleep(0.03)
+        
+        assert calls >= 2
+        assert self.db.renew_leases.call_count == calls
+        self.db.renew_leases.assert_called_with(['a1'])
+
+
+class TestDebateCheckpoints:
+    """Test cases for debate sessions and turn checkpoints"""
+    
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.db = NewsDebateDB(worker_id='worker-a')
+        self.db.articles_collection = Mock()
+        self.db.debate_messages_collection = Mock()
+        self.db.debate_sessions_collection = Mock()
+        self.article_id = '6630c0ffee0000000000a001'
+    
+    def test_interrupted_session_keeps_its_turns(self):
+        """Test that a session with the same instructions is reopened with its turns"""
+        self.db.debate_sessions_collection.find_one.return_value = {
+            'instructions_hash': 'h1', 'status': 'interrupted', 'attempts': 1
+        }
+        
+        self.db.start_debate_session(self.article_id, 'h1')
+        
+        _, update = self.db.debate_sessions_collection.find_one_and_update.call_args[0]
+        assert update['$inc'] == {'attempts': 1}
+        self.db.debate_messages_collection.delete_many.assert_not_called()
+    
+    def test_changed_instructions_restart_the_debate(self):
+        """Test that turns debated from other instructions are discarded"""
+        self.db.debate_sessions_collection.find_one.return_value = {
+            'instructions_hash': 'h1', 'status': 'interrupted', 'attempts': 2
+        }
+        
+        self.db.start_debate_session(self.article_id, 'h2')
+        
+        _, update = self.db.debate_sessions_collection.find_one_and_update.call_args[0]
+        assert update['$set']['turns_completed'] == 0
+        assert update['$set']['attempts'] == 1
+        assert update['$set']['attempt_usage'] == []
+        assert self.db.debate_messages_collection.delete_many.call_count == 1
+    
+    def test_finish_appends_attempt_usage(self):
+        """Test that the token usage of an attempt is pushed onto the session"""
+        self.db.finish_debate_session(self.article_id, 'interrupted', {'attempt': 1, 'total': {}})
+
+        _, update = self.db.debate_sessions_collection.update_one.call_args[0]
+        assert update['$set']['status'] == 'interrupted'
+        assert update['$push'] == {'attempt_usage': {'attempt': 1, 'total': {}}}
+
+    def test_turn_is_written_once(self):
+        """Test that a turn is upserted on (article_id, turn_index) without overwriting it"""
+        self.db.save_debate_message(self.article_id, 3, {'name': 'Opponent', 'role': 'user', 'content': 'No.'})
+        
+        query, update = self.db.debate_messages_collection.update_one.call_args[0]
+        assert query['turn_index'] == 3
+        assert update['$setOnInsert']['name'] == 'Opponent'
+        assert self.db.debate_messages_collection.update_one.call_args[1] == {'upsert': True}
+        _, session_update = self.db.debate_sessions_collection.update_one.call_args[0]
+        assert session_update['$max'] == {'turns_completed': 3}
+    
+    def test_history_stops_at_missing_turn(self):
+        """Test that only contiguous turns are resumed"""
+        self.db.debate_messages_collection.find.return_value.sort.return_value = [
+            {'turn_index': 1}, {'turn_index': 2}, {'turn_index': 4}
+        ]
+        
+        messages = self.db.get_debate_messages(self.article_id)
+        
+        assert [message['turn_index'] for message in messages] == [1, 2]
+    
+    def test_released_article_is_claimable(self):
+        """Test that a released article is set back to new and loses its lease"""
+        self.db.articles_collection.update_one.return_value = Mock(modified_count=1)
+        
+        assert self.db.release_article(self.article_id) is True
+        
+        query, update = self.db.articles_collection.update_one.call_args[0]
+        assert query['worker_id'] == {'$in': ['worker-a', None]}
+        assert update['$set'] == {'status': 'new'}
+        assert 'lease_expires_at' in update['$unset']
@@ -0,0 +1,53 @@
+"""
+Tests for the parallel debate engine
+"""
+import pytest
+import threading
+from autogen import Agent, ConversableAgent, GroupChat
+from orchestration.debate_graph import DebateGraphManager
+from orchestration.schedule import DEBATE_SCHEDULE
+
+
+class TestDebateGraphManager:
+    """Test cases for running the debate stage by stage"""
+    
+    def setup_method(self):
+        """Setup agents that reply with the number of messages they saw"""
+        self.barrier = threading.Barrier(2, timeout=5)
+        # Messages seen by the openings and by the final reports
+        self.paired = {2, 10}
+        self.agents = []
+        for name in ["Moderator", "Proponent", "Opponent", "SynthesisAgent", "AnalysisAgent"]:
+            agent = ConversableAgent(name, llm_config=False, human_input_mode="NEVER")
+            agent.register_reply([Agent, None], self.reply)
+            self.agents.append(agent)
+        self.user = ConversableAgent("User", llm_config=False, human_input_mode="NEVER")
+        self.groupchat = GroupChat(agents=self.agents, messages=[], max_round=len(DEBATE_SCHEDULE) + 1)
+        self.manager = DebateGraphManager(groupchat=self.groupchat)
+    
+    def reply(self, recipient, messages=None, sender=None, config=None):
+        """Reply once the other agent of a parallel stage is replying too"""
+        if len(messages) in self.paired:
+            # Fails with BrokenBarrierError unless both agents reply at the same time
+            self.barrier.wait()
+        return True, f"{recipient.name} saw {len(messages)}"
+    
+    def test_transcript_follows_the_schedule(self):
+        """Test that the transcript has one message per step, in schedule order"""
+        self.user.initiate_chat(self.manager, message="Instructions", max_turns=1)
+        
+        speakers = [message["name"] for message in self.groupchat.messages]
+        
+        assert speakers == ["User"] + [name for name, _ in DEBATE_SCHEDULE]
+    
+    def test_stage_replies_see_only_earlier_stages(self):
+        """Test that both openings are written from the presentation alone and later turns answer the previous one"""
+        self.user.initiate_chat(self.manager, message="Instructions", max_turns=1)
+        
+        contents = [message["content"] for message in self.groupchat.messages]
+        
+        assert contents[2] == "Proponent saw 2"
+        assert contents[3] == "Opponent saw 2"
+        assert contents[5] == "Opponent saw 5"
+        assert contents[9] == "Opponent saw 9"
+        assert contents[-1] == "AnalysisAgent saw 10"
@@ -0,0 +1,85 @@
+"""
+Tests for SQLiteLLMCache
+"""
+import pytest
+import os
+import tempfile
+import time
+from orchestration.llm_cache import SQLiteLLMCache, split_cache_key
+
+
+def request(history, system="You are the Moderator", temperature=0.7):
+    """Build the completion parameters AG2 uses as a cache key"""
+    return {
+        'model': 'gpt-4o-mini',
+        'temperature': temperature,
+        'messages': [{'role': 'system', 'content': system}] + [{'role': 'user', 'content': h} for h in history]
+    }
+
+
+class TestSQLiteLLMCache:
+    """Test cases for the persistent LLM response cache"""
+    
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'llm_cache.sqlite3')
+        self.cache = SQLiteLLMCache(self.path, ttl=3600, max_bytes=1024 * 1024)
+    
+    def teardown_method(self):
+        """Remove the cache file"""
+        self.cache.close()
+        self.tmpdir.cleanup()
+    
+    def test_key_parts(self):
+        """Test that system prompt and history are hashed separately"""
+        model, temperature, system_hash, history_hash, _ = split_cache_key(request(['Hola']))
+        other = split_cache_key(request(['Hola'], system="You are the Opponent"))
+        
+        assert (model, temperature) == ('gpt-4o-mini', 0.7)
+        assert other[2] != system_hash
+        assert other[3] == history_hash
+    
+    def test_hit_and_miss(self):
+        """Test that a stored response is returned only for the same request"""
+        self.cache.set(request(['Hola']), {'content': 'respuesta'})
+        
+        assert self.cache.get(request(['Hola'])) == {'content': 'respuesta'}
+        assert self.cache.get(request(['Hola'], temperature=0.2)) is None
+        assert self.cache.get(request(['Hola', 'Otra']), 'default') == 'default'
+        assert self.cache.stats()['hits'] == 1
+        assert self.cache.stats()['misses'] == 2
+    
+    def test_survives_exit_and_restart(self):
+        """Test that the cache stays usable after AG2 exits it and persists across processes"""
+        with self.cache as cache:
+            cache.set(request(['Hola']), 'respuesta')
+        
+        assert self.cache.get(request(['Hola'])) == 'respuesta'
+        
+        reopened = SQLiteLLMCache(self.path, ttl=3600, max_bytes=1024 * 1024)
+        assert reopened.get(request(['Hola'])) == 'respuesta'
+        reopened.close()
+    
+    def test_ttl_expiry(self):
+        """Test that expired entries are ignored and purged"""
+        self.cache.ttl = 0.05
+        self.cache.set(request(['Hola']), 'respuesta')
+        time.sleep(0.1)
+        
+        assert self.cache.get(request(['Hola'])) is None
+        assert self.cache.purge() == 1
+    
+    def test_size_eviction_keeps_recent_entries(self):
+        """Test that the least recently used entries are evicted above the size limit"""
+        for i in range(5):
+            self.cache.set(request([f'Mensaje {i}']), 'x' * 1000)
+            time.sleep(0.01)
+        self.cache.get(request(['Mensaje 0']))
+        self.cache.max_bytes = 2500
+        
+        self.cache.purge()
+        
+        assert self.cache.stats()['entries'] == 2
+        assert self.cache.get(request(['Mensaje 0'])) is not None
+        assert self.cache.get(request(['Mensaje 4'])) is not None
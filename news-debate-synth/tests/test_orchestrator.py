@@ -2,16 +2,19 @@
 Tests for DebateOrchestrator
 """
 import pytest
-from unittest.mock import Mock, patch
-from news-debate-synth.orchestration.debate_orchestrator import DebateOrchestrator
+import threading
+from unittest.mock import MagicMock, Mock, patch
+from config.settings import get_settings
+from orchestration.debate_orchestrator import DebateInterrupted, DebateOrchestrator, timeout
 
 
 class TestDebateOrchestrator:
     """Test cases for DebateOrchestrator"""
     
     def setup_method(self):
-        """Setup test fixtures"""
-        self.orchestrator = DebateOrchestrator()
+        """Setup test fixtures, without writing an LLM cache file"""
+        with patch.object(get_settings(), 'llm_cache_enabled', False):
+            self.orchestrator = DebateOrchestrator()
     
     def test_orchestrator_initialization(self):
         """Test orchestrator initializes correctly"""
@@ -20,7 +23,7 @@ class TestDebateOrchestrator:
         assert len(self.orchestrator.agents) == 5
         assert self.orchestrator.user_proxy is not None
     
-    @patch('news-debate-synth.orchestration.debate_orchestrator.NewsDebateDB')
+    @patch('orchestration.debate_orchestrator.NewsDebateDB')
     def test_process_single_article_no_articles(self, mock_db_class):
         """Test processing when no articles are available"""
         mock_db = Mock()
@@ -86,3 +89,94 @@ class TestDebateOrchestrator:
         
         assert synth_msg == ""
         assert analysis_msg == ""
+    
+    def test_concurrent_batch(self):
+        """Test that a concurrent batch runs debates in parallel with separate agents"""
+        self.orchestrator.db = MagicMock()
+        self.orchestrator.db.get_unprocessed_articles_batch.return_value = [
+            {'_id': i, 'title': f'Title {i}', 'source': 'test'} for i in range(4)
+        ]
+        agent_sets = set()
+        all_started = threading.Barrier(4, timeout=10)
+        
+        def run_debate(article):
+            agents, _ = self.orchestrator._debate_agents()
+            agent_sets.add(id(agents))
+            # Only returns once all four debates are running at the same time
+            all_started.wait()
+            if article['_id'] == 3:
+                raise RuntimeError("LLM error")
+            return {'article_id': article['_id']}
+        
+        self.orchestrator._run_single_debate_session = run_debate
+        
+        results = self.orchestrator.process_batch(batch_size=4, concurrency=4)
+        
+        assert results['processed'] == 3
+        assert results['failed'] == 1
+        assert len(agent_sets) == 4
+        assert id(self.orchestrator.agents) not in agent_sets
+        self.orchestrator.db.mark_articles_batch_failed.assert_called_once_with([3], "Batch processing failed")
+    
+    def test_interrupted_batch_article_is_not_failed(self):
+        """Test that an article released to resume its debate is not marked failed"""
+        self.orchestrator.db = MagicMock()
+        self.orchestrator.db.get_unprocessed_articles_batch.return_value = [
+            {'_id': i, 'title': f'Title {i}', 'source': 'test'} for i in range(2)
+        ]
+        
+        def run_debate(article):
+            if article['_id'] == 1:
+                raise DebateInterrupted("Debate ended after 4 turns")
+            return {'article_id': article['_id']}
+        
+        self.orchestrator._run_single_debate_session = run_debate
+        
+        results = self.orchestrator.process_batch(batch_size=2)
+        
+        assert results['processed'] == 1
+        assert results['interrupted'] == 1
+        assert results['failed'] == 0
+        self.orchestrator.db.mark_articles_batch_failed.assert_not_called()
+    
+    def test_budget_stop_is_final(self):
+        """Test that a debate stopped by its token budget saves the fallback instead of resuming"""
+        self.orchestrator.db = MagicMock()
+        earlier = {'attempt': 1, 'agents': {'Proponent': {'calls': 1, 'prompt_tokens': 200000, 'cost': 0.5}},
+                   'budget_exceeded': False}
+        self.orchestrator.db.start_debate_session.return_value = {
+            'attempts': 2, 'turns_completed': 0, 'attempt_usage': [earlier]
+        }
+        agents = self.orchestrator.agents
+        
+        def spend_budget(*args, **kwargs):
+            agents[0].debate_usage.check(agents[0].name)
+        
+        with patch.object(self.orchestrator.user_proxy, 'initiate_chat', side_effect=spend_budget):
+            self.orchestrator._run_debate_session('a1', 'Title', 'Text.', 'test', 'https://example.com/')
+        
+        self.orchestrator.db.release_article.assert_not_called()
+        article_id, status, attempt_usage = self.orchestrator.db.finish_debate_session.call_args[0]
+        assert status == 'incomplete'
+        assert attempt_usage['attempt'] == 2
+        assert attempt_usage['budget_exceeded'] is True
+        token_usage = self.orchestrator.db.save_synthesis.call_args[0][3]
+        assert token_usage['total']['prompt_tokens'] == 200000
+        assert token_usage['attempts'] == 2
+    
+    def test_timeout_is_skipped_in_worker_threads(self):
+        """Test that the SIGALRM timeout does nothing outside the main thread"""
+        errors = []
+        
+        def run():
+            try:
+                with timeout(1):
+                    pass
+            except Exception as e:
+                errors.append(e)
+        
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        
+        assert errors == []
@@ -0,0 +1,58 @@
+"""
+Tests for the fixed debate schedule
+"""
+import pytest
+from autogen import ConversableAgent, GroupChat
+from orchestration.schedule import (
+    DEBATE_SCHEDULE, debate_stages, format_schedule, scheduled_speaker_selector
+)
+
+
+class TestDebateSchedule:
+    """Test cases for scheduled speaker selection"""
+    
+    def setup_method(self):
+        """Setup test fixtures"""
+        names = ["Moderator", "Proponent", "Opponent", "SynthesisAgent", "AnalysisAgent"]
+        self.agents = [ConversableAgent(name, llm_config=False) for name in names]
+        self.groupchat = GroupChat(agents=self.agents, messages=[], max_round=len(DEBATE_SCHEDULE) + 1)
+        self.select = scheduled_speaker_selector()
+    
+    def test_speakers_follow_the_schedule(self):
+        """Test that every step goes to its agent and the chat ends after the last one"""
+        self.groupchat.messages.append({"name": "User", "content": "Instructions"})
+        speakers = []
+        
+        while True:
+            speaker = self.select(None, self.groupchat)
+            if speaker is None:
+                break
+            speakers.append(speaker.name)
+            self.groupchat.messages.append({"name": speaker.name, "content": "..."})
+        
+        assert speakers == [name for name, _ in DEBATE_SCHEDULE]
+    
+    def test_instructions_list_every_step(self):
+        """Test that the instructions are numbered in schedule order"""
+        lines = format_schedule().splitlines()
+        
+        assert len(lines) == len(DEBATE_SCHEDULE)
+        assert lines[0].startswith("1. Moderator:")
+        assert lines[-1].startswith("11. AnalysisAgent:")
+
+    
+    def test_independent_steps_share_a_stage(self):
+        """Test that only the openings and the final reports run together"""
+        assert debate_stages() == [[1], [2, 3], [4], [5], [6], [7], [8], [9], [10, 11]]
+    
+    def test_dependencies_must_precede_the_step(self):
+        """Test that a dependency on a later step is refused"""
+        with pytest.raises(ValueError):
+            debate_stages(DEBATE_SCHEDULE[:3], {1: (), 2: (3,), 3: (1,)})
+    
+    def test_agent_speaks_once_per_stage(self):
+        """Test that two steps of the same agent cannot share a stage"""
+        schedule = [("Moderator", "Present"), ("Proponent", "Open"), ("Proponent", "Again")]
+        
+        with pytest.raises(ValueError):
+            debate_stages(schedule, {1: (), 2: (1,), 3: (1,)})
@@ -0,0 +1,200 @@
+"""
+Tests for token counting, article truncation and usage accounting
+"""
+import pytest
+from types import SimpleNamespace
+from unittest.mock import Mock
+from orchestration.token_budget import (
+    ARTICLE_END, ARTICLE_START, TRUNCATION_MARK, ArticleBudgetHook, DebateUsage,
+    TimeoutException, TokenBudgetExceeded, TokenCounter, merge_usage, prepare_agent
+)
+
+
+def heuristic_counter():
+    """Token counter that estimates four characters per token"""
+    counter = TokenCounter.__new__(TokenCounter)
+    counter.encoding = None
+    return counter
+
+
+def completion(prompt_tokens, completion_tokens, cached_tokens=0, cost=0.0):
+    """Completion response with usage, as returned by the OpenAI client"""
+    return SimpleNamespace(
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=cached_tokens)
+        ),
+        cost=cost
+    )
+
+
+ARTICLE = " ".join(f"Sentence number {i} of the article." for i in range(100))
+
+
+class TestTokenCounter:
+    """Test cases for counting and truncation"""
+
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.counter = heuristic_counter()
+
+    def test_short_text_is_unchanged(self):
+        """Test that a text within the budget is returned as is"""
+        assert self.counter.truncate("A short article.", 100) == "A short article."
+
+    def test_truncation_keeps_lead_and_end(self):
+        """Test that whole sentences are kept from the start and the end"""
+        truncated = self.counter.truncate(ARTICLE, 200)
+        head, tail = truncated.split(TRUNCATION_MARK)
+
+        assert self.counter.count(truncated) <= 200
+        assert head.startswith("Sentence number 0 of the article.")
+        assert head.endswith(".")
+        assert tail.endswith("Sentence number 99 of the article.")
+        assert self.counter.count(head) > self.counter.count(tail)
+
+    def test_long_first_sentence_is_cut(self):
+        """Test that a single sentence over the budget is cut"""
+        truncated = self.counter.truncate("word " * 1000, 50)
+
+        assert truncated.endswith(TRUNCATION_MARK.rstrip())
+        assert self.counter.count(truncated) <= 50
+
+
+class TestArticleBudgetHook:
+    """Test cases for the per-agent article cap"""
+
+    def test_article_in_instructions_is_truncated(self):
+        """Test that only the article of the first message is shortened"""
+        counter = heuristic_counter()
+        hook = ArticleBudgetHook(counter, 100)
+        instructions = f"Title: T\n{ARTICLE_START}{ARTICLE}{ARTICLE_END}"
+        messages = [{'role': 'user', 'content': instructions}, {'role': 'user', 'content': ARTICLE}]
+
+        result = hook(messages)
+
+        assert TRUNCATION_MARK in result[0]['content']
+        assert result[0]['content'].endswith(ARTICLE_END)
+        assert result[1] is messages[1]
+        assert messages[0]['content'] == instructions
+
+    def test_other_messages_are_unchanged(self):
+        """Test that histories without the instructions are passed through"""
+        hook = ArticleBudgetHook(heuristic_counter(), 100)
+        messages = [{'role': 'user', 'content': ARTICLE}]
+
+        assert hook(messages) is messages
+
+
+class TestDebateUsage:
+    """Test cases for per-agent usage accounting"""
+
+    def test_usage_is_summed_per_agent(self):
+        """Test that prompt, completion and cached tokens are recorded"""
+        usage = DebateUsage()
+        usage.record("Proponent", completion(1000, 100, cached_tokens=512, cost=0.001))
+        usage.record("Proponent", completion(1200, 80))
+        usage.record("Opponent", completion(900, 120))
+
+        summary = usage.summary()
+
+        assert summary['agents']['Proponent']['calls'] == 2
+        assert summary['agents']['Proponent']['prompt_tokens'] == 2200
+        assert summary['agents']['Proponent']['cached_tokens'] == 512
+        assert summary['total']['completion_tokens'] == 300
+        assert summary['total']['cost'] == 0.001
+        assert summary['budget_exceeded'] is False
+
+    def test_local_cache_hits_cost_nothing(self):
+        """Test that completions from the LLM cache are not counted as tokens"""
+        usage = DebateUsage()
+        response = completion(1000, 100)
+        response.llm_cache_hit = True
+        usage.record("Moderator", response)
+
+        agent = usage.summary()['agents']['Moderator']
+
+        assert agent['calls'] == 1
+        assert agent['llm_cache_hits'] == 1
+        assert agent['prompt_tokens'] == 0
+
+    def test_budget_stops_next_request(self):
+        """Test that a spent budget refuses the next request"""
+        usage = DebateUsage(max_tokens=1000)
+        usage.check("Proponent")
+        usage.record("Proponent", completion(900, 100))
+
+        with pytest.raises(TokenBudgetExceeded):
+            usage.check("Opponent")
+        assert usage.summary()['budget_exceeded'] is True
+
+    def test_earlier_attempts_count_against_budget(self):
+        """Test that the tokens of earlier attempts are part of the budget"""
+        usage = DebateUsage(max_tokens=1000, spent_tokens=800)
+        usage.check("Proponent")
+        usage.record("Proponent", completion(150, 50))
+
+        with pytest.raises(TokenBudgetExceeded):
+            usage.check("Opponent")
+
+    def test_attempts_are_merged(self):
+        """Test that the usage of several attempts is summed per agent"""
+        first = DebateUsage()
+        first.record("Proponent", completion(1000, 100, cost=0.001))
+        second = DebateUsage()
+        second.record("Proponent", completion(500, 50, cost=0.002))
+        second.record("Opponent", completion(400, 40))
+
+        merged = merge_usage([{'attempt': 1, **first.summary()}, {'attempt': 2, **second.summary()}])
+
+        assert merged['agents']['Proponent']['calls'] == 2
+        assert merged['agents']['Proponent']['prompt_tokens'] == 1500
+        assert merged['total']['completion_tokens'] == 190
+        assert merged['total']['cost'] == 0.003
+        assert merged['budget_exceeded'] is False
+
+    def test_deadline_stops_next_request(self):
+        """Test that a debate past its deadline refuses the next request"""
+        usage = DebateUsage(timeout=60)
+        usage.check("Proponent")
+        usage.deadline -= 60
+
+        with pytest.raises(TimeoutException):
+            usage.check("Opponent")
+        assert usage.summary()['budget_exceeded'] is False
+
+
+class TestPrepareAgent:
+    """Test cases for agent instrumentation"""
+
+    def test_completions_are_recorded_in_debate_usage(self):
+        """Test that the wrapped client records usage while a debate runs"""
+        agent = Mock()
+        agent.name = "AnalysisAgent"
+        agent.client.create.return_value = completion(500, 50)
+        prepare_agent(agent, heuristic_counter(), article_tokens=300)
+
+        agent.debate_usage = None
+        agent.client.create(messages=[])
+        agent.debate_usage = DebateUsage()
+        agent.client.create(messages=[])
+
+        assert agent.register_hook.call_args[0][0] == "process_all_messages_before_reply"
+        assert agent.debate_usage.summary()['total']['prompt_tokens'] == 500
+
+    def test_deadline_holds_in_worker_threads(self):
+        """Test that a request made from another thread after the deadline is refused"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        agent = Mock()
+        agent.name = "Proponent"
+        agent.client.create.return_value = completion(500, 50)
+        prepare_agent(agent, heuristic_counter())
+        agent.debate_usage = DebateUsage(timeout=60)
+        agent.debate_usage.deadline -= 60
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            with pytest.raises(TimeoutException):
+                pool.submit(agent.client.create, messages=[]).result()
+        assert agent.debate_usage.summary()['agents'] == {}
@@ -0,0 +1,60 @@
+"""
+Content-addressed archive of the raw HTML of fetched article pages
+
+Every article page is stored once, compressed, under the SHA-256 of its
+HTML, so articles can be re-extracted later (see ``reparse.py``) without
+downloading them again. Identical pages share one file.
+"""
+import hashlib
+import os
+
+from exporters import COMPRESSION_EXTENSIONS, open_compressed
+
+
+class HtmlArchive:
+    """
+    Directory of compressed HTML files keyed by content hash
+
+    Layout: ``{root}/{key[:2]}/{key}.html[.zst|.gz]``
+    """
+
+    def __init__(self, root, compression='zstd'):
+        if compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.root = root
+        self.compression = compression
+
+    @staticmethod
+    def key_for(html):
+        return hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.html{COMPRESSION_EXTENSIONS[self.compression]}")
+
+    def put(self, html):
+        """
+        Store a page unless an identical one is already archived
+
+        Returns:
+            Tuple of (key, whether a new file was written)
+        """
+        key = self.key_for(html)
+        path = self.path_for(key)
+        if os.path.exists(path):
+            return key, False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write under a temporary name so readers never see a partial file
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open_compressed(temp_path, 'w', self.compression) as f:
+            f.write(html)
+        os.replace(temp_path, path)
+        return key, True
+
+    def get(self, key):
+        """Return the archived HTML for ``key``"""
+        with open_compressed(self.path_for(key), 'r', self.compression) as f:
+            return f.read()
+
+    def __contains__(self, key):
+        return os.path.exists(self.path_for(key))
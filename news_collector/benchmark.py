@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Offline parse-throughput benchmark for the news spiders
+
+Runs each spider's ``parse`` and ``parse_article`` callbacks against the
+saved pages in ``tests/fixtures`` - no network, no reactor, no pipelines -
+and reports pages/sec, items/sec and peak memory. The listing page of a
+source yields article requests; each request is answered with one of the
+source's saved article pages, in turn.
+
+It also times the article extraction alone, structured data first and with
+the CSS/XPath selectors only, to show the CPU saved per page by the
+JSON-LD/OpenGraph sources and which kind of source filled each field.
+
+The fixture pages are hand-written from the markup of both sites, not
+captured pages, so the numbers compare versions of the spiders with each
+other rather than predicting throughput on the live sites.
+
+Usage:
+    python benchmark.py                    # print the results
+    python benchmark.py --check            # exit with status 1 on a regression
+    python benchmark.py --update-baseline  # store them as the new baseline
+"""
+
+import argparse
+from collections import Counter
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from scrapy import Request
+from scrapy.http import HtmlResponse
+
+# Add current directory and spiders directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+spiders_dir = os.path.join(current_dir, 'spiders')
+sys.path.append(current_dir)
+sys.path.append(spiders_dir)
+
+from spiders.listin_diario import ListinDiarioSpider
+from spiders.el_nacional import ElNacionalSpider
+
+SPIDERS = [ListinDiarioSpider, ElNacionalSpider]
+FIXTURES_DIR = os.path.join(current_dir, 'tests', 'fixtures')
+BASELINE_FILE = os.path.join(FIXTURES_DIR, 'benchmark_baseline.json')
+
+
+def load_fixtures(source):
+    """
+    Read the saved pages of a source
+
+    Returns:
+        Tuple of (listing page bytes, list of article page bytes)
+    """
+    source_dir = os.path.join(FIXTURES_DIR, source)
+    with open(os.path.join(source_dir, 'home.html'), 'rb') as f:
+        home = f.read()
+
+    articles = []
+    for path in sorted(glob.glob(os.path.join(source_dir, 'article_*.html'))):
+        with open(path, 'rb') as f:
+            articles.append(f.read())
+
+    return home, articles
+
+
+def crawl_fixtures(spider, home, articles):
+    """
+    Run a spider's callbacks once over the listing page and its articles
+
+    Returns:
+        Tuple of (pages parsed, items produced)
+    """
+    start_url = spider.start_urls[0]
+    listing = HtmlResponse(url=start_url, body=home, encoding='utf-8', request=Request(start_url))
+    pages, items = 1, 0
+
+    for index, request in enumerate(spider.parse(listing)):
+        response = HtmlResponse(
+            url=request.url,
+            body=articles[index % len(articles)],
+            encoding='utf-8',
+            request=request
+        )
+        pages += 1
+        items += sum(1 for _ in spider.parse_article(response))
+
+    return pages, items
+
+
+def benchmark_spider(spider_cls, rounds=20):
+    """
+    Measure the parse throughput of one spider
+
+    Args:
+        spider_cls: Spider class with a ``source`` attribute
+        rounds: Number of times the fixture crawl is repeated
+
+    Returns:
+        Dict with pages, items, seconds, pages_per_sec, items_per_sec and peak_memory_kb
+    """
+    home, articles = load_fixtures(spider_cls.source)
+    spider = spider_cls()
+
+    # Warm up once so imports and lazy initialisation are not measured
+    crawl_fixtures(spider, home, articles)
+
+    pages = items = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        round_pages, round_items = crawl_fixtures(spider, home, articles)
+        pages += round_pages
+        items += round_items
+    seconds = time.perf_counter() - start
+
+    # Memory is traced in a separate round: tracing slows the interpreter down
+    tracemalloc.start()
+    try:
+        crawl_fixtures(spider, home, articles)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'pages': pages,
+        'items': items,
+        'seconds': round(seconds, 4),
+        'pages_per_sec': round(pages / seconds, 1),
+        'items_per_sec': round(items / seconds, 1),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def benchmark_extraction(spider_cls, rounds=20):
+    """
+    Time a spider's article extraction with and without structured data
+
+    Returns:
+        Dict with structured_ms and selectors_ms (milliseconds per article
+        page), saved_ms and the number of fields filled by each kind of
+        source (``field:path``) over the fixture pages
+    """
+    _, articles = load_fixtures(spider_cls.source)
+    responses = [
+        HtmlResponse(url=f"{spider_cls.start_urls[0]}article-{index}", body=body, encoding='utf-8')
+        for index, body in enumerate(articles)
+    ]
+    spec = spider_cls.article_spec
+
+    paths = Counter()
+    for response in responses:
+        response.selector  # Parse the pages before timing
+        filled = {}
+        spec.extract(response, paths=filled)
+        paths.update(f"{field}:{path}" for field, path in filled.items())
+
+    timings = {}
+    for name, structured in (('structured_ms', True), ('selectors_ms', False)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for response in responses:
+                spec.extract(response, structured=structured)
+        timings[name] = round((time.perf_counter() - start) * 1000 / (rounds * len(responses)), 3)
+
+    return {**timings, 'saved_ms': round(timings['selectors_ms'] - timings['structured_ms'], 3),
+            'paths': dict(sorted(paths.items()))}
+
+
+def run_benchmark(rounds=20):
+    """Benchmark every spider, keyed by source"""
+    return {spider_cls.source: benchmark_spider(spider_cls, rounds) for spider_cls in SPIDERS}
+
+
+def load_baseline():
+    """Stored pages/sec of each source, or an empty dict when there is no baseline"""
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def find_regressions(results, baseline, tolerance=0.5):
+    """
+    Sources whose pages/sec fell below their baseline by more than ``tolerance``
+
+    Returns:
+        List of (source, pages_per_sec, baseline pages_per_sec)
+    """
+    regressions = []
+    for source, result in results.items():
+        reference = baseline.get(source, {}).get('pages_per_sec')
+        if reference and result['pages_per_sec'] < reference * (1 - tolerance):
+            regressions.append((source, result['pages_per_sec'], reference))
+    return regressions
+
+
+def save_baseline(results):
+    baseline = {source: {'pages_per_sec': result['pages_per_sec']} for source, result in results.items()}
+    with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark spider parsing against the saved fixture pages")
+    parser.add_argument('--rounds', type=int, default=20, help="Times the fixture crawl is repeated per spider")
+    parser.add_argument('--update-baseline', action='store_true', help="Store the results as the new baseline")
+    parser.add_argument('--check', action='store_true',
+                        help="Exit with status 1 when a spider is slower than its baseline allows")
+    parser.add_argument('--tolerance', type=float, default=float(os.getenv('BENCHMARK_TOLERANCE', '0.5')),
+                        help="Allowed slowdown as a fraction of the baseline (default: 0.5)")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.rounds)
+    baseline = load_baseline()
+
+    for source, result in results.items():
+        reference = baseline.get(source, {}).get('pages_per_sec')
+        change = f" ({(result['pages_per_sec'] / reference - 1) * 100:+.0f}% vs baseline)" if reference else ""
+        print(f"{source}: {result['pages_per_sec']} pages/s{change}, {result['items_per_sec']} items/s, "
+              f"peak memory {result['peak_memory_kb']} KB ({result['pages']} pages in {result['seconds']}s)")
+
+    for spider_cls in SPIDERS:
+        extraction = benchmark_extraction(spider_cls, args.rounds)
+        paths = ', '.join(f"{key} x{count}" for key, count in extraction['paths'].items())
+        print(f"{spider_cls.source} article extraction: {extraction['structured_ms']} ms/page structured first, "
+              f"{extraction['selectors_ms']} ms/page selectors only ({extraction['saved_ms']:+} ms saved); {paths}")
+
+    if args.update_baseline:
+        save_baseline(results)
+        print(f"Baseline written to {BASELINE_FILE}")
+    elif args.check:
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for source, pages_per_sec, reference in regressions:
+            print(f"REGRESSION {source}: {pages_per_sec} pages/s, baseline is {reference}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
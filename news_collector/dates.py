@@ -0,0 +1,123 @@
+"""
+Parse the publication dates found on article pages
+
+Both sources print dates in several shapes: ISO timestamps in ``<time
+datetime>`` attributes, Spanish dates such as ``2 de mayo de 2024`` or
+``mayo 2, 2024``, numeric ``02.05.2024 08:10`` or ``02/05/2024`` dates and
+relative ones such as ``hace 3 horas``. ``parse_published_at`` turns all of
+them into a timezone-aware datetime; dates without an offset are taken as
+local Dominican time.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+    SOURCE_TIMEZONE = ZoneInfo('America/Santo_Domingo')
+except (ImportError, ZoneInfoNotFoundError):  # No system tz database (slim images)
+    # The Dominican Republic stays on UTC-4 all year
+    SOURCE_TIMEZONE = timezone(timedelta(hours=-4), 'AST')
+
+MONTHS = {
+    'enero': 1, 'ene': 1,
+    'febrero': 2, 'feb': 2,
+    'marzo': 3, 'mar': 3,
+    'abril': 4, 'abr': 4,
+    'mayo': 5, 'may': 5,
+    'junio': 6, 'jun': 6,
+    'julio': 7, 'jul': 7,
+    'agosto': 8, 'ago': 8,
+    'septiembre': 9, 'setiembre': 9, 'sep': 9, 'sept': 9, 'set': 9,
+    'octubre': 10, 'oct': 10,
+    'noviembre': 11, 'nov': 11,
+    'diciembre': 12, 'dic': 12,
+}
+
+RELATIVE_UNITS = {
+    'segundo': 'seconds', 'minuto': 'minutes', 'min': 'minutes', 'hora': 'hours', 'h': 'hours',
+    'día': 'days', 'dia': 'days', 'semana': 'weeks',
+}
+
+_MONTH = '(?P<month_name>' + '|'.join(sorted(MONTHS, key=len, reverse=True)) + r')\.?'
+_TIME = r'(?:\D{0,6}(?P<hour>\d{1,2}):(?P<minute>\d{2})(?::(?P<second>\d{2}))?\s*(?P<ampm>[ap]\.?\s?m\.?)?)?'
+
+# "2 de mayo de 2024", "2 mayo, 2024", "jueves, 2 de mayo del 2024 - 10:30 am"
+_DAY_MONTH_YEAR = re.compile(r'(?P<day>\d{1,2})\s+(?:de\s+)?' + _MONTH + r',?\s+(?:de[l]?\s+)?(?P<year>\d{4})' + _TIME)
+# "mayo 2, 2024"
+_MONTH_DAY_YEAR = re.compile(_MONTH + r'\s+(?P<day>\d{1,2}),?\s+(?P<year>\d{4})' + _TIME)
+# "02.05.2024 08:10", "02/05/2024", "2-5-2024"
+_NUMERIC = re.compile(r'(?P<day>\d{1,2})[./-](?P<month>\d{1,2})[./-](?P<year>\d{4})' + _TIME)
+# "hace 3 horas", "hace un día"
+_RELATIVE = re.compile(r'hace\s+(?P<amount>\d+|un|una)\s+(?P<unit>segundo|minuto|min|hora|h|día|dia|semana)s?\b')
+
+
+def parse_published_at(value, reference=None):
+    """
+    Parse a date string from an article page
+
+    Args:
+        value: The scraped date text
+        reference: Time relative dates count back from (default: now)
+
+    Returns:
+        Timezone-aware datetime, or None when the text is not a date
+    """
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=SOURCE_TIMEZONE)
+
+    text = ' '.join(str(value).split())
+
+    parsed = _parse_iso(text)
+    if parsed is not None:
+        return parsed
+
+    lowered = text.lower()
+
+    match = _RELATIVE.search(lowered)
+    if match:
+        amount = 1 if match.group('amount') in ('un', 'una') else int(match.group('amount'))
+        reference = reference or datetime.now(timezone.utc)
+        if reference.tzinfo is None:
+            reference = reference.replace(tzinfo=timezone.utc)
+        return reference - timedelta(**{RELATIVE_UNITS[match.group('unit')]: amount})
+
+    for pattern in (_DAY_MONTH_YEAR, _MONTH_DAY_YEAR, _NUMERIC):
+        match = pattern.search(lowered)
+        if match:
+            parsed = _from_match(match)
+            if parsed is not None:
+                return parsed
+
+    return None
+
+
+def _parse_iso(text):
+    if not re.match(r'\d{4}-\d{2}-\d{2}', text):
+        return None
+    try:
+        parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=SOURCE_TIMEZONE)
+
+
+def _from_match(match):
+    groups = match.groupdict()
+    month = MONTHS[groups['month_name']] if groups.get('month_name') else int(groups['month'])
+    hour = int(groups['hour']) if groups.get('hour') else 0
+    minute = int(groups['minute']) if groups.get('minute') else 0
+    second = int(groups['second']) if groups.get('second') else 0
+
+    ampm = (groups.get('ampm') or '').replace('.', '').replace(' ', '')
+    if ampm == 'pm' and hour < 12:
+        hour += 12
+    elif ampm == 'am' and hour == 12:
+        hour = 0
+
+    try:
+        return datetime(int(groups['year']), month, int(groups['day']), hour, minute, second,
+                        tzinfo=SOURCE_TIMEZONE)
+    except ValueError:
+        return None
@@ -0,0 +1,195 @@
+"""
+Streaming JSON Lines backup of scraped articles
+"""
+import gzip
+import io
+import json
+import logging
+import os
+import zlib
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_EXTENSIONS = {
+    '': '',
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+
+def open_compressed(path, mode, compression=''):
+    """
+    Open a text file with optional gzip or zstd compression
+
+    Args:
+        path: File path
+        mode: 'r', 'w' or 'a'
+        compression: '', 'gzip' or 'zstd'
+
+    Returns:
+        Text file object
+    """
+    if compression == 'gzip':
+        return gzip.open(path, mode + 't', encoding='utf-8')
+
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd compression requires the 'zstandard' package")
+        if mode == 'r':
+            raw = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True, closefd=True)
+        else:
+            raw = zstandard.ZstdCompressor().stream_writer(open(path, mode + 'b'), closefd=True)
+        return io.TextIOWrapper(raw, encoding='utf-8')
+
+    if compression:
+        raise ValueError(f"Unsupported compression: {compression}")
+
+    return open(path, mode, encoding='utf-8')
+
+
+def compression_for_path(path):
+    """Guess the compression of a backup file from its extension"""
+    for compression, extension in COMPRESSION_EXTENSIONS.items():
+        if extension and path.endswith(extension):
+            return compression
+    return ''
+
+
+def iter_backup_records(path):
+    """
+    Lazily iterate the records of a JSON Lines backup
+
+    Args:
+        path: A backup file, or a directory whose backup files are read in name order
+
+    Yields:
+        One dict per stored article. A truncated last line (left behind by a
+        crashed run) is skipped with a warning.
+    """
+    if os.path.isdir(path):
+        for root, _, files in sorted(os.walk(path)):
+            for name in sorted(files):
+                if '.jsonl' in name:
+                    yield from iter_backup_records(os.path.join(root, name))
+        return
+
+    for line_number, line in enumerate(_iter_lines(path), 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping unreadable line {line_number} in {path}")
+
+
+def _iter_lines(path):
+    """Iterate the text lines of a backup file, whatever its compression"""
+    compression = compression_for_path(path)
+
+    if compression == 'gzip':
+        # gzip.open refuses streams without an end marker, which is exactly
+        # what a file still being written (or left by a crash) looks like
+        pending = b''
+        for chunk in _iter_gzip_chunks(path):
+            pending += chunk
+            *lines, pending = pending.split(b'\n')
+            for line in lines:
+                yield line.decode('utf-8', errors='replace')
+        if pending:
+            yield pending.decode('utf-8', errors='replace')
+        return
+
+    with open_compressed(path, 'r', compression) as f:
+        yield from f
+
+
+def _iter_gzip_chunks(path, chunk_size=65536):
+    """Decompress a possibly unfinished, possibly multi-member gzip file"""
+    with open(path, 'rb') as f:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                return
+            while data:
+                yield decompressor.decompress(data)
+                if decompressor.eof:
+                    # Appending to a gzip file starts a new member
+                    data = decompressor.unused_data
+                    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                else:
+                    data = b''
+
+
+class JsonLinesBackupPipeline:
+    """
+    Pipeline that streams every item to a JSON Lines backup as it arrives
+
+    Each item is written as one line and flushed immediately, so a crashed run
+    keeps everything scraped up to that point. Files rotate per run and per
+    day under ``{backup_dir}/{source}/{YYYY-MM-DD}/{spider}-{run_id}.jsonl``,
+    with a ``.gz``/``.zst`` suffix when compression is enabled.
+    """
+
+    def __init__(self, backup_dir, compression=''):
+        if compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.backup_dir = backup_dir
+        self.compression = compression
+        self.run_id = None
+        self.file = None
+        self.file_date = None
+        self.output_file = None
+        self.items_written = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            backup_dir=crawler.settings.get('BACKUP_DIR', 'outputs'),
+            compression=crawler.settings.get('BACKUP_COMPRESSION', '')
+        )
+
+    def open_spider(self, spider):
+        self.run_id = datetime.now().strftime('%Y%m%dT%H%M%S')
+        self.items_written = 0
+
+    def process_item(self, item, spider):
+        today = datetime.now().strftime('%Y-%m-%d')
+        if self.file is None or self.file_date != today:
+            self._rotate(spider, today)
+
+        self.file.write(json.dumps(dict(item), ensure_ascii=False, default=str) + '\n')
+        self.file.flush()
+        self.items_written += 1
+        return item
+
+    def close_spider(self, spider):
+        self._close_file()
+        print(f"Spider {spider.name} completed! {self.items_written} items backed up to: {self.output_file}")
+
+    def backup_path(self, spider, date):
+        """Build the backup file path for a spider, run and date"""
+        source = getattr(spider, 'source', spider.name)
+        filename = f"{spider.name}-{self.run_id}.jsonl{COMPRESSION_EXTENSIONS[self.compression]}"
+        return os.path.join(self.backup_dir, source, date, filename)
+
+    def _rotate(self, spider, date):
+        """Close the current backup file and start the one for ``date``"""
+        self._close_file()
+
+        self.output_file = self.backup_path(spider, date)
+        os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
+        self.file = open_compressed(self.output_file, 'a', self.compression)
+        self.file_date = date
+
+    def _close_file(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
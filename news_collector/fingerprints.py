@@ -0,0 +1,134 @@
+"""
+Canonical URLs and content fingerprints for article deduplication
+"""
+import hashlib
+import re
+import unicodedata
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a visitor came from
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', 'ref', 'ref_src', 'amp', 'outputtype', 'cmpid',
+}
+TRACKING_PREFIXES = ('utm_',)
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+SHINGLE_SIZE = 3
+
+# Articles shorter than this are not fingerprinted: short or empty bodies
+# (failed extractions) would otherwise all look like copies of each other
+MIN_FINGERPRINT_WORDS = 20
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def canonicalize_url(url):
+    """
+    Normalize an article URL so that variants of the same page compare equal
+
+    Lowercases the scheme and host, drops default ports, fragments and
+    tracking parameters, sorts the remaining query parameters and maps AMP
+    variants (``/amp/`` prefix or suffix, ``.amp.html``) to the regular page.
+    """
+    if not url:
+        return url
+
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and not (scheme == 'http' and parts.port == 80) and not (scheme == 'https' and parts.port == 443):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or '/'
+    if path.endswith('.amp.html'):
+        path = path[:-len('.amp.html')] + '.html'
+    if path.startswith('/amp/'):
+        path = path[len('/amp'):]
+    for suffix in ('/amp/', '/amp'):
+        if path.endswith(suffix):
+            path = path[:-len(suffix)] + '/'
+            break
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query.sort()
+
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def normalize_text(text):
+    """Lowercase, strip accents and collapse whitespace for comparisons"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(_WORD_RE.findall(text.lower()))
+
+
+def content_hash(text):
+    """SHA-256 of the normalized text: equal for exact copies of an article"""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def simhash(text, bits=SIMHASH_BITS):
+    """
+    SimHash of the text's word shingles
+
+    Texts that share most of their shingles get fingerprints that differ in
+    only a few bits, so near-duplicates can be found by Hamming distance.
+    """
+    words = normalize_text(text).split()
+    if len(words) < SHINGLE_SIZE:
+        shingles = [' '.join(words)]
+    else:
+        shingles = [' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+
+    weights = [0] * bits
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=bits // 8).digest(), 'big')
+        for bit in range(bits):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def simhash_bands(fingerprint, bands=SIMHASH_BANDS, bits=SIMHASH_BITS):
+    """
+    Split a SimHash into tagged bands for indexed candidate lookups
+
+    Two fingerprints within Hamming distance ``bands - 1`` always share at
+    least one identical band, so an index on the bands finds every candidate.
+    """
+    width = bits // bands
+    mask = (1 << width) - 1
+    return [f"{band}:{(fingerprint >> (band * width)) & mask:0{width // 4}x}" for band in range(bands)]
+
+
+def hamming_distance(a, b):
+    """Number of differing bits between two fingerprints"""
+    return bin(a ^ b).count('1')
+
+
+def fingerprint_article(content):
+    """
+    Compute the stored fingerprints of an article body
+
+    Returns:
+        Dict with ``content_hash``, ``simhash`` (hex string) and
+        ``simhash_bands``, or an empty dict when the body is too short
+    """
+    if len(normalize_text(content).split()) < MIN_FINGERPRINT_WORDS:
+        return {}
+
+    fingerprint = simhash(content)
+    return {
+        'content_hash': content_hash(content),
+        'simhash': f"{fingerprint:016x}",
+        'simhash_bands': simhash_bands(fingerprint),
+    }
@@ -5,7 +5,6 @@ Runner script for both Listín Diario and El Nacional spiders
 
 import os
 import sys
-import json
 import logging
 from scrapy.crawler import CrawlerProcess
 from scrapy.utils.project import get_project_settings
@@ -20,47 +19,16 @@ from spiders.listin_diario import ListinDiarioSpider
 from spiders.el_nacional import ElNacionalSpider
 
 
-class CustomJsonPipeline:
-    """Custom pipeline to write properly formatted JSON"""
-    
-    def __init__(self, output_file):
-        self.output_file = output_file
-        self.items = []
-    
-    @classmethod
-    def from_crawler(cls, crawler):
-        return cls(
-            output_file=crawler.settings.get('OUTPUT_FILE')
-        )
-    
-    def open_spider(self, spider):
-        self.items = []
-    
-    def process_item(self, item, spider):
-        self.items.append(dict(item))
-        return item
-    
-    def close_spider(self, spider):
-        # Ensure outputs directory exists
-        os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
-        
-        # Write properly formatted JSON
-        with open(self.output_file, 'w', encoding='utf-8') as f:
-            json.dump(self.items, f, ensure_ascii=False, indent=2)
-        
-        print(f"Spider {spider.name} completed! Output saved to: {self.output_file}")
-
-
-def run_spiders():
-    """Run both Listín Diario and El Nacional spiders"""
-
-    # Configure logging to reduce verbosity
+def configure_logging():
+    """Reduce the verbosity of pymongo loggers"""
     logging.getLogger('pymongo').setLevel(logging.WARNING)
     logging.getLogger('pymongo.topology').setLevel(logging.WARNING)
     logging.getLogger('pymongo.connection').setLevel(logging.WARNING)
     logging.getLogger('pymongo.heartbeat').setLevel(logging.WARNING)
 
-    # Configure Scrapy settings
+
+def get_crawl_settings():
+    """Scrapy settings shared by every crawl of the collector"""
     settings = {
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
         'ROBOTSTXT_OBEY': True,
@@ -72,21 +40,61 @@ def run_spiders():
         'AUTOTHROTTLE_START_DELAY': 1,
         'AUTOTHROTTLE_MAX_DELAY': 60,
         'AUTOTHROTTLE_TARGET_CONCURRENCY': 1.0,
+        'DOWNLOADER_MIDDLEWARES': {
+            'middlewares.KnownUrlFilterMiddleware': 50,  # Skip stored articles before fetching
+            'middlewares.ConditionalRequestMiddleware': 60,  # ETag/Last-Modified for feeds and sitemaps
+            'middlewares.HtmlArchiveMiddleware': 70,  # Compressed raw HTML of article pages
+        },
         'ITEM_PIPELINES': {
-            'pipelines.MongoDBPipeline': 100,  # MongoDB first
-            'run_spider.CustomJsonPipeline': 300,  # JSON backup
-        }
+            'pipelines.FingerprintPipeline': 50,  # Canonical URL and content fingerprints
+            'pipelines.PublishedDatePipeline': 60,  # Parsed, indexed publication date
+            'pipelines.ThreadedMongoDBPipeline': 100,  # MongoDB first, written off the reactor thread
+            'exporters.JsonLinesBackupPipeline': 300,  # JSON Lines backup
+        },
+        'EXTENSIONS': {
+            'metrics.CrawlMetrics': 500,  # Prometheus metrics and crawl_runs summaries
+        },
+        'METRICS_PORT': int(os.getenv('METRICS_PORT', '9410')),
+        'METRICS_HOST': os.getenv('METRICS_HOST', '127.0.0.1'),
+        'ARCHIVE_DIR': os.getenv('ARCHIVE_DIR', os.path.join(current_dir, 'outputs', 'archive')),
+        'ARCHIVE_COMPRESSION': os.getenv('ARCHIVE_COMPRESSION', 'zstd'),
+        'BACKUP_DIR': os.path.join(current_dir, 'outputs'),
+        'BACKUP_COMPRESSION': os.getenv('BACKUP_COMPRESSION', ''),
+    }
+    if os.getenv('FRONTIER_CRAWL_ID'):
+        # Share the crawl with every worker started with the same crawl id
+        settings['SCHEDULER'] = 'frontier.MongoScheduler'
+        settings['DOWNLOADER_MIDDLEWARES']['frontier.FrontierAckMiddleware'] = 10
+        settings['FRONTIER_CRAWL_ID'] = os.getenv('FRONTIER_CRAWL_ID')
+    return settings
+
+
+def get_spider_arguments():
+    """Spider arguments shared by every crawl of the collector"""
+    return {
+        # 'homepage' scans the home pages, 'feeds' reads RSS feeds and news sitemaps
+        'discovery': os.getenv('DISCOVERY_MODE', 'homepage'),
     }
+
+
+def run_spiders():
+    """Run both Listín Diario and El Nacional spiders"""
+
+    # Configure logging to reduce verbosity
+    configure_logging()
+
+    # Configure Scrapy settings
+    settings = get_crawl_settings()
     
     # Create a single CrawlerProcess
     process = CrawlerProcess(settings)
     
     # Add both spiders to the same process
     print("Starting Listín Diario spider...")
-    process.crawl(ListinDiarioSpider, output_file='outputs/listin_diario_articles.json')
+    process.crawl(ListinDiarioSpider, **get_spider_arguments())
     
     print("Starting El Nacional spider...")
-    process.crawl(ElNacionalSpider, output_file='outputs/el_nacional_articles.json')
+    process.crawl(ElNacionalSpider, **get_spider_arguments())
     
     # Start the process (this will run both spiders)
     process.start()
@@ -0,0 +1,379 @@
+"""
+RSS and news sitemap discovery for the news spiders
+
+Spiders that mix in ``FeedDiscoveryMixin`` can be started with
+``-a discovery=feeds`` to find articles through their RSS feeds and news
+sitemaps instead of downloading and scanning the homepage. Only entries
+published or modified after the previous crawl are followed; the article
+pages are then parsed by the spider's usual ``parse_article``.
+
+Feed, sitemap and homepage requests carry ``meta['conditional']`` so that
+``middlewares.ConditionalRequestMiddleware`` can send the stored
+ETag/Last-Modified validators and answer unchanged documents with 304.
+In homepage mode the ordered article links of the listing are also
+compared with a digest stored by the previous crawl, and an unchanged
+listing ends the crawl without requesting any article.
+
+``-a discovery=backfill -a until=YYYY-MM-DD`` loads history instead: the
+spider walks the pagination of its ``backfill_sections`` back to the given
+date, one page at a time per section, and checkpoints the page reached in
+the ``crawl_state`` collection so an interrupted backfill resumes there
+(see ``backfill.py``).
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import scrapy
+from items import ArticleItem
+from scrapy.exceptions import IgnoreRequest
+from w3lib.html import remove_tags
+
+from crawl_state import CrawlState
+from dates import SOURCE_TIMEZONE, parse_published_at
+from extraction import ExtractionSpec, Field
+from fingerprints import canonicalize_url
+from metrics import LISTINGS_UNCHANGED, source_of
+
+DISCOVERY_MODES = ('homepage', 'feeds', 'backfill')
+
+# Below the default priority (0) of the incremental crawl. Articles come
+# before the next section page so only a page of articles is queued at a time
+BACKFILL_ARTICLE_PRIORITY = -10
+BACKFILL_PAGE_PRIORITY = -11
+BACKFILL_MAX_PAGES = 500
+
+# Entries of a section or archive page
+SECTION_ENTRIES = ExtractionSpec(
+    entries=Field(css='article, .c-article, .post', mode='nodes', default=list),
+)
+
+SECTION_ENTRY = ExtractionSpec(
+    url=Field(css=[
+        'h1 a::attr(href), h2 a::attr(href), h3 a::attr(href), .entry-title a::attr(href)',
+        'a::attr(href)',
+    ]),
+    title=Field(css=[
+        'h1 a::text, h2 a::text, h3 a::text, .entry-title a::text',
+        'h1::text, h2::text, h3::text',
+        'a::attr(title)',
+    ]),
+    published=Field(css=[
+        'time::attr(datetime)',
+        'time::text, .date::text, [class*="date"]::text',
+    ]),
+)
+
+# Listing fields read from an article page, for feed, sitemap and section
+# entries that do not carry them
+ARTICLE_METADATA = ExtractionSpec(
+    title=Field(jsonld='headline', meta='og:title', css=['h1::text', 'title::text']),
+    short_description=Field(jsonld='description', meta=['og:description', 'description']),
+    category=Field(jsonld='articleSection', meta='article:section'),
+    photo_url=Field(jsonld='image', meta='og:image'),
+)
+
+# Values of an entry that mean the listing had nothing for the field
+_PLACEHOLDERS = ('', 'undefined')
+
+
+def parse_entry_date(value):
+    """
+    Parse an RSS (RFC 822) or sitemap (W3C/ISO 8601) date as naive UTC
+
+    Returns:
+        datetime in UTC without tzinfo, like the other stored timestamps, or
+        None when the value is missing or not a date
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def listing_digest(urls):
+    """Digest of the ordered article links of a listing page"""
+    return hashlib.sha256('\n'.join(canonicalize_url(url) for url in urls).encode('utf-8')).hexdigest()
+
+
+class FeedDiscoveryMixin:
+    """
+    Discover articles from RSS feeds and news sitemaps
+
+    Spider attributes:
+        discovery: ``'homepage'`` (default, scan ``start_urls``), ``'feeds'``
+            or ``'backfill'``
+        feed_urls: RSS 2.0 feeds of the source
+        sitemap_urls: News sitemaps or sitemap indexes of the source
+        backfill_sections: Section or archive listings walked by a backfill,
+            as a dict of section name to URL template with a ``{page}`` field
+        until: Date (``YYYY-MM-DD``) a backfill walks back to
+        last_crawl_at: Naive UTC time of the previous crawl; entries not newer
+            than it are skipped. Set by ``ConditionalRequestMiddleware`` when
+            the spider opens
+        listing_digests: Digest of each listing page parsed in this crawl,
+            stored by ``ConditionalRequestMiddleware`` when the crawl finishes
+        incomplete_listings: Listing pages with an article request that
+            failed in this crawl; their digest and validators are cleared so
+            the next crawl follows them in full
+    """
+
+    discovery = 'homepage'
+    feed_urls = []
+    sitemap_urls = []
+    backfill_sections = {}
+    until = None
+    last_crawl_at = None
+    state_factory = CrawlState.connect
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.listing_digests = {}
+        self.incomplete_listings = set()
+        self.backfill_state = None
+
+    async def start(self):
+        for request in self.start_requests():
+            yield request
+
+    def start_requests(self):
+        if self.discovery not in DISCOVERY_MODES:
+            raise ValueError(f"Unknown discovery mode {self.discovery!r}, expected one of {DISCOVERY_MODES}")
+
+        if self.discovery == 'homepage':
+            for url in self.start_urls:
+                yield scrapy.Request(
+                    url,
+                    meta={'conditional': True, 'handle_httpstatus_list': [304]},
+                    dont_filter=True
+                )
+            return
+
+        if self.discovery == 'backfill':
+            yield from self.backfill_requests()
+            return
+
+        for url in self.feed_urls:
+            yield self.discovery_request(url, self.parse_feed)
+        for url in self.sitemap_urls:
+            yield self.discovery_request(url, self.parse_sitemap)
+
+    def discovery_request(self, url, callback):
+        return scrapy.Request(
+            url,
+            callback,
+            meta={'conditional': True, 'handle_httpstatus_list': [304]},
+            dont_filter=True
+        )
+
+    def listing_is_unchanged(self, response, urls):
+        """
+        Record the digest of a listing page and compare it with the previous crawl
+
+        Args:
+            response: The listing page response (a 304 counts as unchanged)
+            urls: Article URLs extracted from the page, in page order
+
+        Returns:
+            True when the page lists the same articles, in the same order, as
+            when it was last crawled
+        """
+        if response.status == 304:
+            unchanged = True
+        else:
+            digest = listing_digest(urls)
+            self.listing_digests[response.url] = digest
+            unchanged = digest == response.meta.get('listing_digest')
+
+        if unchanged:
+            crawler = getattr(self, 'crawler', None)
+            if crawler is not None:
+                crawler.stats.inc_value('listing/unchanged')
+            LISTINGS_UNCHANGED.inc(source_of(self))
+            self.logger.info(f"Listing {response.url} unchanged since the last crawl, no articles requested")
+        return unchanged
+
+    def follow_listing_article(self, response, item):
+        """Request an article found on a listing page, tracking whether it could be fetched"""
+        return response.follow(
+            item['url'],
+            self.parse_article,
+            meta={'item': item, 'listing': response.url},
+            errback=self.listing_article_failed,
+            dont_filter=True
+        )
+
+    def listing_article_failed(self, failure):
+        """
+        Errback of listing article requests
+
+        A listing whose articles were not all fetched must not be skipped as
+        unchanged by the next crawl, or the failed articles would never be
+        requested again. Articles ignored because they are already stored
+        (or already requested in this run) do not count as failures.
+        """
+        if failure.check(IgnoreRequest):
+            return
+        request = failure.request
+        self.incomplete_listings.add(request.meta['listing'])
+        self.listing_digests.pop(request.meta['listing'], None)
+        self.logger.warning(f"Could not fetch {request.url}: {failure.getErrorMessage()}")
+
+    def backfill_requests(self):
+        """First page request of each section, resuming from the stored cursors"""
+        if not self.until:
+            raise ValueError("A backfill needs the date to walk back to: -a until=YYYY-MM-DD")
+
+        until = self.backfill_until()
+        self.backfill_state = self.state_factory()
+        cursors = self.backfill_state.load_backfill(self.source)
+
+        for section in self.backfill_sections:
+            cursor = cursors.get(section, {})
+            if cursor.get('done') and cursor.get('until') and cursor['until'] <= until.replace(tzinfo=None):
+                self.logger.info(f"Backfill of {section} already reached {cursor['until']:%Y-%m-%d}")
+                continue
+            page = cursor.get('page', 1)
+            if page > 1:
+                self.logger.info(f"Resuming backfill of {section} at page {page}")
+            yield self.backfill_page_request(section, page)
+
+    def backfill_until(self):
+        """Start of the ``until`` day in the source timezone"""
+        return datetime.strptime(self.until, '%Y-%m-%d').replace(tzinfo=SOURCE_TIMEZONE)
+
+    def backfill_page_request(self, section, page):
+        return scrapy.Request(
+            self.backfill_sections[section].format(page=page),
+            self.parse_backfill_page,
+            meta={'backfill_section': section, 'backfill_page': page, 'handle_httpstatus_list': [404]},
+            priority=BACKFILL_PAGE_PRIORITY,
+            dont_filter=True
+        )
+
+    def parse_backfill_page(self, response):
+        """Follow the articles of a section page and continue with the next page until ``until``"""
+        section, page = response.meta['backfill_section'], response.meta['backfill_page']
+        until = self.backfill_until()
+
+        entries = SECTION_ENTRIES.extract(response)['entries'] if response.status == 200 else []
+        dated = reached = 0
+        for entry in entries:
+            fields = SECTION_ENTRY.extract(entry)
+            if not fields['url']:
+                continue
+            published = parse_published_at(fields['published'])
+            if published is not None:
+                dated += 1
+                if published < until:
+                    reached += 1
+                    continue
+            yield self.article_request(response.urljoin(fields['url']), title=fields['title'],
+                                       priority=BACKFILL_ARTICLE_PRIORITY)
+
+        # Past the last page, or every dated entry is older than the target
+        done = not entries or (dated > 0 and reached == dated) or page >= BACKFILL_MAX_PAGES
+        self.crawler.stats.inc_value('backfill/pages')
+        # The page is parsed again on resume: its stored articles are filtered out
+        self.backfill_state.save_backfill(self.source, section, page=page, done=done,
+                                          until=until.replace(tzinfo=None))
+        if done:
+            self.logger.info(f"Backfill of {section} finished at page {page}")
+            return
+        yield self.backfill_page_request(section, page + 1)
+
+    def closed(self, reason):
+        if self.backfill_state is not None:
+            self.backfill_state.close()
+
+    def parse_feed(self, response):
+        """Follow the items of an RSS feed that are newer than the last crawl"""
+        if response.status == 304:
+            return
+
+        selector = scrapy.Selector(response, type='xml')
+        for entry in selector.xpath('//channel/item'):
+            url = (entry.xpath('link/text()').get() or '').strip()
+            if not url or not self.is_new(entry.xpath('pubDate/text()').get()):
+                continue
+
+            yield self.article_request(
+                response.urljoin(url),
+                title=entry.xpath('title/text()').get(),
+                short_description=entry.xpath('description/text()').get(),
+                category=entry.xpath('category/text()').get(),
+                photo_url=entry.xpath('enclosure[starts-with(@type, "image")]/@url').get()
+            )
+
+    def parse_sitemap(self, response):
+        """Follow newer child sitemaps of an index and newer URLs of a sitemap"""
+        if response.status == 304:
+            return
+
+        selector = scrapy.Selector(response, type='xml')
+        selector.remove_namespaces()
+
+        for sitemap in selector.xpath('//sitemapindex/sitemap'):
+            url = (sitemap.xpath('loc/text()').get() or '').strip()
+            if url and self.is_new(sitemap.xpath('lastmod/text()').get()):
+                yield self.discovery_request(response.urljoin(url), self.parse_sitemap)
+
+        for entry in selector.xpath('//urlset/url'):
+            url = (entry.xpath('loc/text()').get() or '').strip()
+            modified = entry.xpath('lastmod/text()').get() or entry.xpath('news/publication_date/text()').get()
+            if not url or not self.is_new(modified):
+                continue
+
+            yield self.article_request(
+                response.urljoin(url),
+                title=entry.xpath('news/title/text()').get(),
+                photo_url=entry.xpath('image/loc/text()').get()
+            )
+
+    def is_new(self, value):
+        """Whether an entry dated ``value`` changed after the last crawl"""
+        if self.last_crawl_at is None:
+            return True
+        modified = parse_entry_date(value)
+        # Undated entries are followed: the known URL filter drops stored ones
+        return modified is None or modified > self.last_crawl_at
+
+    def article_request(self, url, title=None, short_description=None, category=None, photo_url=None, priority=0):
+        item = ArticleItem()
+        item['title'] = (title or '').strip()
+        item['short_description'] = remove_tags(short_description or '').strip()
+        item['category'] = (category or '').strip() or "undefined"
+        item['photo_url'] = (photo_url or '').strip()
+        item['url'] = url
+
+        return scrapy.Request(
+            url,
+            self.parse_discovered_article,
+            meta={'item': item},
+            priority=priority,
+            dont_filter=True
+        )
+
+    def parse_discovered_article(self, response):
+        """Parse the article as usual, taking the listing fields the entry lacked from the page"""
+        for item in self.parse_article(response):
+            missing = [field for field in ARTICLE_METADATA.fields if item.get(field) in _PLACEHOLDERS]
+            if missing:
+                paths = {}
+                metadata = ARTICLE_METADATA.extract(response, use_defaults=False, paths=paths)
+                for field in missing:
+                    if metadata[field]:
+                        item[field] = response.urljoin(metadata[field]) if field == 'photo_url' else metadata[field]
+                        item['extraction_paths'][field] = paths[field]
+            yield item
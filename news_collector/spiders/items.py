@@ -12,5 +12,11 @@ class ArticleItem(scrapy.Item):
     content = scrapy.Field()
     author = scrapy.Field()
     created_at = scrapy.Field()
+    published_at = scrapy.Field()  # created_at parsed into a timezone-aware datetime
     url = scrapy.Field()  # Store the article URL for reference
     source = scrapy.Field()  # Source newspaper (listin_diario, el_nacional, etc.)
+    content_hash = scrapy.Field()  # SHA-256 of the normalized content, for exact duplicates
+    simhash = scrapy.Field()  # 64-bit SimHash of the content (hex), for near-duplicates
+    simhash_bands = scrapy.Field()  # SimHash split in bands for indexed candidate lookups
+    archive_key = scrapy.Field()  # Key of the page's raw HTML in the archive, for offline re-extraction
+    extraction_paths = scrapy.Field()  # Kind of source (jsonld, meta, css, xpath, default) that gave each field
@@ -1,111 +1,117 @@
 import scrapy
 from items import ArticleItem
+from discovery import FeedDiscoveryMixin
 from datetime import datetime
 
+from extraction import ExtractionSpec, Field
 
-class ListinDiarioSpider(scrapy.Spider):
+
+def today():
+    """Fallback publication date in DD/MM/YYYY format"""
+    return datetime.now().strftime("%d/%m/%Y")
+
+
+# Article title links within the .home-boards section of the home page
+LISTING = ExtractionSpec(
+    articles=Field(css='.home-boards .c-article__title a', mode='nodes', default=list),
+)
+
+# Fields of one title link
+TEASER = ExtractionSpec(
+    title=Field(css='::text'),
+    url=Field(css='::attr(href)'),
+    # The article container holding the description, category and photo
+    container=Field(xpath='./ancestor::*[contains(@class, "c-article")]', mode='nodes', default=list),
+)
+
+# Fields of the article container
+CONTAINER = ExtractionSpec(
+    short_description=Field(css='.c-article__excerpt::text, .c-article__summary::text, p::text', default=''),
+    category=Field(css='.c-article__epigraph::text', default='undefined'),
+    photo_url=Field(css='img::attr(src), img::attr(data-src)', default=''),
+)
+
+# Full article page. Author and date come from the schema.org JSON-LD or
+# OpenGraph tags when the page has them, the selectors are the fallback
+ARTICLE = ExtractionSpec(
+    content=Field(css=[
+        '.c-article__free .c-detail__body p::text',
+        # Fallback: any paragraph text from the content area
+        '.c-article__free p::text, .c-detail__body p::text',
+    ], mode='join', default=''),
+    author=Field(jsonld='author', meta='author', css='.detail__bio__name::text', default='unknown'),
+    created_at=Field(jsonld='datePublished', meta='article:published_time', css=[
+        '.date::text',
+        '.publish-date::text',
+        '.publication-date::text',
+        '.created-at::text',
+        '.timestamp::text',
+        'time::text',
+        'time::attr(datetime)',
+        '[class*="date"]::text',
+        '.post-date::text',
+        '.article-date::text',
+    ], default=today),
+)
+
+
+class ListinDiarioSpider(FeedDiscoveryMixin, scrapy.Spider):
     name = 'listin-diario-spider'
+    source = 'listin_diario'
     allowed_domains = ['listindiario.com']
     start_urls = ['https://listindiario.com']
+    # Used with -a discovery=feeds
+    feed_urls = ['https://listindiario.com/rss']
+    sitemap_urls = ['https://listindiario.com/sitemap-news.xml']
+    # Used with -a discovery=backfill
+    backfill_sections = {
+        'la-republica': 'https://listindiario.com/la-republica?page={page}',
+        'economia': 'https://listindiario.com/economia?page={page}',
+    }
+    # Fields of an article page, also used by reparse.py
+    article_spec = ARTICLE
 
     def parse(self, response):
         """
         Parse the main page and extract articles from .home-boards section
         """
-        # Select articles within the .home-boards section
-        # Use the specific selectors for Listín Diario
-        articles = response.css('.home-boards .c-article__title a')
-        
-        for article in articles:
+        items = []
+        for article in LISTING.extract(response)['articles']:
+            teaser = TEASER.extract(article)
+
+            # Both title and URL are needed: the content can only be
+            # fetched by following the article link
+            if not teaser['title'] or not teaser['url']:
+                continue
+
+            details = CONTAINER.extract(teaser['container'])
+
             item = ArticleItem()
-            
-            # Extract title from the specific selector
-            title = article.css('::text').get()
-            
-            if title:
-                item['title'] = title.strip()
-                
-                # Extract short description - try to find it in the same article container
-                # Look for description in the parent container
-                article_container = article.xpath('./ancestor::*[contains(@class, "c-article")]')
-                item['short_description'] = (
-                    article_container.css('.c-article__excerpt::text, .c-article__summary::text, p::text').get() or ""
-                ).strip()
-                
-                # Extract category using the specific selector
-                category = article_container.css('.c-article__epigraph::text').get()
-                item['category'] = category.strip() if category else "undefined"
-                
-                # Extract photo URL from the article container
-                photo_url = article_container.css('img::attr(src), img::attr(data-src)').get()
-                if photo_url:
-                    item['photo_url'] = response.urljoin(photo_url)
-                else:
-                    item['photo_url'] = ""
-                
-                # Get article URL
-                article_url = article.css('::attr(href)').get()
-                
-                if article_url:
-                    article_url = response.urljoin(article_url)
-                    item['url'] = article_url
-                    
-                    # Follow the link to get full content
-                    yield response.follow(
-                        article_url, 
-                        self.parse_article, 
-                        meta={'item': item},
-                        dont_filter=True
-                    )
-                else:
-                    # If no URL found, skip this record since we need both title and content
-                    # and we can't get content without following the article link
-                    pass
+            item['title'] = teaser['title']
+            item['short_description'] = details['short_description']
+            item['category'] = details['category']
+            item['photo_url'] = response.urljoin(details['photo_url']) if details['photo_url'] else ""
+            item['url'] = response.urljoin(teaser['url'])
+            items.append(item)
+
+        # Same articles in the same order as the last crawl: nothing to fetch
+        if self.listing_is_unchanged(response, [item['url'] for item in items]):
+            return
+
+        for item in items:
+            # Follow the link to get full content
+            yield self.follow_listing_article(response, item)
 
     def parse_article(self, response):
         """
         Parse individual article page to extract full content, author, and date
         """
         item = response.meta['item']
-        
-        # Extract full content using the specific selector
-        content_parts = response.css('.c-article__free .c-detail__body p::text').getall()
-        if content_parts:
-            item['content'] = ' '.join(content_parts).strip()
-        else:
-            # Fallback: try to get any paragraph text from the content area
-            content_parts = response.css('.c-article__free p::text, .c-detail__body p::text').getall()
-            item['content'] = ' '.join(content_parts).strip() if content_parts else ""
-        
-        # Extract author using the specific selector
-        author = response.css('.detail__bio__name::text').get()
-        item['author'] = author.strip() if author else "unknown"
-        
-        # Extract publication date - try to find it, if not available set today's date
-        date_selectors = [
-            '.date::text',
-            '.publish-date::text',
-            '.publication-date::text', 
-            '.created-at::text',
-            '.timestamp::text',
-            'time::text',
-            'time::attr(datetime)',
-            '[class*="date"]::text',
-            '.post-date::text',
-            '.article-date::text'
-        ]
-        
-        created_at = ""
-        for selector in date_selectors:
-            created_at = response.css(selector).get()
-            if created_at:
-                created_at = created_at.strip()
-                break
-        
-        # If no date found, set today's date in DD/MM/YYYY format
-        item['created_at'] = created_at if created_at else datetime.now().strftime("%d/%m/%Y")
+        paths = {}
+        item.update(self.article_spec.extract(response, paths=paths))
+        item['extraction_paths'] = paths
 
         # Add source identifier
-        item['source'] = 'listin_diario'
+        item['source'] = self.source
 
-        yield item
\ No newline at end of file
+        yield item
@@ -1,8 +1,6 @@
 #!/bin/bash
 
-echo "Starting initial spider run..."
-cd /usr/src/app && python run_spider.py >> /var/log/spider.log 2>&1
-echo "Initial run completed. Starting cron service..."
-service cron start
-echo "Cron started. Container will now run spider every 12 hours."
-tail -f /var/log/spider.log
+echo "Starting crawl scheduler..."
+cd /usr/src/app
+# The scheduler keeps running and recrawls each source on its own adaptive interval
+python scheduler.py 2>&1 | tee -a /var/log/spider.log
@@ -0,0 +1,242 @@
+"""
+Unit tests for the raw HTML archive and offline re-extraction
+"""
+import unittest
+from unittest.mock import Mock
+import sys
+import os
+import shutil
+import tempfile
+from datetime import datetime
+
+from scrapy import Request
+from scrapy.http import HtmlResponse
+
+# Add parent and spiders directories to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'spiders'))
+
+import reparse
+from archive import HtmlArchive
+from dates import parse_published_at
+from fingerprints import fingerprint_article
+from middlewares import HtmlArchiveMiddleware
+from spiders.items import ArticleItem
+
+ARTICLE_HTML = """
+<html><body>
+  <div class="entry-content"><p>Primer párrafo actualizado.</p><p>Segundo párrafo.</p></div>
+  <span class="byline">Redacción</span>
+</body></html>
+"""
+
+LONG_ARTICLE_HTML = """
+<html><body>
+  <span class="date">2 de mayo de 2024</span>
+  <div class="entry-content">
+    <p>El gobierno anunció este jueves un nuevo plan de inversión en infraestructura vial para las provincias del sur.</p>
+    <p>Las obras comenzarán el próximo mes y se extenderán durante todo el año según el ministerio.</p>
+  </div>
+  <span class="byline">Redacción</span>
+</body></html>
+"""
+
+
+class FakeCollection:
+    """In-memory stand-in for the articles collection that honours ``projection``"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.bulk_writes = []
+
+    def find(self, query, projection=None, limit=0):
+        return [{field: doc[field] for field in projection if field in doc} for doc in self.docs]
+
+    def bulk_write(self, operations, ordered=True):
+        self.bulk_writes.append(operations)
+
+
+class TestHtmlArchive(unittest.TestCase):
+    """Test cases for HtmlArchive"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.archive = HtmlArchive(self.temp_dir, 'zstd')
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_put_and_get(self):
+        """Test that archived pages are read back unchanged"""
+        key, written = self.archive.put(ARTICLE_HTML)
+
+        self.assertTrue(written)
+        self.assertIn(key, self.archive)
+        self.assertTrue(self.archive.path_for(key).endswith('.html.zst'))
+        self.assertEqual(self.archive.get(key), ARTICLE_HTML)
+
+    def test_identical_pages_are_stored_once(self):
+        """Test that the same page is only written the first time"""
+        first_key, _ = self.archive.put(ARTICLE_HTML)
+        second_key, written = self.archive.put(ARTICLE_HTML)
+
+        self.assertEqual(first_key, second_key)
+        self.assertFalse(written)
+
+    def test_gzip_compression(self):
+        """Test that gzip can be used instead of zstd"""
+        archive = HtmlArchive(self.temp_dir, 'gzip')
+        key, _ = archive.put(ARTICLE_HTML)
+        self.assertEqual(archive.get(key), ARTICLE_HTML)
+
+    def test_unknown_compression_raises(self):
+        """Test that an unsupported compression is rejected"""
+        with self.assertRaises(ValueError):
+            HtmlArchive(self.temp_dir, 'brotli')
+
+
+class TestHtmlArchiveMiddleware(unittest.TestCase):
+    """Test cases for HtmlArchiveMiddleware"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.stats = Mock()
+        self.middleware = HtmlArchiveMiddleware(HtmlArchive(self.temp_dir), stats=self.stats)
+        self.mock_spider = Mock()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def _response(self, meta, status=200):
+        request = Request('https://elnacional.com.do/nota/', meta=meta)
+        return request, HtmlResponse(url=request.url, body=ARTICLE_HTML.encode('utf-8'), encoding='utf-8',
+                                     status=status, request=request)
+
+    def test_article_pages_are_archived(self):
+        """Test that article pages are stored and linked to their item"""
+        item = ArticleItem(title='Nota')
+        request, response = self._response({'item': item})
+
+        self.assertIs(self.middleware.process_response(request, response, self.mock_spider), response)
+
+        self.assertEqual(self.middleware.archive.get(item['archive_key']), ARTICLE_HTML)
+        self.stats.inc_value.assert_called_with('archive/stored')
+
+    def test_listing_and_error_pages_are_not_archived(self):
+        """Test that pages without an item, or with an error status, are skipped"""
+        request, response = self._response({})
+        self.middleware.process_response(request, response, self.mock_spider)
+
+        item = ArticleItem(title='Nota')
+        request, response = self._response({'item': item}, status=404)
+        self.middleware.process_response(request, response, self.mock_spider)
+
+        self.assertNotIn('archive_key', item)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+
+class TestReparse(unittest.TestCase):
+    """Test cases for offline re-extraction"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.archive = HtmlArchive(self.temp_dir)
+        self.key, _ = self.archive.put(ARTICLE_HTML)
+        reparse._init_worker(self.temp_dir, 'zstd')
+        self.doc = {
+            '_id': 1,
+            'url': 'https://elnacional.com.do/nota/',
+            'source': 'el_nacional',
+            'archive_key': self.key,
+            'content': 'Primer párrafo.',
+            'author': 'Redacción',
+            'created_at': '02/05/2024',
+        }
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_reextract_reports_changed_fields(self):
+        """Test that only fields whose extraction changed are returned"""
+        article_id, changes, outcome = reparse.reextract(self.doc)
+
+        self.assertEqual(article_id, 1)
+        self.assertEqual(outcome, 'changed')
+        self.assertEqual(changes['content'], 'Primer párrafo actualizado. Segundo párrafo.')
+        self.assertNotIn('author', changes)
+        # Nothing matched the date selectors: the stored date is kept
+        self.assertNotIn('created_at', changes)
+
+    def test_reextract_missing_page(self):
+        """Test that articles whose page is not archived are reported as missing"""
+        self.doc['archive_key'] = '0' * 64
+        self.assertEqual(reparse.reextract(self.doc), (1, {}, 'missing'))
+
+    def stored_article(self, html, _id, **fields):
+        """Article as the pipelines store it, from its current extraction"""
+        key, _ = self.archive.put(html)
+        doc = dict(self.doc, _id=_id, archive_key=key, title='Título', status='new',
+                   scraped_at=datetime(2024, 5, 2, 12, 0))
+        doc.update(reparse.reextract(doc)[1])
+        doc.update(fingerprint_article(doc['content']))
+        doc['published_at'] = parse_published_at(doc['created_at'])
+        doc.update(fields)
+        return doc
+
+    def test_reparse_bulk_updates_changes(self):
+        """Test that changed articles are written with one bulk update"""
+        unchanged = self.stored_article(ARTICLE_HTML, 2)
+        collection = FakeCollection([self.doc, unchanged])
+
+        totals = reparse.reparse(collection, self.temp_dir, workers=1)
+
+        self.assertEqual(totals['changed'], 1)
+        self.assertEqual(totals['unchanged'], 1)
+        self.assertEqual(totals['field:content'], 1)
+        self.assertEqual(len(collection.bulk_writes), 1)
+        operations = collection.bulk_writes[0]
+        self.assertEqual(len(operations), 1)
+        self.assertEqual(operations[0]._filter, {'_id': 1})
+
+    def test_fingerprinted_article_is_unchanged(self):
+        """Test that an article stored with its fingerprints is not rewritten"""
+        doc = self.stored_article(LONG_ARTICLE_HTML, 2)
+        self.assertIn('simhash_bands', doc)
+        collection = FakeCollection([doc])
+
+        totals = reparse.reparse(collection, self.temp_dir, workers=1)
+
+        self.assertEqual(totals['unchanged'], 1)
+        self.assertEqual(collection.bulk_writes, [])
+
+    def test_changed_date_updates_published_at(self):
+        """Test that a re-extracted date is parsed again into published_at"""
+        doc = self.stored_article(LONG_ARTICLE_HTML, 2, created_at='01/01/2024',
+                                  published_at=parse_published_at('01/01/2024'))
+        collection = FakeCollection([doc])
+
+        totals = reparse.reparse(collection, self.temp_dir, workers=1)
+
+        self.assertEqual(totals['field:created_at'], 1)
+        changes = collection.bulk_writes[0][0]._doc['$set']
+        self.assertEqual(changes['created_at'], '2 de mayo de 2024')
+        self.assertEqual(changes['published_at'], parse_published_at('2 de mayo de 2024'))
+
+    def test_dry_run_writes_nothing(self):
+        """Test that a dry run only counts the changes"""
+        collection = FakeCollection([self.doc])
+
+        totals = reparse.reparse(collection, self.temp_dir, workers=1, dry_run=True)
+
+        self.assertEqual(totals['changed'], 1)
+        self.assertEqual(collection.bulk_writes, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
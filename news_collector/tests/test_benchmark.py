@@ -0,0 +1,85 @@
+"""
+Tests for the fixture corpus and the parse-throughput benchmark
+
+Wall-clock throughput depends on the machine, so the comparison with
+tests/fixtures/benchmark_baseline.json only runs when RUN_BENCHMARK=1 is
+set (or through ``python benchmark.py --check``). It fails when a spider got
+slower than the baseline by more than BENCHMARK_TOLERANCE (a fraction,
+default 0.5). Refresh the baseline with ``python benchmark.py
+--update-baseline`` after an intended change.
+"""
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import benchmark
+
+
+class TestFixtureCorpus(unittest.TestCase):
+    """Test cases for the spiders against the saved pages"""
+
+    def test_every_listing_entry_yields_an_item(self):
+        """Test that each fixture listing produces one complete item per article link"""
+        for spider_cls in benchmark.SPIDERS:
+            with self.subTest(source=spider_cls.source):
+                home, articles = benchmark.load_fixtures(spider_cls.source)
+                pages, items = benchmark.crawl_fixtures(spider_cls(), home, articles)
+
+                self.assertGreater(items, 0)
+                self.assertEqual(pages, items + 1)
+
+    def test_fixture_items_are_complete(self):
+        """Test that fixture articles fill content, author and date from the page"""
+        for spider_cls in benchmark.SPIDERS:
+            with self.subTest(source=spider_cls.source):
+                home, articles = benchmark.load_fixtures(spider_cls.source)
+                spider = spider_cls()
+                listing = benchmark.HtmlResponse(url=spider.start_urls[0], body=home, encoding='utf-8',
+                                                 request=benchmark.Request(spider.start_urls[0]))
+                request = next(iter(spider.parse(listing)))
+                response = benchmark.HtmlResponse(url=request.url, body=articles[0], encoding='utf-8',
+                                                  request=request)
+
+                item = next(iter(spider.parse_article(response)))
+
+                self.assertTrue(item['title'])
+                self.assertGreater(len(item['content'].split()), 100)
+                self.assertNotEqual(item['author'], 'unknown')
+                self.assertNotEqual(item['category'], 'undefined')
+                self.assertTrue(item['photo_url'].startswith('https://'))
+
+
+class TestParseThroughput(unittest.TestCase):
+    """Test cases for parse throughput regressions"""
+
+    def test_regressions_beyond_tolerance_are_reported(self):
+        """Test that only sources slower than the tolerance allows are regressions"""
+        baseline = {'listin_diario': {'pages_per_sec': 1000.0}, 'el_nacional': {'pages_per_sec': 1000.0}}
+        results = {'listin_diario': {'pages_per_sec': 600.0}, 'el_nacional': {'pages_per_sec': 400.0}}
+
+        regressions = benchmark.find_regressions(results, baseline, tolerance=0.5)
+
+        self.assertEqual(regressions, [('el_nacional', 400.0, 1000.0)])
+
+    def test_sources_without_baseline_are_not_regressions(self):
+        """Test that a new source is not compared with anything"""
+        self.assertEqual(benchmark.find_regressions({'new_source': {'pages_per_sec': 1.0}}, {}), [])
+
+    @unittest.skipUnless(os.getenv('RUN_BENCHMARK') == '1', "Set RUN_BENCHMARK=1 to measure parse throughput")
+    def test_throughput_against_baseline(self):
+        """Test that no spider parses slower than its baseline allows"""
+        baseline = benchmark.load_baseline()
+        if not baseline:
+            self.skipTest("No benchmark baseline stored")
+
+        tolerance = float(os.getenv('BENCHMARK_TOLERANCE', '0.5'))
+        results = benchmark.run_benchmark(rounds=5)
+
+        self.assertEqual(benchmark.find_regressions(results, baseline, tolerance), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
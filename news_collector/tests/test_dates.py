@@ -0,0 +1,112 @@
+"""
+Unit tests for publication date parsing and the published_at backfill
+"""
+import unittest
+from unittest.mock import Mock
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backfill_dates import backfill_published_at
+from dates import parse_published_at
+
+UTC_MINUS_4 = timezone(timedelta(hours=-4))
+
+
+class TestParsePublishedAt(unittest.TestCase):
+    """Test cases for parse_published_at"""
+
+    def assertLocal(self, text, *expected):
+        parsed = parse_published_at(text)
+        self.assertIsNotNone(parsed, text)
+        self.assertEqual(parsed, datetime(*expected, tzinfo=UTC_MINUS_4), text)
+
+    def test_iso_dates(self):
+        """Test ISO timestamps with and without offset"""
+        self.assertEqual(parse_published_at('2024-05-02T14:00:00Z'), datetime(2024, 5, 2, 14, tzinfo=timezone.utc))
+        self.assertLocal('2024-05-02T10:00:00-04:00', 2024, 5, 2, 10, 0)
+        self.assertLocal('2024-05-02', 2024, 5, 2)
+
+    def test_spanish_dates(self):
+        """Test the Spanish date formats used by both sources"""
+        self.assertLocal('2 mayo, 2024', 2024, 5, 2)
+        self.assertLocal('mayo 2, 2024', 2024, 5, 2)
+        self.assertLocal('Jueves, 2 de mayo de 2024 - 10:30 pm', 2024, 5, 2, 22, 30)
+        self.assertLocal('15 de Sept. del 2024 12:05 a.m.', 2024, 9, 15, 0, 5)
+
+    def test_numeric_dates(self):
+        """Test day-first numeric dates, including the DD/MM/YYYY fallback"""
+        self.assertLocal('02.05.2024 08:10', 2024, 5, 2, 8, 10)
+        self.assertLocal('02/05/2024', 2024, 5, 2)
+
+    def test_relative_dates(self):
+        """Test that relative dates count back from the reference time"""
+        reference = datetime(2024, 5, 2, 12, 0, tzinfo=timezone.utc)
+        self.assertEqual(parse_published_at('Hace 3 horas', reference), reference - timedelta(hours=3))
+        self.assertEqual(parse_published_at('hace un día', reference), reference - timedelta(days=1))
+
+    def test_not_a_date(self):
+        """Test that empty, invalid and non-date text give None"""
+        for text in (None, '', 'ayer', '31/02/2024', 'Redacción'):
+            self.assertIsNone(parse_published_at(text), text)
+
+
+class TestBackfillPublishedAt(unittest.TestCase):
+    """Test cases for the published_at backfill"""
+
+    def test_backfill_in_batches(self):
+        """Test that documents are updated in batches and unparseable dates are marked"""
+        batches = [
+            [
+                {'_id': 1, 'created_at': '02/05/2024', 'scraped_at': datetime(2024, 5, 2)},
+                {'_id': 2, 'created_at': 'sin fecha', 'scraped_at': datetime(2024, 5, 2)},
+            ],
+            [
+                {'_id': 3, 'created_at': 'hace 2 horas', 'scraped_at': datetime(2024, 5, 2, 12)},
+            ],
+            [],
+        ]
+        collection = Mock()
+        collection.find.return_value.sort.return_value.limit.side_effect = batches
+
+        totals = backfill_published_at(collection, batch_size=2)
+
+        self.assertEqual(totals, {'parsed': 2, 'unparsed': 1})
+        self.assertEqual(collection.bulk_write.call_count, 2)
+        first_batch = collection.bulk_write.call_args_list[0][0][0]
+        self.assertEqual(first_batch[0]._doc['$set']['published_at'], datetime(2024, 5, 2, tzinfo=UTC_MINUS_4))
+        self.assertIsNone(first_batch[1]._doc['$set']['published_at'])
+        # The next batch starts after the last _id of the previous one
+        self.assertEqual(collection.find.call_args_list[1][0][0]['_id'], {'$gt': 2})
+        relative = collection.bulk_write.call_args_list[1][0][0][0]._doc['$set']['published_at']
+        self.assertEqual(relative, datetime(2024, 5, 2, 10, tzinfo=timezone.utc))
+
+    def test_crawl_day_fallback_is_not_a_publication_date(self):
+        """Test that a legacy created_at holding the scrape day is not parsed"""
+        batches = [
+            [
+                # Scraped at 22:30 local time on 2 May: the fallback date is 02/05/2024
+                {'_id': 1, 'created_at': '02/05/2024', 'scraped_at': datetime(2024, 5, 3, 2, 30)},
+                {'_id': 2, 'created_at': '01/05/2024', 'scraped_at': datetime(2024, 5, 3, 2, 30)},
+                {'_id': 3, 'created_at': '03/05/2024', 'scraped_at': datetime(2024, 5, 3, 2, 30),
+                 'extraction_paths': {'created_at': 'default'}},
+            ],
+            [],
+        ]
+        collection = Mock()
+        collection.find.return_value.sort.return_value.limit.side_effect = batches
+
+        totals = backfill_published_at(collection, batch_size=3)
+
+        self.assertEqual(totals, {'parsed': 1, 'unparsed': 2})
+        updates = [update._doc['$set']['published_at'] for update in collection.bulk_write.call_args[0][0]]
+        self.assertIsNone(updates[0])
+        self.assertEqual(updates[1], datetime(2024, 5, 1, tzinfo=UTC_MINUS_4))
+        self.assertIsNone(updates[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,352 @@
+"""
+Unit tests for RSS and news sitemap discovery
+"""
+import unittest
+import sys
+import os
+from datetime import datetime
+from unittest.mock import Mock
+
+from scrapy import Request
+from scrapy.http import HtmlResponse, XmlResponse
+
+# Add parent and spiders directories to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'spiders'))
+
+import metrics
+from spiders.discovery import listing_digest, parse_entry_date
+from spiders.el_nacional import ElNacionalSpider
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel>
+  <title>El Nacional</title>
+  <item>
+    <title>Nota nueva</title>
+    <link>https://elnacional.com.do/nota-nueva/</link>
+    <pubDate>Thu, 02 May 2024 14:30:00 +0000</pubDate>
+    <category>Pol\xc3\xadtica</category>
+    <description><![CDATA[<p>Resumen de la nota</p>]]></description>
+  </item>
+  <item>
+    <title>Nota vieja</title>
+    <link>https://elnacional.com.do/nota-vieja/</link>
+    <pubDate>Mon, 29 Apr 2024 09:00:00 +0000</pubDate>
+  </item>
+</channel></rss>
+"""
+
+SITEMAP_INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://elnacional.com.do/sitemap-2024-05.xml</loc><lastmod>2024-05-02T10:00:00-04:00</lastmod></sitemap>
+  <sitemap><loc>https://elnacional.com.do/sitemap-2024-04.xml</loc><lastmod>2024-04-30T18:00:00-04:00</lastmod></sitemap>
+</sitemapindex>
+"""
+
+NEWS_SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:news="http://www.google.com/schemas/sitemap-news/0.9">
+  <url>
+    <loc>https://elnacional.com.do/nota-sitemap/</loc>
+    <news:news>
+      <news:publication_date>2024-05-02T08:00:00Z</news:publication_date>
+      <news:title>Nota del sitemap</news:title>
+    </news:news>
+  </url>
+  <url>
+    <loc>https://elnacional.com.do/nota-sin-fecha/</loc>
+  </url>
+  <url>
+    <loc>https://elnacional.com.do/nota-antigua/</loc>
+    <lastmod>2024-04-01T08:00:00Z</lastmod>
+  </url>
+</urlset>
+"""
+
+
+class TestFeedDiscovery(unittest.TestCase):
+    """Test cases for FeedDiscoveryMixin"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.spider = ElNacionalSpider(discovery='feeds')
+        self.spider.last_crawl_at = datetime(2024, 5, 1, 0, 0)
+
+    def _xml(self, url, body, status=200):
+        return XmlResponse(url=url, body=body, status=status, request=Request(url))
+
+    def test_parse_entry_date(self):
+        """Test that RSS and sitemap dates are converted to naive UTC"""
+        self.assertEqual(parse_entry_date('Thu, 02 May 2024 14:30:00 +0000'), datetime(2024, 5, 2, 14, 30))
+        self.assertEqual(parse_entry_date('2024-05-02T10:00:00-04:00'), datetime(2024, 5, 2, 14, 0))
+        self.assertEqual(parse_entry_date('2024-05-02'), datetime(2024, 5, 2))
+        self.assertIsNone(parse_entry_date('ayer'))
+        self.assertIsNone(parse_entry_date(None))
+
+    def test_start_requests_by_mode(self):
+        """Test that the discovery mode chooses between homepage and feed requests"""
+        feed_urls = [request.url for request in self.spider.start_requests()]
+        home_urls = [request.url for request in ElNacionalSpider().start_requests()]
+
+        self.assertEqual(feed_urls, ElNacionalSpider.feed_urls + ElNacionalSpider.sitemap_urls)
+        self.assertEqual(home_urls, ElNacionalSpider.start_urls)
+        for request in self.spider.start_requests():
+            self.assertTrue(request.meta['conditional'])
+            self.assertIn(304, request.meta['handle_httpstatus_list'])
+
+    def test_unknown_mode_raises(self):
+        """Test that an unknown discovery mode is rejected"""
+        with self.assertRaises(ValueError):
+            list(ElNacionalSpider(discovery='archive').start_requests())
+
+    def test_feed_yields_only_new_articles(self):
+        """Test that feed items older than the last crawl are skipped"""
+        requests = list(self.spider.parse_feed(self._xml('https://elnacional.com.do/feed/', FEED)))
+
+        self.assertEqual([request.url for request in requests], ['https://elnacional.com.do/nota-nueva/'])
+        item = requests[0].meta['item']
+        self.assertEqual(item['title'], 'Nota nueva')
+        self.assertEqual(item['category'], 'Política')
+        self.assertEqual(item['short_description'], 'Resumen de la nota')
+
+    def test_first_crawl_follows_every_entry(self):
+        """Test that without a previous crawl every entry is followed"""
+        self.spider.last_crawl_at = None
+        requests = list(self.spider.parse_feed(self._xml('https://elnacional.com.do/feed/', FEED)))
+        self.assertEqual(len(requests), 2)
+
+    def test_not_modified_yields_nothing(self):
+        """Test that a 304 response produces no requests"""
+        response = self._xml('https://elnacional.com.do/feed/', b'', status=304)
+        self.assertEqual(list(self.spider.parse_feed(response)), [])
+        self.assertEqual(list(self.spider.parse_sitemap(response)), [])
+
+    def test_sitemap_index_follows_newer_sitemaps(self):
+        """Test that only child sitemaps modified after the last crawl are requested"""
+        response = self._xml('https://elnacional.com.do/news-sitemap.xml', SITEMAP_INDEX)
+        requests = list(self.spider.parse_sitemap(response))
+
+        self.assertEqual([request.url for request in requests], ['https://elnacional.com.do/sitemap-2024-05.xml'])
+        self.assertTrue(requests[0].meta['conditional'])
+
+    def test_news_sitemap_entries(self):
+        """Test that new and undated sitemap URLs are followed with their news title"""
+        response = self._xml('https://elnacional.com.do/sitemap-2024-05.xml', NEWS_SITEMAP)
+        requests = list(self.spider.parse_sitemap(response))
+
+        self.assertEqual([request.url for request in requests], [
+            'https://elnacional.com.do/nota-sitemap/',
+            'https://elnacional.com.do/nota-sin-fecha/',
+        ])
+        self.assertEqual(requests[0].meta['item']['title'], 'Nota del sitemap')
+
+    def test_discovered_article_uses_page_title(self):
+        """Test that the article title is read from the page when the entry had none"""
+        response = self._xml('https://elnacional.com.do/sitemap-2024-05.xml', NEWS_SITEMAP)
+        request = list(self.spider.parse_sitemap(response))[1]
+        page = HtmlResponse(
+            url=request.url,
+            body='<h1 class="entry-title">Título de la página</h1><div class="entry-content"><p>Texto.</p></div>'.encode('utf-8'),
+            encoding='utf-8',
+            request=request
+        )
+
+        item = next(iter(self.spider.parse_discovered_article(page)))
+
+        self.assertEqual(item['title'], 'Título de la página')
+        self.assertEqual(item['content'], 'Texto.')
+        self.assertEqual(item['source'], 'el_nacional')
+        self.assertEqual(item['extraction_paths']['title'], 'css')
+
+    def test_discovered_article_reads_open_graph(self):
+        """Test that fields missing from the entry are filled from the page's OpenGraph tags"""
+        response = self._xml('https://elnacional.com.do/sitemap-2024-05.xml', NEWS_SITEMAP)
+        request = list(self.spider.parse_sitemap(response))[1]
+        page = HtmlResponse(
+            url=request.url,
+            body=('<html><head><meta property="og:title" content="Título OG">'
+                  '<meta property="article:section" content="Economía">'
+                  '<meta property="og:image" content="/img/nota.jpg"></head>'
+                  '<body><div class="entry-content"><p>Texto.</p></div></body></html>').encode('utf-8'),
+            encoding='utf-8',
+            request=request
+        )
+
+        item = next(iter(self.spider.parse_discovered_article(page)))
+
+        self.assertEqual(item['title'], 'Título OG')
+        self.assertEqual(item['category'], 'Economía')
+        self.assertEqual(item['photo_url'], 'https://elnacional.com.do/img/nota.jpg')
+        self.assertEqual(item['extraction_paths']['category'], 'meta')
+
+
+class TestListingDigest(unittest.TestCase):
+    """Test cases for skipping unchanged homepage listings"""
+
+    LISTING = '''
+        <div class="utf_featured_post_area">
+          <article><a href="/nota-1/"><h2>Nota 1</h2></a></article>
+          <article><a href="/nota-2/"><h2>Nota 2</h2></a></article>
+        </div>
+    '''
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.spider = ElNacionalSpider()
+        self.spider.crawler = Mock()
+        self.url = ElNacionalSpider.start_urls[0]
+
+    def _listing(self, stored_digest=None, status=200, body=None):
+        request = Request(self.url, meta={'conditional': True, 'listing_digest': stored_digest})
+        return HtmlResponse(url=self.url, body=(self.LISTING if body is None else body).encode('utf-8'),
+                            encoding='utf-8', status=status, request=request)
+
+    def test_homepage_requests_are_conditional(self):
+        """Test that homepage requests carry validators and accept 304"""
+        request = next(iter(self.spider.start_requests()))
+        self.assertTrue(request.meta['conditional'])
+        self.assertIn(304, request.meta['handle_httpstatus_list'])
+
+    def test_digest_follows_order(self):
+        """Test that the digest changes when the same articles are reordered"""
+        first = listing_digest(['https://a.do/1', 'https://a.do/2'])
+        self.assertEqual(first, listing_digest(['https://a.do/1', 'https://a.do/2']))
+        self.assertNotEqual(first, listing_digest(['https://a.do/2', 'https://a.do/1']))
+
+    def test_new_listing_is_followed(self):
+        """Test that a changed listing is crawled and its digest recorded"""
+        requests = list(self.spider.parse(self._listing(stored_digest='previous')))
+
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(self.spider.listing_digests[self.url], listing_digest([r.url for r in requests]))
+        self.spider.crawler.stats.inc_value.assert_not_called()
+
+    def test_unchanged_listing_requests_nothing(self):
+        """Test that a listing with the stored digest yields no article requests"""
+        digest = listing_digest(['https://elnacional.com.do/nota-1/', 'https://elnacional.com.do/nota-2/'])
+        before = metrics.LISTINGS_UNCHANGED.get('el_nacional')
+
+        requests = list(self.spider.parse(self._listing(stored_digest=digest)))
+
+        self.assertEqual(requests, [])
+        self.spider.crawler.stats.inc_value.assert_called_once_with('listing/unchanged')
+        self.assertEqual(metrics.LISTINGS_UNCHANGED.get('el_nacional'), before + 1)
+
+    def test_failed_article_marks_listing_incomplete(self):
+        """Test that a failed article request keeps the listing from being skipped next crawl"""
+        from scrapy.exceptions import IgnoreRequest
+        from twisted.python.failure import Failure
+
+        stored, failed = list(self.spider.parse(self._listing(stored_digest='previous')))
+        ignored = Failure(IgnoreRequest("Article already stored"))
+        ignored.request = stored
+        error = Failure(TimeoutError("timed out"))
+        error.request = failed
+
+        stored.errback(ignored)
+        self.assertEqual(self.spider.incomplete_listings, set())
+        failed.errback(error)
+
+        self.assertEqual(failed.meta['listing'], self.url)
+        self.assertEqual(self.spider.incomplete_listings, {self.url})
+        self.assertNotIn(self.url, self.spider.listing_digests)
+
+    def test_not_modified_listing_requests_nothing(self):
+        """Test that a 304 homepage counts as unchanged and keeps the stored digest"""
+        requests = list(self.spider.parse(self._listing(stored_digest='previous', status=304, body='')))
+
+        self.assertEqual(requests, [])
+        self.assertEqual(self.spider.listing_digests, {})
+        self.spider.crawler.stats.inc_value.assert_called_once_with('listing/unchanged')
+
+
+class TestBackfill(unittest.TestCase):
+    """Test cases for the section backfill mode"""
+
+    PAGE = '''
+        <article><h2><a href="/nueva/">Nota nueva</a></h2><time datetime="2024-03-02T10:00:00-04:00"></time></article>
+        <article><h2><a href="/sin-fecha/">Nota sin fecha</a></h2></article>
+        <article><h2><a href="/antigua/">Nota antigua</a></h2><time datetime="2023-12-20T10:00:00-04:00"></time></article>
+    '''
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.state = Mock()
+        self.state.load_backfill.return_value = {}
+        self.spider = ElNacionalSpider(discovery='backfill', until='2024-01-01')
+        self.spider.state_factory = lambda: self.state
+        self.spider.crawler = Mock()
+
+    def _page(self, page, body, status=200):
+        request = self.spider.backfill_page_request('nacionales', page)
+        return HtmlResponse(url=request.url, body=body.encode('utf-8'), encoding='utf-8', status=status,
+                            request=request)
+
+    def test_until_is_required(self):
+        """Test that a backfill without a target date is rejected"""
+        with self.assertRaises(ValueError):
+            list(ElNacionalSpider(discovery='backfill').start_requests())
+
+    def test_resumes_from_stored_cursors(self):
+        """Test that sections continue at their stored page and finished sections are skipped"""
+        self.state.load_backfill.return_value = {
+            'nacionales': {'page': 7, 'done': False},
+            'economia': {'page': 3, 'done': True, 'until': datetime(2024, 1, 1)},
+        }
+
+        requests = list(self.spider.start_requests())
+
+        self.assertEqual([request.url for request in requests],
+                         ['https://elnacional.com.do/category/nacionales/page/7/'])
+        self.assertLess(requests[0].priority, 0)
+
+    def test_page_follows_articles_and_next_page(self):
+        """Test that entries newer than the target and undated ones are followed before the next page"""
+        list(self.spider.start_requests())
+
+        requests = list(self.spider.parse_backfill_page(self._page(2, self.PAGE)))
+
+        self.assertEqual([request.url for request in requests], [
+            'https://elnacional.com.do/nueva/',
+            'https://elnacional.com.do/sin-fecha/',
+            'https://elnacional.com.do/category/nacionales/page/3/',
+        ])
+        self.assertGreater(requests[0].priority, requests[-1].priority)
+        self.assertEqual(requests[0].meta['item']['title'], 'Nota nueva')
+        self.state.save_backfill.assert_called_once_with(
+            'el_nacional', 'nacionales', page=2, done=False, until=datetime(2024, 1, 1))
+
+    def test_stops_at_target_date(self):
+        """Test that a page whose dated entries are all older than the target ends the section"""
+        list(self.spider.start_requests())
+        old_page = self.PAGE.replace('2024-03-02', '2023-11-02').replace(
+            '<article><h2><a href="/sin-fecha/">Nota sin fecha</a></h2></article>', '')
+
+        requests = list(self.spider.parse_backfill_page(self._page(9, old_page)))
+
+        self.assertEqual(requests, [])
+        self.assertTrue(self.state.save_backfill.call_args[1]['done'])
+
+    def test_stops_after_last_page(self):
+        """Test that a missing page ends the section"""
+        list(self.spider.start_requests())
+
+        requests = list(self.spider.parse_backfill_page(self._page(40, 'Not found', status=404)))
+
+        self.assertEqual(requests, [])
+        self.assertTrue(self.state.save_backfill.call_args[1]['done'])
+
+    def test_backfill_settings(self):
+        """Test that the backfill keeps the shared pipelines with a bounded concurrency"""
+        import backfill
+
+        settings = backfill.get_backfill_settings(concurrency=1)
+
+        self.assertEqual(settings['CONCURRENT_REQUESTS_PER_DOMAIN'], 1)
+        self.assertNotIn('middlewares.ConditionalRequestMiddleware', settings['DOWNLOADER_MIDDLEWARES'])
+        self.assertIn('middlewares.KnownUrlFilterMiddleware', settings['DOWNLOADER_MIDDLEWARES'])
+        self.assertIn('pipelines.ThreadedMongoDBPipeline', settings['ITEM_PIPELINES'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+"""
+Unit tests for JsonLinesBackupPipeline and the backup reader
+"""
+import unittest
+import tempfile
+import json
+import os
+import shutil
+from unittest.mock import Mock, patch
+from datetime import datetime
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import exporters
+from exporters import JsonLinesBackupPipeline, iter_backup_records, open_compressed
+
+
+class TestJsonLinesBackupPipeline(unittest.TestCase):
+    """Test cases for JsonLinesBackupPipeline"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.backup_dir = os.path.join(self.temp_dir, 'outputs')
+        self.pipeline = JsonLinesBackupPipeline(self.backup_dir)
+        self.mock_spider = Mock()
+        self.mock_spider.name = 'test-spider'
+        self.mock_spider.source = 'test_source'
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def _read_lines(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_init(self):
+        """Test pipeline initialization"""
+        self.assertEqual(self.pipeline.backup_dir, self.backup_dir)
+        self.assertEqual(self.pipeline.compression, '')
+        self.assertIsNone(self.pipeline.file)
+
+    def test_init_rejects_unknown_compression(self):
+        """Test that an unsupported compression is rejected"""
+        with self.assertRaises(ValueError):
+            JsonLinesBackupPipeline(self.backup_dir, compression='lz4')
+
+    def test_from_crawler(self):
+        """Test from_crawler reads the backup directory and compression settings"""
+        mock_crawler = Mock()
+        mock_crawler.settings.get.side_effect = lambda key, default=None: {
+            'BACKUP_DIR': '/test/path/outputs',
+            'BACKUP_COMPRESSION': 'gzip'
+        }.get(key, default)
+
+        pipeline = JsonLinesBackupPipeline.from_crawler(mock_crawler)
+
+        self.assertEqual(pipeline.backup_dir, '/test/path/outputs')
+        self.assertEqual(pipeline.compression, 'gzip')
+
+    def test_items_are_written_as_they_arrive(self):
+        """Test that each item is on disk right after process_item"""
+        self.pipeline.open_spider(self.mock_spider)
+
+        item = {'title': 'Article 1', 'url': 'https://example.com/1'}
+        result = self.pipeline.process_item(item, self.mock_spider)
+
+        self.assertEqual(result, item)
+        self.assertEqual(self._read_lines(self.pipeline.output_file), [item])
+
+        self.pipeline.process_item({'title': 'Article 2'}, self.mock_spider)
+        self.assertEqual(len(self._read_lines(self.pipeline.output_file)), 2)
+
+    def test_backup_path_layout(self):
+        """Test that backups are grouped by source and date with one file per run"""
+        self.pipeline.open_spider(self.mock_spider)
+        self.pipeline.process_item({'title': 'Article'}, self.mock_spider)
+
+        today = datetime.now().strftime('%Y-%m-%d')
+        expected_dir = os.path.join(self.backup_dir, 'test_source', today)
+        self.assertEqual(os.path.dirname(self.pipeline.output_file), expected_dir)
+        self.assertEqual(
+            os.path.basename(self.pipeline.output_file),
+            f'test-spider-{self.pipeline.run_id}.jsonl'
+        )
+
+    def test_rotation_on_date_change(self):
+        """Test that a new file is started when the date changes mid-run"""
+        self.pipeline.open_spider(self.mock_spider)
+
+        with patch('exporters.datetime') as mock_datetime:
+            mock_datetime.now.return_value = datetime(2025, 1, 1, 23, 59)
+            self.pipeline.process_item({'title': 'Before midnight'}, self.mock_spider)
+            first_file = self.pipeline.output_file
+
+            mock_datetime.now.return_value = datetime(2025, 1, 2, 0, 1)
+            self.pipeline.process_item({'title': 'After midnight'}, self.mock_spider)
+            second_file = self.pipeline.output_file
+
+        self.pipeline.close_spider(self.mock_spider)
+
+        self.assertNotEqual(first_file, second_file)
+        self.assertIn('2025-01-01', first_file)
+        self.assertIn('2025-01-02', second_file)
+        self.assertEqual(self._read_lines(first_file), [{'title': 'Before midnight'}])
+        self.assertEqual(self._read_lines(second_file), [{'title': 'After midnight'}])
+
+    def test_unicode_is_not_escaped(self):
+        """Test that unicode characters are written as-is"""
+        self.pipeline.open_spider(self.mock_spider)
+        self.pipeline.process_item({'title': 'Test content with unicode: ñáéíóú'}, self.mock_spider)
+
+        with open(self.pipeline.output_file, 'r', encoding='utf-8') as f:
+            self.assertIn('ñáéíóú', f.read())
+
+    def test_non_json_values_are_serialized(self):
+        """Test that datetimes and other values are written as strings"""
+        self.pipeline.open_spider(self.mock_spider)
+        self.pipeline.process_item({'scraped_at': datetime(2025, 1, 1, 12, 0)}, self.mock_spider)
+
+        self.assertEqual(
+            self._read_lines(self.pipeline.output_file),
+            [{'scraped_at': '2025-01-01 12:00:00'}]
+        )
+
+    def test_close_spider_without_items(self):
+        """Test that closing a spider that produced no items does not fail"""
+        self.pipeline.open_spider(self.mock_spider)
+        self.pipeline.close_spider(self.mock_spider)
+
+        self.assertIsNone(self.pipeline.output_file)
+
+    def test_gzip_round_trip(self):
+        """Test writing and reading a gzip-compressed backup"""
+        pipeline = JsonLinesBackupPipeline(self.backup_dir, compression='gzip')
+        pipeline.open_spider(self.mock_spider)
+        items = [{'title': f'Article {i}'} for i in range(3)]
+        for item in items:
+            pipeline.process_item(item, self.mock_spider)
+
+        # Records are readable before the file is closed
+        self.assertEqual(list(iter_backup_records(pipeline.output_file)), items)
+
+        pipeline.close_spider(self.mock_spider)
+        self.assertTrue(pipeline.output_file.endswith('.jsonl.gz'))
+        self.assertEqual(list(iter_backup_records(pipeline.output_file)), items)
+
+    @unittest.skipIf(exporters.zstandard is None, 'zstandard is not installed')
+    def test_zstd_round_trip(self):
+        """Test writing and reading a zstd-compressed backup"""
+        pipeline = JsonLinesBackupPipeline(self.backup_dir, compression='zstd')
+        pipeline.open_spider(self.mock_spider)
+        items = [{'title': f'Artículo {i}'} for i in range(3)]
+        for item in items:
+            pipeline.process_item(item, self.mock_spider)
+        pipeline.close_spider(self.mock_spider)
+
+        self.assertTrue(pipeline.output_file.endswith('.jsonl.zst'))
+        self.assertEqual(list(iter_backup_records(pipeline.output_file)), items)
+
+
+class TestIterBackupRecords(unittest.TestCase):
+    """Test cases for iter_backup_records"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, relative_path, content, compression=''):
+        path = os.path.join(self.temp_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open_compressed(path, 'w', compression) as f:
+            f.write(content)
+        return path
+
+    def test_reads_lazily(self):
+        """Test that records are produced one at a time"""
+        path = self._write('a.jsonl', '{"n": 1}\n{"n": 2}\n')
+
+        records = iter_backup_records(path)
+
+        self.assertEqual(next(records), {'n': 1})
+        self.assertEqual(next(records), {'n': 2})
+        with self.assertRaises(StopIteration):
+            next(records)
+
+    def test_skips_truncated_last_line(self):
+        """Test that a partially written line from a crashed run is skipped"""
+        path = self._write('a.jsonl', '{"n": 1}\n{"n": 2')
+
+        self.assertEqual(list(iter_backup_records(path)), [{'n': 1}])
+
+    def test_reads_directory_in_order(self):
+        """Test that every backup file below a directory is read in name order"""
+        self._write('src/2025-01-02/spider-2.jsonl', '{"n": 3}\n')
+        self._write('src/2025-01-01/spider-1.jsonl.gz', '{"n": 1}\n{"n": 2}\n', compression='gzip')
+        self._write('src/2025-01-01/notes.txt', 'not a backup')
+
+        records = list(iter_backup_records(self.temp_dir))
+
+        self.assertEqual(records, [{'n': 1}, {'n': 2}, {'n': 3}])
+
+
+if __name__ == '__main__':
+    unittest.main()
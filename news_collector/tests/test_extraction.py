@@ -0,0 +1,243 @@
+"""
+Unit tests for the declarative extraction engine and the spiders built on it
+"""
+import unittest
+import sys
+import os
+from datetime import datetime
+
+from scrapy import Request
+from scrapy.http import HtmlResponse
+
+# Add parent and spiders directories to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'spiders'))
+
+from extraction import ExtractionSpec, Field
+from spiders.el_nacional import ElNacionalSpider
+from spiders.listin_diario import ListinDiarioSpider
+
+
+def html_response(url, body, meta=None):
+    return HtmlResponse(url=url, body=body.encode('utf-8'), encoding='utf-8',
+                        request=Request(url, meta=meta or {}))
+
+
+class TestExtractionSpec(unittest.TestCase):
+    """Test cases for Field and ExtractionSpec"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.response = html_response('https://example.com/a', """
+            <html><body>
+              <div class="byline">  </div>
+              <div class="author"> Ana Pérez </div>
+              <article><p>Primer párrafo.</p><p>Segundo <b>párrafo</b>.</p></article>
+              <a href="/otra" title="Otra">Otra</a>
+            </body></html>
+        """)
+
+    def test_first_mode_uses_ordered_fallbacks(self):
+        """Test that the first selector with a non-blank match wins"""
+        spec = ExtractionSpec(author=Field(css=['.missing::text', '.byline::text', '.author::text']))
+        self.assertEqual(spec.extract(self.response), {'author': 'Ana Pérez'})
+
+    def test_join_mode_matches_parsel(self):
+        """Test that joined text equals what response.css().getall() produces"""
+        spec = ExtractionSpec(content=Field(css='article p::text', mode='join'))
+        expected = ' '.join(self.response.css('article p::text').getall()).strip()
+        self.assertEqual(spec.extract(self.response)['content'], expected)
+
+    def test_attributes_and_xpath(self):
+        """Test that ::attr() selectors and raw XPath expressions are supported"""
+        spec = ExtractionSpec(
+            href=Field(css='a::attr(href)'),
+            title=Field(xpath='//a/@title'),
+        )
+        self.assertEqual(spec.extract(self.response), {'href': '/otra', 'title': 'Otra'})
+
+    def test_defaults(self):
+        """Test that plain and callable defaults are used when nothing matches"""
+        spec = ExtractionSpec(
+            author=Field(css='.missing::text', default='unknown'),
+            tags=Field(css='.missing', mode='nodes', default=list),
+        )
+        self.assertEqual(spec.extract(self.response), {'author': 'unknown', 'tags': []})
+
+    def test_nodes_can_be_extracted_again(self):
+        """Test that nodes returned by a field can be used as extraction roots"""
+        nodes = ExtractionSpec(paragraphs=Field(css='article p', mode='nodes')).extract(self.response)['paragraphs']
+        text = ExtractionSpec(text=Field(css='::text', mode='join'))
+        self.assertEqual(len(nodes), 2)
+        self.assertEqual(text.extract(nodes[1])['text'], 'Segundo  párrafo .')
+
+    def test_unknown_mode_raises(self):
+        """Test that an unknown mode is rejected when the spec is built"""
+        with self.assertRaises(ValueError):
+            Field(css='p::text', mode='last')
+
+
+class TestStructuredData(unittest.TestCase):
+    """Test cases for fields read from JSON-LD and OpenGraph"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.spec = ExtractionSpec(
+            author=Field(jsonld='author', meta='author', css='.author::text', default='unknown'),
+            created_at=Field(jsonld='datePublished', meta='article:published_time', css='time::text'),
+            photo_url=Field(jsonld='image', meta='og:image'),
+        )
+
+    def test_jsonld_graph_wins(self):
+        """Test that an article inside a JSON-LD @graph is read before meta tags and selectors"""
+        response = html_response('https://example.com/a', """
+            <html><head>
+              <script type="application/ld+json">{"@graph": [
+                {"@type": "WebPage", "name": "Portada"},
+                {"@type": "NewsArticle", "author": [{"@type": "Person", "name": "Ana"}, {"name": "Luis"}],
+                 "datePublished": "2024-05-02T10:00:00-04:00", "image": {"url": "https://example.com/a.jpg"}}
+              ]}</script>
+              <meta property="article:published_time" content="2024-05-01T00:00:00">
+            </head><body><div class="author">Otro</div><time>2 mayo</time></body></html>
+        """)
+        paths = {}
+
+        values = self.spec.extract(response, paths=paths)
+
+        self.assertEqual(values, {'author': 'Ana, Luis', 'created_at': '2024-05-02T10:00:00-04:00',
+                                  'photo_url': 'https://example.com/a.jpg'})
+        self.assertEqual(paths, {'author': 'jsonld', 'created_at': 'jsonld', 'photo_url': 'jsonld'})
+
+    def test_meta_then_selectors(self):
+        """Test that invalid JSON-LD is skipped and meta tags come before selectors"""
+        response = html_response('https://example.com/a', """
+            <html><head>
+              <script type="application/ld+json">{not json</script>
+              <meta property="og:image" content="https://example.com/b.jpg">
+            </head><body><div class="author"> Ana </div></body></html>
+        """)
+        paths = {}
+
+        values = self.spec.extract(response, paths=paths)
+
+        self.assertEqual(values, {'author': 'Ana', 'created_at': None, 'photo_url': 'https://example.com/b.jpg'})
+        self.assertEqual(paths, {'author': 'css', 'created_at': 'default', 'photo_url': 'meta'})
+
+    def test_structured_data_can_be_skipped(self):
+        """Test that structured=False only runs the selectors"""
+        response = html_response('https://example.com/a', """
+            <html><head><meta name="author" content="Meta"></head>
+            <body><div class="author">Ana</div></body></html>
+        """)
+        paths = {}
+
+        self.assertEqual(self.spec.extract(response, paths=paths, structured=False)['author'], 'Ana')
+        self.assertEqual(paths['author'], 'css')
+
+    def test_default_path(self):
+        """Test that a field falling back to its default is reported as such"""
+        paths = {}
+        self.spec.extract(html_response('https://example.com/a', '<p>Nada</p>'), paths=paths)
+        self.assertEqual(paths['author'], 'default')
+
+    def test_nodes_mode_rejects_structured_sources(self):
+        """Test that structured data cannot back a 'nodes' field"""
+        with self.assertRaises(ValueError):
+            Field(jsonld='author', mode='nodes')
+
+
+class TestSpiderExtraction(unittest.TestCase):
+    """Test cases for the spiders' extraction specs"""
+
+    def test_el_nacional_listing(self):
+        """Test that El Nacional listing entries become article requests"""
+        response = html_response('https://elnacional.com.do/', """
+            <div class="utf_featured_post_area">
+              <article>
+                <span class="category"> Política </span>
+                <a href="/politica/nota-1/"><h2>Título uno</h2></a>
+                <img src="/img/1.jpg">
+                <p>Resumen uno</p>
+              </article>
+              <article><h2>Sin enlace</h2></article>
+            </div>
+        """)
+
+        requests = list(ElNacionalSpider().parse(response))
+
+        self.assertEqual(len(requests), 1)
+        item = requests[0].meta['item']
+        self.assertEqual(requests[0].url, 'https://elnacional.com.do/politica/nota-1/')
+        self.assertTrue(requests[0].dont_filter)
+        self.assertEqual(item['title'], 'Título uno')
+        self.assertEqual(item['short_description'], 'Resumen uno')
+        self.assertEqual(item['category'], 'Política')
+        self.assertEqual(item['photo_url'], 'https://elnacional.com.do/img/1.jpg')
+
+    def test_el_nacional_article(self):
+        """Test that El Nacional article pages fill content, author and date"""
+        response = html_response('https://elnacional.com.do/politica/nota-1/', """
+            <div class="post-content"><p>Uno.</p><p>Dos.</p></div>
+            <span class="byline">Redacción</span>
+            <time datetime="2024-05-02T10:00:00">2 mayo, 2024</time>
+        """, meta={'item': {'title': 'Título uno'}})
+
+        item = next(ElNacionalSpider().parse_article(response))
+
+        self.assertEqual(item['content'], 'Uno. Dos.')
+        self.assertEqual(item['author'], 'Redacción')
+        self.assertEqual(item['created_at'], '2 mayo, 2024')
+        self.assertEqual(item['source'], 'el_nacional')
+        self.assertEqual(item['extraction_paths'], {'content': 'css', 'author': 'css', 'created_at': 'css'})
+
+    def test_el_nacional_fixture_uses_json_ld(self):
+        """Test that the El Nacional fixtures take author and date from their JSON-LD"""
+        fixture = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'el_nacional', 'article_1.html')
+        with open(fixture, encoding='utf-8') as f:
+            response = html_response('https://elnacional.com.do/nota/', f.read(), meta={'item': {}})
+
+        item = next(ElNacionalSpider().parse_article(response))
+
+        self.assertEqual(item['extraction_paths']['author'], 'jsonld')
+        self.assertEqual(item['extraction_paths']['created_at'], 'jsonld')
+        self.assertEqual(item['extraction_paths']['content'], 'css')
+
+    def test_listin_diario_listing(self):
+        """Test that Listín Diario title links use their article container"""
+        response = html_response('https://listindiario.com', """
+            <div class="home-boards">
+              <div class="c-article">
+                <span class="c-article__epigraph">Economía</span>
+                <img data-src="/img/2.jpg">
+                <h3 class="c-article__title"><a href="/economia/nota-2">Título dos</a></h3>
+                <p class="c-article__excerpt">Resumen dos</p>
+              </div>
+            </div>
+        """)
+
+        requests = list(ListinDiarioSpider().parse(response))
+
+        self.assertEqual(len(requests), 1)
+        item = requests[0].meta['item']
+        self.assertEqual(item['url'], 'https://listindiario.com/economia/nota-2')
+        self.assertEqual(item['title'], 'Título dos')
+        self.assertEqual(item['short_description'], 'Resumen dos')
+        self.assertEqual(item['category'], 'Economía')
+        self.assertEqual(item['photo_url'], 'https://listindiario.com/img/2.jpg')
+
+    def test_listin_diario_article_defaults(self):
+        """Test that missing author and date fall back to their defaults"""
+        response = html_response('https://listindiario.com/economia/nota-2', """
+            <div class="c-detail__body"><p>Texto.</p></div>
+        """, meta={'item': {'title': 'Título dos'}})
+
+        item = next(ListinDiarioSpider().parse_article(response))
+
+        self.assertEqual(item['content'], 'Texto.')
+        self.assertEqual(item['author'], 'unknown')
+        self.assertEqual(item['created_at'], datetime.now().strftime("%d/%m/%Y"))
+        self.assertEqual(item['source'], 'listin_diario')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Unit tests for URL canonicalization and content fingerprints
+"""
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fingerprints import (
+    canonicalize_url,
+    content_hash,
+    fingerprint_article,
+    hamming_distance,
+    simhash,
+    simhash_bands,
+)
+
+ARTICLE = (
+    "El Gobierno dominicano anunció este lunes un nuevo plan de inversión en infraestructura "
+    "vial que abarcará las provincias del Cibao y la región Este, con una inversión estimada "
+    "de 15,000 millones de pesos durante los próximos dos años, según informó el ministro de "
+    "Obras Públicas en una rueda de prensa celebrada en el Palacio Nacional."
+)
+
+
+class TestCanonicalizeUrl(unittest.TestCase):
+    """Test cases for canonicalize_url"""
+
+    def test_strips_tracking_parameters(self):
+        """Test that utm and click-id parameters are removed"""
+        url = 'https://listindiario.com/la-republica/nota.html?utm_source=fb&utm_medium=social&fbclid=abc'
+
+        self.assertEqual(canonicalize_url(url), 'https://listindiario.com/la-republica/nota.html')
+
+    def test_keeps_meaningful_parameters_sorted(self):
+        """Test that other query parameters are kept in a stable order"""
+        url = 'https://elnacional.com.do/?p=2&utm_campaign=x&a=1'
+
+        self.assertEqual(canonicalize_url(url), 'https://elnacional.com.do/?a=1&p=2')
+
+    def test_lowercases_host_and_drops_fragment_and_default_port(self):
+        """Test scheme, host, port and fragment normalization"""
+        url = 'HTTPS://ElNacional.com.do:443/nota/#comentarios'
+
+        self.assertEqual(canonicalize_url(url), 'https://elnacional.com.do/nota/')
+
+    def test_amp_variants_map_to_regular_page(self):
+        """Test that AMP URLs are mapped to the regular article URL"""
+        self.assertEqual(
+            canonicalize_url('https://elnacional.com.do/nota-ejemplo/amp/'),
+            'https://elnacional.com.do/nota-ejemplo/'
+        )
+        self.assertEqual(
+            canonicalize_url('https://listindiario.com/amp/la-republica/nota.html'),
+            'https://listindiario.com/la-republica/nota.html'
+        )
+        self.assertEqual(
+            canonicalize_url('https://listindiario.com/la-republica/nota.amp.html'),
+            'https://listindiario.com/la-republica/nota.html'
+        )
+        self.assertEqual(
+            canonicalize_url('https://elnacional.com.do/nota-ejemplo/?amp=1'),
+            'https://elnacional.com.do/nota-ejemplo/'
+        )
+
+    def test_empty_url(self):
+        """Test that empty URLs are returned unchanged"""
+        self.assertEqual(canonicalize_url(''), '')
+        self.assertIsNone(canonicalize_url(None))
+
+
+class TestContentFingerprints(unittest.TestCase):
+    """Test cases for content hashes and SimHash"""
+
+    def test_content_hash_ignores_formatting(self):
+        """Test that case, accents and whitespace do not change the hash"""
+        self.assertEqual(
+            content_hash('El Gobierno  anunció\nun plan.'),
+            content_hash('el gobierno anuncio un plan')
+        )
+
+    def test_content_hash_differs_for_different_text(self):
+        """Test that different text gives a different hash"""
+        self.assertNotEqual(content_hash('un plan'), content_hash('otro plan'))
+
+    def test_simhash_near_duplicates_are_close(self):
+        """Test that a lightly edited copy stays within a few bits"""
+        edited = ARTICLE.replace('este lunes', 'el lunes') + ' (Con información de agencias)'
+
+        self.assertLessEqual(hamming_distance(simhash(ARTICLE), simhash(edited)), 10)
+
+    def test_simhash_unrelated_texts_are_far(self):
+        """Test that unrelated articles differ in many bits"""
+        other = (
+            "La selección nacional de béisbol clasificó a la final del torneo regional tras vencer "
+            "a Puerto Rico con un jonrón en la novena entrada ante un estadio lleno de aficionados "
+            "que celebraron hasta la madrugada en las calles de Santo Domingo."
+        )
+
+        self.assertGreater(hamming_distance(simhash(ARTICLE), simhash(other)), 10)
+
+    def test_bands_are_shared_within_distance(self):
+        """Test that fingerprints within three bits share at least one band"""
+        fingerprint = simhash(ARTICLE)
+        flipped = fingerprint ^ (1 << 0) ^ (1 << 17) ^ (1 << 40)
+
+        shared = set(simhash_bands(fingerprint)) & set(simhash_bands(flipped))
+        self.assertTrue(shared)
+
+    def test_bands_are_tagged_with_position(self):
+        """Test that bands carry their position so equal values in different bands do not match"""
+        self.assertEqual(simhash_bands(0), ['0:0000', '1:0000', '2:0000', '3:0000'])
+
+    def test_fingerprint_article(self):
+        """Test the stored fingerprint fields"""
+        fingerprints = fingerprint_article(ARTICLE)
+
+        self.assertEqual(fingerprints['content_hash'], content_hash(ARTICLE))
+        self.assertEqual(len(fingerprints['simhash']), 16)
+        self.assertEqual(len(fingerprints['simhash_bands']), 4)
+
+    def test_short_content_is_not_fingerprinted(self):
+        """Test that empty or very short bodies are left without fingerprints"""
+        self.assertEqual(fingerprint_article(''), {})
+        self.assertEqual(fingerprint_article('Solo unas palabras.'), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
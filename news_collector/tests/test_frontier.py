@@ -0,0 +1,324 @@
+"""
+Unit tests for the shared MongoDB crawl frontier
+
+The ``TestMongoFrontier`` cases run against a real MongoDB server; set
+``MONGO_TEST_URI`` (for example ``mongodb://localhost:27017/``) to run them.
+"""
+import unittest
+from unittest.mock import Mock
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta
+
+from scrapy import Request, Spider
+from scrapy.http import Response
+from scrapy.utils.test import get_crawler
+from twisted.internet import defer
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frontier import FrontierAckMiddleware, MongoFrontier, MongoScheduler
+
+MONGO_TEST_URI = os.getenv('MONGO_TEST_URI')
+
+
+class FrontierSpider(Spider):
+    name = 'frontier-test'
+
+    def parse_article(self, response):
+        pass
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = datetime(2024, 5, 2, 12, 0)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+@unittest.skipUnless(MONGO_TEST_URI, 'MONGO_TEST_URI is not set')
+class TestMongoFrontier(unittest.TestCase):
+    """Test cases for MongoFrontier against a local mongod"""
+
+    def setUp(self):
+        """Set up two workers sharing one crawl in a scratch database"""
+        from pymongo import MongoClient
+
+        self.client = MongoClient(MONGO_TEST_URI)
+        self.db_name = f"frontier_test_{uuid.uuid4().hex[:8]}"
+        self.clock = FakeClock()
+        db = self.client[self.db_name]
+        self.worker_a = MongoFrontier(db, 'run-1:test', domain_delay=1.0, lease=60, worker_id='a', clock=self.clock)
+        self.worker_b = MongoFrontier(db, 'run-1:test', domain_delay=1.0, lease=60, worker_id='b', clock=self.clock)
+        self.worker_a.create_indexes()
+
+    def tearDown(self):
+        """Drop the scratch database"""
+        self.client.drop_database(self.db_name)
+        self.client.close()
+
+    def test_seen_requests_are_queued_once(self):
+        """Test that a fingerprint pushed by two workers is queued once"""
+        self.assertTrue(self.worker_a.push('fp1', 'example.com', 0, {'url': 'https://example.com/1'}))
+        self.assertFalse(self.worker_b.push('fp1', 'example.com', 0, {'url': 'https://example.com/1'}))
+        self.assertEqual(self.worker_a.pending(), 1)
+
+    def test_push_many_drops_duplicates(self):
+        """Test that a batch is queued except the fingerprints already seen, in the crawl or the batch"""
+        self.worker_a.push('fp1', 'example.com', 0, {})
+
+        counts = self.worker_b.push_many([('fp1', 'example.com', 0, {}, None),
+                                          ('fp2', 'example.com', 0, {}, None),
+                                          ('fp2', 'example.com', 0, {}, None)])
+
+        self.assertEqual(counts, (1, 2, 0))
+        self.assertEqual(self.worker_a.pending(), 2)
+
+    def test_claims_are_exclusive(self):
+        """Test that a request claimed by one worker is not handed to another"""
+        self.worker_a.push('fp1', 'a.example', 0, {})
+        self.worker_a.push('fp2', 'b.example', 0, {})
+
+        first, _ = self.worker_a.claim()
+        second, _ = self.worker_b.claim()
+
+        self.assertIsNotNone(second)
+        self.assertNotEqual(first['fingerprint'], second['fingerprint'])
+        self.assertEqual(self.worker_a.claim(), (None, False))
+
+    def test_domain_delay_is_global(self):
+        """Test that two workers cannot request the same domain within the delay"""
+        self.worker_a.push('fp1', 'example.com', 0, {})
+        self.worker_a.push('fp2', 'example.com', 0, {})
+
+        self.assertIsNotNone(self.worker_a.claim()[0])
+        self.assertIsNone(self.worker_b.claim()[0])
+        self.assertAlmostEqual(self.worker_b.next_slot_in(), 1.0)
+
+        self.clock.advance(1)
+        self.assertIsNotNone(self.worker_b.claim()[0])
+
+    def test_priority_order(self):
+        """Test that higher priority requests are claimed first"""
+        self.worker_a.push('low', 'example.com', 0, {})
+        self.worker_a.push('high', 'example.com', 10, {})
+
+        self.assertEqual(self.worker_a.claim()[0]['fingerprint'], 'high')
+
+    def test_expired_lease_is_reclaimed(self):
+        """Test that the request of a worker that stopped is claimed again after its lease"""
+        self.worker_a.push('fp1', 'example.com', 0, {})
+        self.worker_a.claim()
+
+        self.clock.advance(30)
+        self.assertIsNone(self.worker_b.claim()[0])
+        self.clock.advance(31)
+        doc, reclaimed = self.worker_b.claim()
+
+        self.assertEqual(doc['fingerprint'], 'fp1')
+        self.assertTrue(reclaimed)
+
+    def test_released_request_is_claimed_again(self):
+        """Test that a request handed back by a closing worker is claimable at once"""
+        self.worker_a.push('fp1', 'example.com', 0, {})
+        doc, _ = self.worker_a.claim()
+
+        self.worker_a.release([doc['_id']])
+        self.clock.advance(1)
+        reclaimed, _ = self.worker_b.claim()
+
+        self.assertEqual(reclaimed['_id'], doc['_id'])
+
+    def test_ack_and_retry(self):
+        """Test that acknowledged requests leave the frontier and retries replace their original"""
+        self.worker_a.push('fp1', 'example.com', 0, {})
+        doc, _ = self.worker_a.claim()
+
+        self.assertTrue(self.worker_a.push('fp1', 'example.com', 0, {},
+                                           replaces={'id': doc['_id'], 'fingerprint': 'fp1'}))
+        self.assertEqual(self.worker_a.pending(), 1)
+
+        self.clock.advance(1)
+        retry, _ = self.worker_a.claim()
+        self.worker_a.ack(retry['_id'])
+        self.assertEqual(self.worker_a.pending(), 0)
+
+
+class TestMongoScheduler(unittest.TestCase):
+    """Test cases for MongoScheduler and FrontierAckMiddleware"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.frontier = Mock()
+        self.crawler = get_crawler(FrontierSpider)
+        self.crawler.engine = Mock()
+        self.spider = FrontierSpider()
+        self.scheduler = MongoScheduler(self.frontier, self.crawler, Mock(), prefetch=2)
+        self.threaded = []
+        self.scheduler.defer_to_thread = self._defer_to_thread
+        self.scheduler.writer.defer_to_thread = self._defer_to_thread
+        self.scheduler.open(self.spider)
+        self.frontier.next_slot_in.return_value = None
+        self.frontier.pending.return_value = 1
+        self.frontier.push_many.return_value = (1, 0, 0)
+
+    def _defer_to_thread(self, function, *args):
+        """Record the call instead of starting a thread; ``_run_threads`` runs them"""
+        deferred = defer.Deferred()
+        self.threaded.append((deferred, function, args))
+        return deferred
+
+    def _run_threads(self):
+        while self.threaded:
+            deferred, function, args = self.threaded.pop(0)
+            deferred.callback(function(*args))
+
+    def test_request_round_trip(self):
+        """Test that a queued request comes back with its callback, meta and frontier id"""
+        request = Request('https://example.com/nota/', callback=self.spider.parse_article,
+                          meta={'item': {'title': 'Nota'}}, priority=5)
+        self.assertTrue(self.scheduler.enqueue_request(request))
+        self._run_threads()
+        [(fingerprint, domain, priority, data, replaces)] = self.frontier.push_many.call_args[0][0]
+        self.assertEqual((domain, priority, replaces), ('example.com', 5, None))
+
+        import pickle
+        self.frontier.claim.side_effect = [
+            ({'_id': 'id1', 'fingerprint': fingerprint, 'request': pickle.dumps(data)}, False), (None, False)]
+        self.assertIsNone(self.scheduler.next_request())
+        self._run_threads()
+        restored = self.scheduler.next_request()
+
+        self.assertEqual(restored.url, request.url)
+        self.assertEqual(restored.callback, self.spider.parse_article)
+        self.assertEqual(restored.meta['item'], {'title': 'Nota'})
+        self.assertEqual(restored.meta['frontier_id'], 'id1')
+
+    def test_claims_run_off_the_reactor(self):
+        """Test that next_request only serves prefetched requests and refills the batch in a thread"""
+        import pickle
+        data = Request('https://example.com/nota/').to_dict()
+        docs = [({'_id': f'id{i}', 'fingerprint': f'fp{i}', 'request': pickle.dumps(data)}, False)
+                for i in range(3)]
+        self.frontier.claim.side_effect = docs
+
+        self.assertIsNone(self.scheduler.next_request())
+        self.frontier.claim.assert_not_called()
+        self._run_threads()
+        self.assertEqual(self.frontier.claim.call_count, 2)
+        self.crawler.engine._slot.nextcall.schedule.assert_called_with(0)
+
+        first = self.scheduler.next_request()
+        self.assertEqual(first.meta['frontier_id'], 'id0')
+        self.assertEqual(self.frontier.claim.call_count, 2)
+        self._run_threads()
+
+        self.assertEqual([self.scheduler.next_request().meta['frontier_id'] for _ in range(2)], ['id1', 'id2'])
+
+    def test_unused_requests_are_released_on_close(self):
+        """Test that prefetched requests go back to the frontier when the spider closes"""
+        self.frontier.claim.side_effect = [({'_id': 'id1'}, False), (None, False)]
+        self.scheduler.next_request()
+        self._run_threads()
+
+        closed = self.scheduler.close('finished')
+        self._run_threads()
+
+        self.assertTrue(closed.called)
+        self.assertEqual(list(self.frontier.release.call_args[0][0]), ['id1'])
+        self.frontier.client.close.assert_called_once()
+
+    def test_retry_replaces_claimed_request(self):
+        """Test that a rescheduled request carries the id of the request it replaces"""
+        request = Request('https://example.com/nota/', meta={'frontier_id': 'id1', 'frontier_fingerprint': 'fp'})
+
+        self.scheduler.enqueue_request(request)
+        self._run_threads()
+
+        self.assertEqual(self.frontier.push_many.call_args[0][0][0][4], {'id': 'id1', 'fingerprint': 'fp'})
+        self.assertNotIn('frontier_id', request.meta)
+
+    def test_pushes_are_batched_off_the_reactor(self):
+        """Test that requests enqueued while a batch is written go out together in the next one"""
+        for path in ('a', 'b', 'c'):
+            self.scheduler.enqueue_request(Request(f'https://example.com/{path}'))
+        self.frontier.push_many.assert_not_called()
+
+        self._run_threads()
+
+        self.assertEqual([len(call[0][0]) for call in self.frontier.push_many.call_args_list], [1, 2])
+        self.assertFalse(self.scheduler.writer.busy)
+
+    def test_duplicates_are_counted(self):
+        """Test that requests already seen in the crawl are dropped when written and counted"""
+        self.frontier.push_many.return_value = (0, 1, 0)
+
+        self.assertTrue(self.scheduler.enqueue_request(Request('https://example.com/')))
+        self._run_threads()
+
+        self.scheduler.stats.inc_value.assert_called_with('frontier/duplicate', 1)
+
+    def test_pending_includes_other_workers(self):
+        """Test that the crawl stays open while the shared frontier has requests"""
+        self.frontier.claim.return_value = (None, False)
+        self.frontier.pending.return_value = 2
+
+        self.assertTrue(self.scheduler.has_pending_requests())
+        self.frontier.pending.assert_not_called()
+        self._run_threads()
+        self.assertTrue(self.scheduler.has_pending_requests())
+
+        self.frontier.pending.return_value = 0
+        self.scheduler.next_request()
+        self._run_threads()
+        self.assertFalse(self.scheduler.has_pending_requests())
+
+    def test_pending_follows_own_writes(self):
+        """Test that pushes and acknowledgements adjust the count until the next claim"""
+        self.frontier.claim.return_value = (None, False)
+        self.frontier.pending.return_value = 0
+        self.scheduler.next_request()
+        self._run_threads()
+
+        self.scheduler.enqueue_request(Request('https://example.com/'))
+        self.assertTrue(self.scheduler.has_pending_requests())
+        self._run_threads()
+        self.assertEqual(len(self.scheduler), 1)
+
+        self.frontier.push_many.return_value = (0, 0, 1)
+        self.scheduler.enqueue_request(Request('https://example.com/', meta={'frontier_id': 'id1'}))
+        self._run_threads()
+        # A count brought down to zero by this worker is checked by a claim
+        self.assertTrue(self.scheduler.has_pending_requests())
+        self._run_threads()
+        self.assertFalse(self.scheduler.has_pending_requests())
+
+    def test_ack_middleware(self):
+        """Test that responses and download errors acknowledge their frontier request"""
+        middleware = FrontierAckMiddleware(self.frontier)
+        middleware.writer.defer_to_thread = self._defer_to_thread
+        self.frontier.ack_many.return_value = 1
+        request = Request('https://example.com/', meta={'frontier_id': 'id1'})
+        failed = Request('https://example.com/b', meta={'frontier_id': 'id2'})
+        other = Request('https://example.com/c', meta={'frontier_id': 'id3'})
+
+        middleware.process_response(request, Response(request.url, request=request), self.spider)
+        self.assertIsNone(middleware.process_exception(failed, Exception('timeout'), self.spider))
+        middleware.process_response(other, Response(other.url, request=other), self.spider)
+        self.frontier.ack_many.assert_not_called()
+
+        drained = middleware.spider_closed(self.spider)
+        self._run_threads()
+
+        self.assertTrue(drained.called)
+        self.assertEqual([call[0][0] for call in self.frontier.ack_many.call_args_list], [['id1'], ['id2', 'id3']])
+
+
+if __name__ == '__main__':
+    unittest.main()
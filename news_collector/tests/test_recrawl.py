@@ -0,0 +1,197 @@
+"""
+Unit tests for the edit-aware recrawl of recent articles
+"""
+import unittest
+from unittest.mock import Mock
+import sys
+import os
+from datetime import datetime
+
+from scrapy import Request
+from scrapy.http import HtmlResponse
+from pymongo.errors import BulkWriteError
+
+# Add parent and spiders directories to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'spiders'))
+
+import recrawl
+from fingerprints import fingerprint_article
+
+ORIGINAL = ("El Gobierno anunció un plan de viviendas. La inversión será de 500 millones. "
+            "Las obras iniciarán en junio. Se construirán 2,000 unidades en Santo Domingo. "
+            "El ministro habló con la prensa. Los fondos provienen del presupuesto nacional. "
+            "La oposición pidió más detalles. El plan se presentará al Congreso. "
+            "Los alcaldes apoyan la iniciativa. Las familias podrán inscribirse en línea.")
+
+
+def stored_article(content=ORIGINAL, **fields):
+    doc = {'_id': 'a1', 'url': 'https://elnacional.com.do/plan/', 'source': 'el_nacional',
+           'content': content, 'status': 'completed', **fingerprint_article(content)}
+    doc.update(fields)
+    return doc
+
+
+class TestContentVersions(unittest.TestCase):
+    """Test cases for change ratios, diffs and update plans"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.now = datetime(2024, 5, 3, 12, 0)
+
+    def test_changes_rebuild_the_new_text(self):
+        """Test that stored sentence changes turn the previous text into the new one"""
+        edited = ORIGINAL.replace('500 millones', '650 millones') + ' Fuente: Ministerio de Vivienda.'
+
+        changes = recrawl.content_changes(ORIGINAL, edited)
+
+        self.assertEqual(len(changes), 2)
+        self.assertEqual(changes[0]['removed'], ['La inversión será de 500 millones.'])
+        self.assertEqual(recrawl.apply_changes(ORIGINAL, changes), edited)
+
+    def test_unchanged_text(self):
+        """Test that an identical text changes nothing"""
+        outcome, fields, version = recrawl.plan_update(stored_article(), ORIGINAL, self.now)
+        self.assertEqual((outcome, fields, version), ('unchanged', {}, None))
+
+    def test_minor_edit_keeps_stored_text(self):
+        """Test that a change below the material threshold stores no version"""
+        edited = ORIGINAL.replace('en junio', 'en julio')
+
+        outcome, fields, version = recrawl.plan_update(stored_article(), edited, self.now)
+
+        self.assertEqual(outcome, 'minor')
+        self.assertEqual(fields, {})
+        self.assertIsNone(version)
+
+    def test_material_edit_stores_a_version(self):
+        """Test that a material edit replaces the text without sending the article back to debate"""
+        edited = ORIGINAL.replace('500 millones.', '650 millones de pesos, según el nuevo presupuesto.')
+
+        outcome, fields, version = recrawl.plan_update(stored_article(version=1), edited, self.now)
+
+        self.assertEqual(outcome, 'edited')
+        self.assertEqual(fields['content'], edited)
+        self.assertEqual(fields['content_hash'], fingerprint_article(edited)['content_hash'])
+        self.assertNotIn('status', fields)
+        self.assertEqual(version['version'], 2)
+        self.assertEqual(version['previous_hash'], stored_article()['content_hash'])
+
+    def test_large_edit_resets_status(self):
+        """Test that a rewrite above the reset threshold is debated again"""
+        edited = ORIGINAL.split('. ', 5)[-1] + ' El Congreso rechazó la propuesta y pidió una revisión completa.'
+
+        outcome, fields, version = recrawl.plan_update(stored_article(), edited, self.now)
+
+        self.assertEqual(outcome, 'reset')
+        self.assertEqual(fields['status'], 'new')
+        self.assertGreater(version['change_ratio'], recrawl.RESET_CHANGE)
+
+    def test_processing_article_is_not_reset(self):
+        """Test that an article being debated keeps its status"""
+        edited = 'Texto completamente distinto sobre otro tema.'
+
+        outcome, fields, _ = recrawl.plan_update(stored_article(status='processing'), edited, self.now)
+
+        self.assertEqual(outcome, 'edited')
+        self.assertNotIn('status', fields)
+
+
+class TestRecrawlSpider(unittest.TestCase):
+    """Test cases for RecrawlSpider"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.spider = recrawl.RecrawlSpider()
+        self.spider.crawler = Mock()
+        self.spider.articles = Mock()
+        self.spider.versions = Mock()
+
+    def _response(self, doc, content, status=200, headers=None):
+        request = Request(doc['url'], meta={'article': doc, 'item': {'archive_key': 'k1'}})
+        body = f'<div class="entry-content"><p>{content}</p></div>'.encode('utf-8')
+        return HtmlResponse(url=doc['url'], body=body, encoding='utf-8', status=status, request=request,
+                            headers=headers)
+
+    def test_requests_are_conditional(self):
+        """Test that stored validators are sent with the recrawl requests"""
+        doc = stored_article(etag='"v1"', last_modified='Thu, 02 May 2024 10:00:00 GMT')
+        self.spider.articles.find.return_value.sort.return_value = [doc, stored_article(_id='a2')]
+
+        requests = list(self.spider.start_requests())
+
+        self.assertEqual(requests[0].headers.get('If-None-Match'), b'"v1"')
+        self.assertEqual(requests[0].headers.get('If-Modified-Since'), b'Thu, 02 May 2024 10:00:00 GMT')
+        self.assertNotIn(b'If-None-Match', requests[1].headers)
+        self.assertIn(304, requests[0].meta['handle_httpstatus_list'])
+
+    def test_not_modified_only_records_the_visit(self):
+        """Test that a 304 response leaves the article text alone"""
+        self.spider.parse_article(self._response(stored_article(), '', status=304))
+
+        update = self.spider.updates[0]._doc['$set']
+        self.assertEqual(list(update), ['recrawled_at'])
+        self.spider.crawler.stats.inc_value.assert_called_once_with('recrawl/not_modified')
+
+    def test_edit_is_versioned_and_written(self):
+        """Test that an edited article stores its new text, validators, archive key and version"""
+        doc = stored_article()
+        edited = ORIGINAL.replace('500 millones.', '650 millones de pesos, según el nuevo presupuesto.')
+
+        self.spider.parse_article(self._response(doc, edited, headers={'ETag': '"v2"'}))
+        self.spider.flush()
+
+        self.spider.versions.insert_many.assert_called_once()
+        version = self.spider.versions.insert_many.call_args[0][0][0]
+        self.assertEqual(version['article_id'], 'a1')
+        update = self.spider.articles.bulk_write.call_args[0][0][0]._doc['$set']
+        self.assertEqual(update['content'], edited)
+        self.assertEqual(update['etag'], '"v2"')
+        self.assertEqual(update['archive_key'], 'k1')
+        self.spider.crawler.stats.inc_value.assert_called_once_with('recrawl/edited')
+
+    def test_empty_page_keeps_stored_text(self):
+        """Test that a page without extractable content does not overwrite the article"""
+        self.spider.parse_article(self._response(stored_article(), ''))
+
+        self.assertNotIn('content', self.spider.updates[0]._doc['$set'])
+        self.spider.crawler.stats.inc_value.assert_called_once_with('recrawl/no_content')
+
+    def test_failed_writes_are_logged(self):
+        """Test that a BulkWriteError on the final flush is logged instead of raised"""
+        self.spider.articles.bulk_write.side_effect = BulkWriteError(
+            {'writeErrors': [{'index': 0, 'code': 121, 'errmsg': 'Document failed validation'}]}
+        )
+        self.spider.parse_article(self._response(stored_article(), '', status=304))
+
+        self.spider.closed('finished')
+
+        self.spider.crawler.stats.inc_value.assert_called_with('recrawl/write_errors', 1)
+
+    def test_article_of_a_failed_version_is_not_updated(self):
+        """Test that an article is not updated when its new version was not stored"""
+        self.spider.versions.insert_many.side_effect = BulkWriteError(
+            {'writeErrors': [{'index': 0, 'code': 11000, 'errmsg': 'E11000 duplicate key error'}]}
+        )
+        edited = ORIGINAL.replace('500 millones.', '650 millones de pesos, según el nuevo presupuesto.')
+        self.spider.parse_article(self._response(stored_article(), edited))
+        self.spider.parse_article(self._response(stored_article(_id='a2'), '', status=304))
+
+        self.spider.flush()
+
+        operations = self.spider.articles.bulk_write.call_args[0][0]
+        self.assertEqual([operation._filter['_id'] for operation in operations], ['a2'])
+
+    def test_dry_run_writes_nothing(self):
+        """Test that a dry run only counts outcomes"""
+        self.spider.dry_run = True
+        self.spider.parse_article(self._response(stored_article(), 'Texto nuevo por completo.'))
+
+        self.spider.flush()
+
+        self.spider.versions.insert_many.assert_not_called()
+        self.spider.articles.bulk_write.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
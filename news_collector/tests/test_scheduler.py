@@ -0,0 +1,146 @@
+"""
+Unit tests for the adaptive crawl scheduler
+"""
+import unittest
+from unittest.mock import Mock, MagicMock
+import sys
+import os
+
+from twisted.internet.task import Clock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import AdaptiveInterval, CrawlScheduler
+
+
+class TestAdaptiveInterval(unittest.TestCase):
+    """Test cases for AdaptiveInterval"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.policy = AdaptiveInterval(
+            min_interval=300,
+            max_interval=21600,
+            initial_interval=1800,
+            target_new_items=5,
+            backoff=2.0,
+            smoothing=0.5
+        )
+
+    def test_initial_interval(self):
+        """Test that the policy starts from the initial interval"""
+        self.assertEqual(self.policy.interval, 1800)
+
+    def test_initial_interval_is_clamped(self):
+        """Test that the initial interval respects the bounds"""
+        policy = AdaptiveInterval(min_interval=300, max_interval=600, initial_interval=5000)
+
+        self.assertEqual(policy.interval, 600)
+
+    def test_idle_source_backs_off(self):
+        """Test that crawls without new articles double the interval"""
+        self.assertEqual(self.policy.update(0), 3600)
+        self.assertEqual(self.policy.update(0), 7200)
+
+    def test_backoff_is_capped(self):
+        """Test that the interval never exceeds the maximum"""
+        for _ in range(10):
+            interval = self.policy.update(0)
+
+        self.assertEqual(interval, 21600)
+
+    def test_busy_source_is_crawled_more_often(self):
+        """Test that finding more than the target shortens the interval"""
+        # 20 articles in 30 minutes -> 5 articles every 7.5 minutes
+        self.assertEqual(self.policy.update(20), 450)
+
+    def test_interval_never_below_minimum(self):
+        """Test that a very busy source is not crawled faster than the minimum"""
+        self.assertEqual(self.policy.update(1000), 300)
+
+    def test_rate_is_smoothed_over_crawls(self):
+        """Test that one quiet crawl does not reset a busy source"""
+        self.policy.update(20)  # rate = 20 / 1800
+        interval = self.policy.update(1)  # rate = 1 / 450, averaged with the previous one
+
+        expected_rate = 0.5 * (1 / 450) + 0.5 * (20 / 1800)
+        self.assertAlmostEqual(interval, 5 / expected_rate)
+
+    def test_low_yield_lengthens_interval(self):
+        """Test that finding fewer than the target lengthens the interval"""
+        self.assertEqual(self.policy.update(1), 9000)
+
+
+class TestCrawlScheduler(unittest.TestCase):
+    """Test cases for CrawlScheduler"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.spider_cls = Mock()
+        self.spider_cls.source = 'test_source'
+        self.spider_cls.name = 'test-spider'
+        self.process = MagicMock()
+        self.collection = Mock()
+        self.clock = Clock()
+        self.scheduler = CrawlScheduler(
+            self.process,
+            [self.spider_cls],
+            lambda: AdaptiveInterval(min_interval=60, max_interval=3600, initial_interval=600),
+            self.collection,
+            clock=self.clock
+        )
+        self.schedule = self.scheduler.sources['test_source']
+
+    def test_schedule_exposes_next_run(self):
+        """Test that scheduling a crawl records and publishes its next run time"""
+        self.scheduler._schedule(self.schedule, 600)
+
+        self.assertIsNotNone(self.scheduler.next_runs()['test_source'])
+        self.assertEqual([call.getTime() for call in self.clock.getDelayedCalls()], [600])
+        update = self.collection.update_one.call_args
+        self.assertEqual(update[0][0], {'source': 'test_source'})
+        self.assertEqual(update[0][1]['$set']['next_run_at'], self.schedule.next_run_at)
+        self.assertTrue(update[1]['upsert'])
+
+    def test_run_reuses_process(self):
+        """Test that each crawl runs inside the same warm process"""
+        self.scheduler._run(self.schedule)
+
+        self.process.create_crawler.assert_called_once_with(self.spider_cls)
+        self.process.crawl.assert_called_once_with(self.process.create_crawler.return_value)
+        self.assertTrue(self.schedule.running)
+
+    def test_finished_crawl_updates_interval(self):
+        """Test that the number of new articles drives the next interval"""
+        crawler = Mock()
+        crawler.stats.get_value.return_value = 0
+        self.schedule.running = True
+
+        self.scheduler._finished(None, self.schedule, crawler)
+
+        self.assertFalse(self.schedule.running)
+        self.assertEqual(self.schedule.last_new_items, 0)
+        self.assertEqual([call.getTime() for call in self.clock.getDelayedCalls()], [1200])
+
+    def test_publish_errors_do_not_stop_scheduling(self):
+        """Test that a MongoDB error while publishing the schedule is ignored"""
+        self.collection.update_one.side_effect = Exception('Connection refused')
+
+        self.scheduler._schedule(self.schedule, 60)
+
+        self.assertEqual(len(self.clock.getDelayedCalls()), 1)
+
+    def test_crawl_starts_when_due(self):
+        """Test that the crawl only starts once its interval has elapsed"""
+        self.scheduler._schedule(self.schedule, 600)
+
+        self.clock.advance(599)
+        self.process.crawl.assert_not_called()
+
+        self.clock.advance(1)
+        self.process.crawl.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()